@@ -4,7 +4,7 @@ from sqlalchemy import pool
 from alembic import context
 from app.core.database import Base
 from app.core.config import settings
-import app.models  # Import all models
+import app.models  # noqa: F401  Import all models
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
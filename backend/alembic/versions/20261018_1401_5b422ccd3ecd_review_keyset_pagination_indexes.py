@@ -0,0 +1,42 @@
+"""review keyset pagination indexes
+
+Revision ID: 5b422ccd3ecd
+Revises: 9c4e6c46b878
+Create Date: 2026-10-18 14:01:27.775633
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b422ccd3ecd'
+down_revision: Union[str, None] = '9c4e6c46b878'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Build without locking writes on large reviews tables (PostgreSQL);
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reviews_repo_created', 'reviews', ['repository_id', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_reviews_repo_status_created', 'reviews', ['repository_id', 'status', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_reviews_status_created', 'reviews', ['status', 'created_at', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_reviews_status_created', table_name='reviews', postgresql_concurrently=True)
+        op.drop_index('ix_reviews_repo_status_created', table_name='reviews', postgresql_concurrently=True)
+        op.drop_index('ix_reviews_repo_created', table_name='reviews', postgresql_concurrently=True)
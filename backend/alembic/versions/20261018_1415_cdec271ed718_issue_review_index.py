@@ -0,0 +1,31 @@
+"""issue review index
+
+Revision ID: cdec271ed718
+Revises: 731d2cb81b49
+Create Date: 2026-10-18 14:15:42.836595
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'cdec271ed718'
+down_revision: Union[str, None] = '731d2cb81b49'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # issues is the largest table; build without blocking ingestion (PostgreSQL)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_issues_review_severity', 'issues', ['review_id', 'severity'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_issues_review_severity', table_name='issues', postgresql_concurrently=True)
@@ -0,0 +1,230 @@
+"""findings and review memberships
+
+Revision ID: a644c3f374d6
+Revises: cdec271ed718
+Create Date: 2026-10-18 14:19:46.696385
+
+"""
+import hashlib
+import re
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a644c3f374d6'
+down_revision: Union[str, None] = 'cdec271ed718'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FINDING_COLUMNS = (
+    'file_path', 'line_number', 'issue_type', 'severity', 'title', 'description',
+    'fix_suggestion', 'code_snippet', 'confidence_score', 'source', 'static_rule_id',
+)
+REVIEW_BATCH_SIZE = 500
+INSERT_BATCH_SIZE = 500
+
+
+# Frozen copy of app/services/fingerprint.py as of this revision, so later
+# changes to the app do not change what this migration writes
+_LINE_GUTTER = re.compile(r"^\s*\d+[:|]?\s", re.MULTILINE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize_code(text):
+    if not text:
+        return ''
+    return _WHITESPACE.sub(' ', _LINE_GUTTER.sub('', text)).strip()
+
+
+def _fingerprint(rule, file_path, context, occurrence):
+    raw = '\x1f'.join((rule, file_path, context, str(occurrence)))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _assign_fingerprints(issues):
+    groups = {}
+    for issue in issues:
+        rule = issue['static_rule_id'] or f"{issue['issue_type']}:{issue['title']}"
+        context = _normalize_code(issue['code_snippet'])
+        groups.setdefault((rule, issue['file_path'], context), []).append(issue)
+    for (rule, file_path, context), members in groups.items():
+        members.sort(key=lambda issue: issue['line_number'] or 0)
+        for occurrence, issue in enumerate(members):
+            issue['fingerprint'] = _fingerprint(rule, file_path, context, occurrence)
+    return issues
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _backfill_findings() -> None:
+    """Fold per-review ``issues`` rows into findings plus memberships.
+
+    Reviews are walked per repository in creation order, so a finding's
+    ``first_seen_review_id`` is the oldest review that reported it.
+
+    Issues with a snippet get the same fingerprint the app computes. No
+    checkout is available here, so issues without one (pylint, for example)
+    are keyed on rule, path and occurrence only. At runtime those are keyed on
+    the source lines instead, so they are reported as new once, on the first
+    review of each repository after the upgrade. That review becomes their
+    ``first_seen_review_id``, and false-positive flags on them need to be set
+    again. The backfilled rows keep the old reviews' history intact.
+    """
+    conn = op.get_bind()
+    meta = sa.MetaData()
+    reviews = sa.Table('reviews', meta, autoload_with=conn)
+    issues = sa.Table('issues', meta, autoload_with=conn)
+    findings = sa.Table('findings', meta, autoload_with=conn)
+    review_findings = sa.Table('review_findings', meta, autoload_with=conn)
+
+    review_rows = conn.execute(
+        sa.select(reviews.c.id, reviews.c.repository_id)
+        .where(sa.exists().where(issues.c.review_id == reviews.c.id))
+        .order_by(reviews.c.repository_id, reviews.c.created_at, reviews.c.id)
+    ).all()
+
+    known = {}
+    flagged = set()  # findings a later review's issue marked as a false positive
+    current_repository = None
+    for batch in _chunks(review_rows, REVIEW_BATCH_SIZE):
+        rows = conn.execute(
+            sa.select(issues).where(issues.c.review_id.in_([review_id for review_id, _ in batch]))
+        ).mappings().all()
+        by_review = {}
+        for row in rows:
+            by_review.setdefault(row['review_id'], []).append(dict(row))
+
+        for review_id, repository_id in batch:
+            if repository_id != current_repository:
+                known, current_repository = {}, repository_id
+            review_issues = _assign_fingerprints(by_review.get(review_id, []))
+
+            new = {}
+            for issue in review_issues:
+                if issue['fingerprint'] not in known and issue['fingerprint'] not in new:
+                    new[issue['fingerprint']] = {
+                        **{column: issue[column] for column in FINDING_COLUMNS},
+                        'repository_id': repository_id,
+                        'fingerprint': issue['fingerprint'],
+                        'is_false_positive': bool(issue['is_false_positive']),
+                        'first_seen_review_id': review_id,
+                        'created_at': issue['created_at'],
+                    }
+            for chunk in _chunks(list(new.values()), INSERT_BATCH_SIZE):
+                inserted = conn.execute(
+                    findings.insert().values(chunk).returning(findings.c.fingerprint, findings.c.id)
+                )
+                known.update(dict(inserted.all()))
+
+            links = {}
+            for issue in review_issues:
+                finding_id = known[issue['fingerprint']]
+                links[finding_id] = {
+                    'review_id': review_id,
+                    'finding_id': finding_id,
+                    'line_number': issue['line_number'],
+                    'in_diff': issue['in_diff'],
+                }
+                if issue['is_false_positive'] and issue['fingerprint'] not in new:
+                    flagged.add(finding_id)
+            if links:
+                conn.execute(review_findings.insert(), list(links.values()))
+
+    for chunk in _chunks(sorted(flagged), INSERT_BATCH_SIZE):
+        conn.execute(findings.update().where(findings.c.id.in_(chunk)).values(is_false_positive=True))
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('findings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('repository_id', sa.Integer(), nullable=False),
+    sa.Column('fingerprint', sa.String(length=64), nullable=False),
+    sa.Column('file_path', sa.Text(), nullable=False),
+    sa.Column('line_number', sa.Integer(), nullable=True),
+    sa.Column('issue_type', sa.String(length=100), nullable=False),
+    sa.Column('severity', sa.String(length=20), nullable=False),
+    sa.Column('title', sa.Text(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('fix_suggestion', sa.Text(), nullable=True),
+    sa.Column('code_snippet', sa.Text(), nullable=True),
+    sa.Column('confidence_score', sa.Float(), nullable=True),
+    sa.Column('source', sa.String(length=50), nullable=False),
+    sa.Column('static_rule_id', sa.String(), nullable=True),
+    sa.Column('is_false_positive', sa.Boolean(), nullable=True),
+    sa.Column('first_seen_review_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['first_seen_review_id'], ['reviews.id'], ),
+    sa.ForeignKeyConstraint(['repository_id'], ['repositories.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_findings_id'), 'findings', ['id'], unique=False)
+    op.create_index(op.f('ix_findings_severity'), 'findings', ['severity'], unique=False)
+    op.create_index('ux_findings_repo_fingerprint', 'findings', ['repository_id', 'fingerprint'], unique=True)
+    op.create_table('review_findings',
+    sa.Column('review_id', sa.Integer(), nullable=False),
+    sa.Column('finding_id', sa.Integer(), nullable=False),
+    sa.Column('line_number', sa.Integer(), nullable=True),
+    sa.Column('in_diff', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['finding_id'], ['findings.id'], ),
+    sa.ForeignKeyConstraint(['review_id'], ['reviews.id'], ),
+    sa.PrimaryKeyConstraint('review_id', 'finding_id')
+    )
+    op.create_index('ix_review_findings_finding', 'review_findings', ['finding_id'], unique=False)
+    _backfill_findings()
+    op.drop_index('ix_issues_id', table_name='issues')
+    op.drop_index('ix_issues_review_severity', table_name='issues')
+    op.drop_index('ix_issues_severity', table_name='issues')
+    op.drop_table('issues')
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('issues',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('review_id', sa.Integer(), nullable=False),
+    sa.Column('file_path', sa.Text(), nullable=False),
+    sa.Column('line_number', sa.Integer(), nullable=True),
+    sa.Column('issue_type', sa.String(length=100), nullable=False),
+    sa.Column('severity', sa.String(length=20), nullable=False),
+    sa.Column('title', sa.Text(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('fix_suggestion', sa.Text(), nullable=True),
+    sa.Column('code_snippet', sa.Text(), nullable=True),
+    sa.Column('confidence_score', sa.Float(), nullable=True),
+    sa.Column('source', sa.String(length=50), nullable=False),
+    sa.Column('static_rule_id', sa.String(), nullable=True),
+    sa.Column('is_false_positive', sa.Boolean(), nullable=True),
+    sa.Column('in_diff', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('(CURRENT_TIMESTAMP)'), nullable=True),
+    sa.ForeignKeyConstraint(['review_id'], ['reviews.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_issues_severity', 'issues', ['severity'], unique=False)
+    op.create_index('ix_issues_review_severity', 'issues', ['review_id', 'severity'], unique=False)
+    op.create_index('ix_issues_id', 'issues', ['id'], unique=False)
+    # One issue row per membership, as before the split
+    op.execute(
+        'INSERT INTO issues (review_id, file_path, line_number, issue_type, severity, title, description, '
+        'fix_suggestion, code_snippet, confidence_score, source, static_rule_id, is_false_positive, in_diff, '
+        'created_at) '
+        'SELECT rf.review_id, f.file_path, rf.line_number, f.issue_type, f.severity, f.title, f.description, '
+        'f.fix_suggestion, f.code_snippet, f.confidence_score, f.source, f.static_rule_id, f.is_false_positive, '
+        'rf.in_diff, f.created_at '
+        'FROM review_findings rf JOIN findings f ON f.id = rf.finding_id '
+        'ORDER BY rf.review_id, rf.finding_id'
+    )
+    op.drop_index('ix_review_findings_finding', table_name='review_findings')
+    op.drop_table('review_findings')
+    op.drop_index('ux_findings_repo_fingerprint', table_name='findings')
+    op.drop_index(op.f('ix_findings_severity'), table_name='findings')
+    op.drop_index(op.f('ix_findings_id'), table_name='findings')
+    op.drop_table('findings')
+    # ### end Alembic commands ###
@@ -0,0 +1,38 @@
+"""finding suppressed by
+
+Revision ID: 865610497482
+Revises: ca477bb52fac
+Create Date: 2026-10-18 14:26:20.448396
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '865610497482'
+down_revision: Union[str, None] = 'ca477bb52fac'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # batch mode: SQLite cannot ALTER constraints; PostgreSQL gets plain ALTERs
+    with op.batch_alter_table('findings') as batch_op:
+        batch_op.add_column(sa.Column('suppressed_by_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_findings_suppressed_by', 'findings', ['suppressed_by_id'], ['id'])
+    # findings is large; build without blocking ingestion (PostgreSQL)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_findings_suppressed_by', 'findings', ['suppressed_by_id'], unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_findings_suppressed_by', table_name='findings', postgresql_concurrently=True)
+    with op.batch_alter_table('findings') as batch_op:
+        batch_op.drop_constraint('fk_findings_suppressed_by', type_='foreignkey')
+        batch_op.drop_column('suppressed_by_id')
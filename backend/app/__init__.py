@@ -1,2 +1,7 @@
 """SentinelCode Backend Application"""
+import time
+
 __version__ = "1.0.0"
+
+# Reference point for the startup timings in app.core.startup
+IMPORT_STARTED = time.perf_counter()
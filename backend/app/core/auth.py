@@ -0,0 +1,146 @@
+"""
+Request authentication
+
+``get_current_user`` resolves the bearer JWT to a ``Principal``. Verified
+tokens are remembered in a bounded LRU until the earlier of their ``exp`` and
+``AUTH_CACHE_TTL_SECONDS``, so repeat requests skip both the signature check
+and the ``users`` lookup. Tokens carry the user's ``token_version``; bumping
+it (logout) revokes every token issued before, and ``invalidate_user`` drops
+the cached entries in this process. Other processes notice within the TTL.
+
+Data is owned per user through ``repositories.user_id``: routers resolve a
+requested repository with ``owned_repository`` (404 for other users'
+repositories, so their existence is not revealed) and scope listings and
+aggregates with the ``owned_repository_ids`` subquery.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set
+
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.core.security import decode_access_token
+from app.models.repository import Repository
+from app.models.user import User
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as far as most endpoints need to know"""
+
+    id: int
+    username: str
+    token_version: int
+
+
+class AuthCache:
+    """Bounded, expiry-aware map of verified token -> principal"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # token -> (principal, expires_at)
+        self._by_user: Dict[int, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[Principal]:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        principal, expires_at = entry
+        if time.time() >= expires_at:
+            self._remove(token)
+            return None
+        self._entries.move_to_end(token)
+        return principal
+
+    def put(self, token: str, principal: Principal, exp: float) -> None:
+        self._entries[token] = (principal, min(exp, time.time() + self.ttl_seconds))
+        self._entries.move_to_end(token)
+        self._by_user.setdefault(principal.id, set()).add(token)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: int) -> None:
+        for token in self._by_user.pop(user_id, set()):
+            self._entries.pop(token, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_user.clear()
+
+    def _remove(self, token: str) -> None:
+        principal, _ = self._entries.pop(token)
+        tokens = self._by_user.get(principal.id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._by_user[principal.id]
+
+
+auth_cache = AuthCache(settings.AUTH_CACHE_MAX_ENTRIES, settings.AUTH_CACHE_TTL_SECONDS)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+async def authenticate(db: AsyncSession, token: str) -> Principal:
+    """Principal for ``token``, verifying and loading the user only on a cache miss"""
+    principal = auth_cache.get(token)
+    if principal is not None:
+        return principal
+
+    payload = decode_access_token(token)
+    # python-jose compares exp at whole-second granularity; enforce it exactly
+    if payload is None or "sub" not in payload or "exp" not in payload or payload["exp"] <= time.time():
+        raise _unauthorized("Invalid or expired token")
+    try:
+        user_id = int(payload["sub"])
+    except (TypeError, ValueError):
+        raise _unauthorized("Invalid token subject")
+
+    user = await db.get(User, user_id)
+    if user is None or payload.get("ver", 0) != (user.token_version or 0):
+        raise _unauthorized("Token has been revoked")
+
+    principal = Principal(id=user.id, username=user.username, token_version=user.token_version or 0)
+    auth_cache.put(token, principal, float(payload["exp"]))
+    return principal
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """FastAPI dependency: the authenticated principal, or 401"""
+    if credentials is None or credentials.scheme.lower() != "bearer":
+        raise _unauthorized("Not authenticated")
+    return await authenticate(db, credentials.credentials)
+
+
+def owned_repository_ids(principal: Principal):
+    """Ids of the principal's repositories, as a subquery for ``IN`` filters"""
+    return select(Repository.id).where(Repository.user_id == principal.id)
+
+
+async def owned_repository(db: AsyncSession, principal: Principal, repo_id: int) -> Repository:
+    """Repository ``repo_id`` if the principal owns it, or 404"""
+    repository = await db.get(Repository, repo_id)
+    if repository is None or repository.user_id != principal.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Repository not found")
+    return repository
@@ -2,7 +2,7 @@
 Application configuration using Pydantic Settings
 """
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 
 class Settings(BaseSettings):
@@ -19,16 +19,49 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: str = ""  # derived from DATABASE_URL when empty
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection; 0 behind pgbouncer
+    DB_ECHO: bool = False  # log every SQL statement
 
     # GitHub OAuth
     GITHUB_CLIENT_ID: str
     GITHUB_CLIENT_SECRET: str
     GITHUB_REDIRECT_URI: str
 
+    # GitHub API client
+    GITHUB_API_URL: str = "https://api.github.com"
+    GITHUB_OAUTH_URL: str = "https://github.com"
+    GITHUB_API_VERSION: str = "2022-11-28"
+    GITHUB_HTTP2: bool = True
+    GITHUB_MAX_CONNECTIONS: int = 50
+    GITHUB_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    GITHUB_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    GITHUB_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    GITHUB_READ_TIMEOUT_SECONDS: float = 20.0
+    GITHUB_POOL_TIMEOUT_SECONDS: float = 10.0
+    GITHUB_CACHE_MAX_ENTRIES: int = 4096
+
+    # GitHub rate limiting
+    GITHUB_RATE_LIMIT_PER_HOUR: int = 5000  # until X-RateLimit-Limit says otherwise
+    GITHUB_UNAUTHENTICATED_RATE_LIMIT_PER_HOUR: int = 60
+    GITHUB_RATE_LIMIT_BURST: int = 100
+    GITHUB_RATE_LIMIT_RESERVE: float = 0.1  # share of the quota background work leaves alone
+    GITHUB_MAX_CONCURRENT_PER_TOKEN: int = 10
+    GITHUB_WRITE_INTERVAL_SECONDS: float = 1.0
+    GITHUB_SECONDARY_BACKOFF_SECONDS: float = 60.0
+    GITHUB_RATE_LIMIT_MAX_RETRIES: int = 3
+    GITHUB_MAX_BUDGETS: int = 10_000
+
     # JWT
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_MAX_ENTRIES: int = 50_000
+    AUTH_CACHE_TTL_SECONDS: float = 60.0  # bounds how long other processes honour a revoked token
 
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000"]
@@ -36,6 +69,108 @@ class Settings(BaseSettings):
     # Frontend
     FRONTEND_URL: str = "http://localhost:3000"
 
+    # Analysis job queue
+    JOB_WORKER_CONCURRENCY: int = 4
+    JOB_QUEUE_MAX_DEPTH: int = 1000
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BASE_SECONDS: float = 5.0
+    JOB_RETRY_MAX_SECONDS: float = 300.0
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_QUEUE_RETRY_AFTER_SECONDS: int = 30
+    JOB_HEARTBEAT_SECONDS: float = 30.0  # how often a pool renews the leases of its running jobs
+    JOB_LEASE_SECONDS: float = 120.0  # running jobs not renewed for this long are re-queued
+    JOB_PRUNE_INTERVAL_SECONDS: float = 3600.0
+
+    # Analysis result cache
+    ANALYSIS_CACHE_MAX_ENTRIES: int = 500_000
+    ANALYSIS_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024
+
+    # Static analyzers
+    ANALYZERS: List[str] = ["bandit", "pylint", "semgrep"]
+    ANALYZER_OPTIONS: Dict[str, dict] = {"semgrep": {"config": "p/default"}}
+    ANALYZER_WORKERS: int = 0  # 0 = one process per CPU
+    ANALYZER_BATCH_FILES: int = 50
+    ANALYZER_BATCH_TIMEOUT_SECONDS: float = 120.0
+    ANALYZER_BATCH_MEMORY_MB: int = 2048
+    CHECKOUT_ROOT: str = "/tmp/sentinelcode-checkouts"
+    ISSUE_INGEST_BATCH_SIZE: int = 10_000
+
+    # AI reasoning stage
+    AI_REVIEW_ENABLED: bool = False
+    AI_BACKEND: str = "stub"  # see app/services/ai_backends.py; 'stub' is deterministic and offline
+    AI_BACKEND_OPTIONS: Dict[str, dict] = {}  # per backend, e.g. {"stub": {"latency_seconds": 0.5}}
+    AI_MODEL: str = "stub-1"
+    AI_PROMPT_MAX_TOKENS: int = 8000
+    AI_ITEM_MAX_TOKENS: int = 1000  # longer code is truncated
+    AI_RESPONSE_TOKENS_PER_ITEM: int = 60
+    AI_BATCH_MAX_ITEMS: int = 20
+    AI_MAX_CONCURRENCY_PER_MODEL: int = 4
+    AI_MODEL_CONCURRENCY: Dict[str, int] = {}  # per-model overrides
+    AI_REQUEST_TIMEOUT_SECONDS: float = 120.0
+    AI_CONTEXT_LINES: int = 3  # source lines around findings without a snippet
+    AI_MAX_CANDIDATES_PER_REVIEW: int = 500
+    AI_CACHE_MAX_ENTRIES: int = 200_000
+    AI_DISMISS_MIN_CONFIDENCE: float = 0.8  # dismissals at least this sure are left out of counters
+
+    # False-positive suppression
+    FP_SUPPRESS_ENABLED: bool = True
+    FP_SUPPRESS_SIMILARITY: float = 0.92  # cosine similarity to a known false positive
+    FP_EMBEDDER: str = "hashing"  # see app/services/fp_index.py
+    FP_EMBEDDER_OPTIONS: dict = {}
+    FP_EMBEDDING_DIM: int = 256
+    FP_INDEX_DIR: str = "/tmp/sentinelcode-fp-index"  # derived data, rebuilt from the database
+    FP_INDEX_DTYPE: str = "int8"  # 'int8' (per-row float16 scale) or 'float16'
+    FP_INDEX_QUERY_BATCH: int = 1024
+    FP_INDEX_MAX_LOADED: int = 256
+
+    # Rule precision
+    RULE_PRECISION_ENABLED: bool = True
+    RULE_PRECISION_PRIOR_ACCEPTED: float = 2.0  # Beta prior pseudo-counts (prior precision 0.8)
+    RULE_PRECISION_PRIOR_FALSE_POSITIVE: float = 0.5
+    RULE_SUPPRESS_MIN_FALSE_POSITIVES: int = 5
+    RULE_SUPPRESS_BELOW_PRECISION: float = 0.2
+    RULE_PRECISION_TTL_SECONDS: float = 60.0  # how soon other processes see refreshed precision
+    RULE_PRECISION_MAX_LOADED: int = 1024
+
+    # Pull request reviews
+    PR_REVIEW_CONTEXT_LINES: int = 3
+    PR_REVIEW_FOLLOW_IMPORTS: bool = True  # only with 'tag': dropped findings need no context files
+    PR_REVIEW_OUT_OF_SCOPE: str = "drop"  # 'drop' or 'tag' findings outside the diff
+    PR_REVIEW_MAX_HISTORY: int = 512  # commits fetched looking for the merge-base
+
+    # Repository sync
+    REPO_SYNC_PAGE_SIZE: int = 100
+    REPO_SYNC_CONCURRENCY: int = 8
+    REPO_SYNC_BATCH_SIZE: int = 500
+    REPO_SYNC_FULL_INTERVAL_HOURS: int = 24
+    REPO_SYNC_SKEW_SECONDS: int = 300
+
+    # Dashboard
+    HOURLY_METRICS_RETENTION_DAYS: int = 90
+    TRENDS_DEFAULT_POINTS: int = 300
+    TRENDS_MAX_POINTS: int = 2000
+    EXPORT_BATCH_SIZE: int = 5000
+
+    # Review listing
+    REVIEW_PAGE_SIZE_MAX: int = 200
+    REVIEW_COUNT_CAP: int = 10_000  # bounded count where no planner estimate is available
+
+    # Webhooks
+    GITHUB_WEBHOOK_SECRET: str = ""  # required when ENV is 'production'
+    WEBHOOK_MAX_BODY_BYTES: int = 25 * 1024 * 1024  # GitHub caps payloads at 25 MB
+    WEBHOOK_DELIVERY_RETENTION_HOURS: int = 72
+
+    # Startup
+    DB_CREATE_TABLES: bool = True  # metadata.create_all on boot outside production; production trusts Alembic
+    STARTUP_WARM_CONNECTIONS: int = 2  # pooled DB connections opened by the background warm-up
+    STARTUP_RETRY_SECONDS: float = 5.0  # pause between warm-up attempts while the database is unreachable
+    READINESS_DB_TIMEOUT_SECONDS: float = 2.0
+
+    # Observability
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""  # when set, /metrics requires "Authorization: Bearer <token>"
+    DB_SLOW_QUERY_SECONDS: float = 0.5  # statements at least this slow are logged with their route
+
     # GCP (optional for now)
     GCP_PROJECT_ID: str = ""
     GCP_REGION: str = "us-central1"
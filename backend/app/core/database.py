@@ -1,10 +1,54 @@
 """
 Database configuration and session management
+
+Two engines share one schema:
+
+* ``async_engine`` / ``get_async_db`` - used by request handlers and the job
+  queue so queries never block the event loop (asyncpg on PostgreSQL,
+  aiosqlite for local SQLite files).
+* ``engine`` / ``get_db`` - synchronous, for code that already runs in a
+  worker thread (analyzer stage), Alembic and scripts. New routers should
+  depend on ``get_async_db``.
 """
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
+
+# Async drivers for each sync URL scheme we support
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """Async variant of a sync DATABASE_URL (unless it already is one)"""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    parsed = parsed.set(drivername=drivername)
+    if drivername == "postgresql+asyncpg":
+        parsed = parsed.update_query_dict(
+            {"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)}
+        )
+    return parsed.render_as_string(hide_password=False)
+
+
+def pool_options(url: str) -> dict:
+    """Pool sizing from Settings; SQLite keeps SQLAlchemy's defaults"""
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
 
 # Create database engine
 # Add connect_args for SQLite to allow multi-threading
@@ -16,11 +60,28 @@ engine = create_engine(
     settings.DATABASE_URL,
     connect_args=connect_args,
     pool_pre_ping=True,
-    echo=settings.DEBUG,
+    echo=settings.DB_ECHO,
+    **pool_options(settings.DATABASE_URL),
 )
 
-# Create session factory
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_pre_ping=True,
+    echo=settings.DB_ECHO,
+    **pool_options(ASYNC_DATABASE_URL),
+)
+
+if settings.METRICS_ENABLED:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
 # Create base class for models
 Base = declarative_base()
@@ -35,6 +96,12 @@ def get_db():
         db.close()
 
 
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # Function to create all tables
 def create_tables():
     """Create all database tables"""
@@ -0,0 +1,117 @@
+"""
+Request and database instrumentation
+
+``MetricsMiddleware`` times every HTTP request per route template and keeps
+a ``RequestStats`` in a context variable for the duration of the request.
+SQLAlchemy cursor events on both engines count statements and database time
+into that object - the async engine's greenlets and ``asyncio.to_thread``
+both carry the context over - so each request's query count and database
+time are observed per route. Statements outside a request (job workers) are
+counted as ``background``. Statements slower than ``DB_SLOW_QUERY_SECONDS``
+are logged with the route that issued them.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core.metrics import (
+    DB_QUERIES,
+    DB_QUERY_SECONDS,
+    DB_SLOW_QUERIES,
+    HTTP_IN_PROGRESS,
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DB_SECONDS,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """Database work done on behalf of one HTTP request"""
+    __slots__ = ("scope", "queries", "db_seconds")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+
+    @property
+    def route(self) -> str:
+        """Route template once routing has matched (bounded label values)"""
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: no extra task or body buffering per request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_PROGRESS.dec()
+            route, method = stats.route, scope["method"]
+            HTTP_REQUESTS.inc(method=method, route=route, status=str(status))
+            HTTP_REQUEST_SECONDS.observe(elapsed, method=method, route=route)
+            HTTP_REQUEST_DB_QUERIES.observe(stats.queries, route=route)
+            HTTP_REQUEST_DB_SECONDS.observe(stats.db_seconds, route=route)
+            _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    stats = _current.get()
+    label = "request" if stats is not None else "background"
+    DB_QUERIES.inc(context=label)
+    DB_QUERY_SECONDS.observe(elapsed, context=label)
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+    if elapsed >= settings.DB_SLOW_QUERY_SECONDS:
+        DB_SLOW_QUERIES.inc(context=label)
+        logger.warning(
+            "Slow query (%.3fs) in %s: %s",
+            elapsed,
+            stats.route if stats is not None else "background",
+            " ".join(statement.split())[:1000],
+        )
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time every statement run through ``engine`` (a sync Engine)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
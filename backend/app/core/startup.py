@@ -0,0 +1,76 @@
+"""
+Cold start
+
+Before serving, the app only builds itself (and, outside production, creates
+missing tables). Everything else runs in a background warm-up started by
+``main.lifespan``: a few pooled database connections are opened, the modules
+deferred to keep ``import app.main`` cheap are imported in a worker thread,
+and the GitHub client and job workers are started. The liveness probe only
+says the process answers; the readiness probe waits for the warm-up and then
+checks the database.
+
+Phase times are milliseconds since the ``app`` package was imported and are
+logged once the warm-up finishes.
+"""
+import asyncio
+import importlib
+import logging
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+import app
+
+logger = logging.getLogger(__name__)
+
+# Imported by the warm-up so the first requests that need them do not pay for it
+DEFERRED_IMPORTS = (
+    "jose.jwt",
+    "passlib.context",
+    "httpx",
+    "app.services.fp_index",
+    "app.services.rule_precision",
+    "app.services.ai_scheduler",
+    "app.services.analyzer_runner",
+    "app.services.checkout",
+    "app.services.diff_scope",
+)
+
+
+class StartupState:
+    def __init__(self):
+        self.timings: Dict[str, float] = {}
+        self.ready = False
+        self.error: Optional[str] = None  # last warm-up failure, while not ready
+
+    def mark(self, phase: str) -> None:
+        self.timings[phase] = round((time.perf_counter() - app.IMPORT_STARTED) * 1000, 1)
+
+
+state = StartupState()
+
+
+def import_deferred() -> None:
+    for name in DEFERRED_IMPORTS:
+        importlib.import_module(name)
+
+
+async def _ping(engine: AsyncEngine) -> None:
+    async with engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+async def warm_pool(engine: AsyncEngine, connections: int) -> None:
+    """Open ``connections`` pooled connections at once so requests find them idle"""
+    await asyncio.gather(*(_ping(engine) for _ in range(connections)))
+
+
+async def database_available(engine: AsyncEngine, timeout: float) -> bool:
+    try:
+        await asyncio.wait_for(_ping(engine), timeout)
+    except Exception:
+        logger.warning("Readiness check could not reach the database", exc_info=True)
+        return False
+    return True
@@ -2,25 +2,78 @@
 SentinelCode Backend Application
 FastAPI entry point
 """
-from fastapi import FastAPI
+import asyncio
+import hmac
+import logging
+from typing import Optional
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from contextlib import asynccontextmanager
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import startup
+from app.core.auth import get_current_user
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import async_engine, create_tables, get_async_db
+from app.core.instrumentation import MetricsMiddleware
+from app.core.metrics import JOBS_ACTIVE, registry
 from app.routers import auth, repos, reviews, webhooks, dashboard
 
 
+logger = logging.getLogger(__name__)
+
+
+async def warm_up():
+    """Background startup work; /health/ready reports ready once it is done"""
+    from app.services.github_client import github
+    from app.services.job_queue import worker_pool
+
+    while True:
+        try:
+            await startup.warm_pool(async_engine, settings.STARTUP_WARM_CONNECTIONS)
+            startup.state.mark("database")
+            await asyncio.to_thread(startup.import_deferred)
+            startup.state.mark("imports")
+            await github.start()
+            await worker_pool.start()
+            print(f"⚙️  Started {worker_pool.concurrency} analysis workers")
+            break
+        except Exception as exc:
+            startup.state.error = repr(exc)
+            logger.exception("Startup warm-up failed; retrying in %ss", settings.STARTUP_RETRY_SECONDS)
+            await asyncio.sleep(settings.STARTUP_RETRY_SECONDS)
+    startup.state.error = None
+    startup.state.ready = True
+    startup.state.mark("ready")
+    logger.info("Startup timings (ms since import): %s", startup.state.timings)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
-    # Startup: Create database tables
     print("🚀 Starting SentinelCode Backend...")
-    print("📊 Creating database tables...")
-    create_tables()
-    print("✅ Database tables created successfully!")
+    if settings.DB_CREATE_TABLES and settings.ENV != "production":
+        print("📊 Creating database tables...")
+        create_tables()
+        print("✅ Database tables created successfully!")
+    warm_up_task = asyncio.create_task(warm_up(), name="startup-warm-up")
+    startup.state.mark("serving")
     yield
     # Shutdown: Cleanup if needed
     print("👋 Shutting down SentinelCode Backend...")
+    warm_up_task.cancel()
+    await asyncio.gather(warm_up_task, return_exceptions=True)
+    from app.services.ai_scheduler import ai_scheduler
+    from app.services.analyzer_runner import shutdown_pool
+    from app.services.github_client import github
+    from app.services.job_queue import worker_pool
+
+    await worker_pool.stop()
+    shutdown_pool()
+    await ai_scheduler.aclose()
+    await github.aclose()
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -41,12 +94,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request metrics (outermost, so latency includes the other middleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(repos.router, prefix="/api/v1/repos", tags=["Repositories"])
-app.include_router(reviews.router, prefix="/api/v1/reviews", tags=["Reviews"])
+app.include_router(
+    reviews.router, prefix="/api/v1/reviews", tags=["Reviews"], dependencies=[Depends(get_current_user)]
+)
 app.include_router(webhooks.router, prefix="/api/v1/webhooks", tags=["Webhooks"])
-app.include_router(dashboard.router, prefix="/api/v1/dashboard", tags=["Dashboard"])
+app.include_router(
+    dashboard.router, prefix="/api/v1/dashboard", tags=["Dashboard"], dependencies=[Depends(get_current_user)]
+)
 
 
 @app.get("/")
@@ -66,6 +127,46 @@ async def health_check():
     return {"status": "healthy", "environment": settings.ENV}
 
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and answering"""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness(response: Response):
+    """Readiness probe: startup warm-up finished and the database answers"""
+    if not startup.state.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "starting", "error": startup.state.error}
+    if not await startup.database_available(async_engine, settings.READINESS_DB_TIMEOUT_SECONDS):
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+        return {"status": "unavailable"}
+    return {"status": "ready", "startup_ms": startup.state.timings}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(
+    authorization: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Prometheus scrape endpoint"""
+    from app.services.job_queue import job_counts
+
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if settings.METRICS_TOKEN and not hmac.compare_digest(
+        authorization or "", f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    for job_status, count in (await job_counts(db)).items():
+        JOBS_ACTIVE.set(count, status=job_status)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+startup.state.mark("imported")
+
+
 if __name__ == "__main__":
     import uvicorn
 
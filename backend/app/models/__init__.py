@@ -2,6 +2,28 @@
 from app.models.user import User
 from app.models.repository import Repository
 from app.models.review import Review
-from app.models.issue import Issue
+from app.models.finding import Finding
+from app.models.review_finding import ReviewFinding
+from app.models.analysis_job import AnalysisJob
+from app.models.webhook_delivery import WebhookDelivery
+from app.models.analysis_cache import AnalysisCacheEntry
+from app.models.ai_verdict import AIVerdictCacheEntry
+from app.models.daily_metric import DailyMetric, HourlyMetric
+from app.models.risk_node import RiskNode
+from app.models.rule_precision import RulePrecision
 
-__all__ = ["User", "Repository", "Review", "Issue"]
+__all__ = [
+    "User",
+    "Repository",
+    "Review",
+    "Finding",
+    "ReviewFinding",
+    "AnalysisJob",
+    "WebhookDelivery",
+    "AnalysisCacheEntry",
+    "AIVerdictCacheEntry",
+    "DailyMetric",
+    "HourlyMetric",
+    "RiskNode",
+    "RulePrecision",
+]
@@ -0,0 +1,24 @@
+"""
+AI verdict cache model - reasoning-stage results keyed by prompt hash
+"""
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, func
+from app.core.database import Base
+
+
+class AIVerdictCacheEntry(Base):
+    __tablename__ = "ai_verdict_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    prompt_hash = Column(String(64), nullable=False)  # sha256 of model, prompt version and item prompt
+    model = Column(String(100), nullable=False)
+    verdict = Column(JSON, nullable=False)  # {"verdict": 'confirm'|'dismiss', "confidence": 0.0-1.0, ...}
+    hit_count = Column(Integer, nullable=False, default=0)
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ux_ai_verdict_cache_prompt", "prompt_hash", unique=True),
+    )
+
+    def __repr__(self):
+        return f"<AIVerdictCacheEntry {self.model} {self.prompt_hash[:12]}>"
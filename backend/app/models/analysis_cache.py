@@ -0,0 +1,32 @@
+"""
+Analysis cache model - analyzer findings keyed by file content
+"""
+from sqlalchemy import Column, Integer, String, DateTime, JSON, Index, func
+from app.core.database import Base
+
+
+class AnalysisCacheEntry(Base):
+    __tablename__ = "analysis_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    blob_sha = Column(String(40), nullable=False)  # git blob SHA of the analyzed file
+    analyzer = Column(String(50), nullable=False)  # 'bandit', 'pylint', 'semgrep'
+    analyzer_version = Column(String(50), nullable=False)
+    ruleset_hash = Column(String(64), nullable=False)  # sha256 of the effective rule config
+    findings = Column(JSON, nullable=False)  # list of path-independent finding field dicts
+    size_bytes = Column(Integer, nullable=False, default=0)
+    hit_count = Column(Integer, nullable=False, default=0)
+    last_used_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Lookups fix the analyzer identity and probe many blobs at once
+        Index(
+            "ux_analysis_cache_key",
+            "analyzer", "analyzer_version", "ruleset_hash", "blob_sha",
+            unique=True,
+        ),
+    )
+
+    def __repr__(self):
+        return f"<AnalysisCacheEntry {self.analyzer}@{self.analyzer_version} {self.blob_sha[:7]}>"
@@ -0,0 +1,37 @@
+"""
+Analysis job model - durable queue entries for background review analysis
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, JSON, Index, func
+from app.core.database import Base
+
+
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    review_id = Column(Integer, ForeignKey("reviews.id"), nullable=False, index=True)
+    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=False)
+    kind = Column(String(50), nullable=False)  # 'push', 'pull_request', 'manual'
+    # 'queued', 'running', 'succeeded', 'failed', 'superseded'
+    status = Column(String(20), nullable=False, default="queued")
+    coalesce_key = Column(String, nullable=True)  # 'ref:refs/heads/main', 'pr:42'; newer jobs replace queued ones
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    run_after = Column(DateTime(timezone=True), server_default=func.now())
+    payload = Column(JSON, nullable=True)  # event-specific data (ref, base sha, ...)
+    last_error = Column(Text, nullable=True)
+    locked_by = Column(String(100), nullable=True)  # worker pool holding the lease while running
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # lease last renewed
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Workers claim the oldest runnable job: WHERE status = 'queued' AND run_after <= now
+        Index("ix_analysis_jobs_status_run_after", "status", "run_after"),
+        # A new push/PR head supersedes queued jobs with the same key
+        Index("ix_analysis_jobs_coalesce", "repository_id", "coalesce_key", "status"),
+    )
+
+    def __repr__(self):
+        return f"<AnalysisJob {self.id} - {self.kind} - {self.status}>"
@@ -0,0 +1,52 @@
+"""
+Rollup metric models - per-repository counters of completed reviews per
+day and per hour
+"""
+from sqlalchemy import Column, Integer, Date, DateTime, ForeignKey, UniqueConstraint
+from app.core.database import Base
+
+
+class MetricCounters:
+    """Counter columns shared by every rollup granularity"""
+    reviews_count = Column(Integer, nullable=False, default=0)
+    total_issues = Column(Integer, nullable=False, default=0)
+    critical_issues = Column(Integer, nullable=False, default=0)
+    high_issues = Column(Integer, nullable=False, default=0)
+    medium_issues = Column(Integer, nullable=False, default=0)
+    low_issues = Column(Integer, nullable=False, default=0)
+    false_positives = Column(Integer, nullable=False, default=0)
+    # Sums and counts rather than averages so rows can be incremented in place
+    analysis_time_sum = Column(Integer, nullable=False, default=0)
+    analysis_time_count = Column(Integer, nullable=False, default=0)
+    quality_score_sum = Column(Integer, nullable=False, default=0)
+    quality_score_count = Column(Integer, nullable=False, default=0)
+
+
+class DailyMetric(MetricCounters, Base):
+    __tablename__ = "daily_metrics"
+
+    id = Column(Integer, primary_key=True, index=True)
+    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=False)
+    date = Column(Date, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("repository_id", "date", name="uq_daily_metrics_repo_date"),
+    )
+
+    def __repr__(self):
+        return f"<DailyMetric {self.repository_id} {self.date}>"
+
+
+class HourlyMetric(MetricCounters, Base):
+    __tablename__ = "hourly_metrics"
+
+    id = Column(Integer, primary_key=True, index=True)
+    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=False)
+    hour = Column(DateTime, nullable=False)  # UTC, truncated to the hour
+
+    __table_args__ = (
+        UniqueConstraint("repository_id", "hour", name="uq_hourly_metrics_repo_hour"),
+    )
+
+    def __repr__(self):
+        return f"<HourlyMetric {self.repository_id} {self.hour}>"
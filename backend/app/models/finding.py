@@ -0,0 +1,46 @@
+"""
+Finding model
+"""
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Boolean, Index, func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class Finding(Base):
+    """A distinct finding in a repository, stored once however many reviews contain it"""
+
+    __tablename__ = "findings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=False)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of rule, path and normalized context
+    file_path = Column(Text, nullable=False)
+    line_number = Column(Integer, nullable=True)  # where first seen; ReviewFinding has the per-review line
+    issue_type = Column(String(100), nullable=False)  # 'security', 'performance', 'style', 'bug'
+    severity = Column(String(20), nullable=False, index=True)  # 'critical', 'high', 'medium', 'low'
+    title = Column(Text, nullable=False)
+    description = Column(Text, nullable=True)
+    fix_suggestion = Column(Text, nullable=True)
+    code_snippet = Column(Text, nullable=True)
+    confidence_score = Column(Float, nullable=True)  # 0.0-1.0 that it is a real problem
+    source = Column(String(50), nullable=False)  # 'static_analysis', 'ai', 'hybrid'
+    static_rule_id = Column(String, nullable=True)  # e.g., 'bandit-B608'
+    ai_verdict = Column(String(20), nullable=True)  # reasoning stage: 'confirm', 'dismiss'
+    ai_explanation = Column(Text, nullable=True)
+    is_false_positive = Column(Boolean, default=False)
+    # the known false positive this finding matched
+    suppressed_by_id = Column(Integer, ForeignKey("findings.id", name="fk_findings_suppressed_by"), nullable=True)
+    first_seen_review_id = Column(Integer, ForeignKey("reviews.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ux_findings_repo_fingerprint", "repository_id", "fingerprint", unique=True),
+        # Releasing the findings a false positive suppressed when it is unflagged
+        Index("ix_findings_suppressed_by", "suppressed_by_id"),
+    )
+
+    # Relationships
+    review_links = relationship("ReviewFinding", back_populates="finding")
+
+    def __repr__(self):
+        return f"<Finding {self.id} - {self.severity} - {self.title[:30]}>"
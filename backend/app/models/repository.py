@@ -1,7 +1,7 @@
 """
 Repository model
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, JSON, func
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Boolean, ForeignKey, Text, JSON, Index, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -12,6 +12,7 @@ class Repository(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     platform = Column(String(50), nullable=False)  # 'github', 'gitlab', 'bitbucket'
+    external_id = Column(BigInteger, nullable=True)  # platform's repository id; set by repo sync
     repo_name = Column(String, nullable=False, index=True)
     repo_url = Column(Text, nullable=False)
     default_branch = Column(String, default="main")
@@ -19,11 +20,21 @@ class Repository(Base):
     webhook_id = Column(String, nullable=True)
     language_breakdown = Column(JSON, nullable=True)  # {"python": 0.6, "js": 0.4}
     last_scan_at = Column(DateTime(timezone=True), nullable=True)
+    remote_updated_at = Column(DateTime(timezone=True), nullable=True)  # platform's updated_at at last sync
+    remote_pushed_at = Column(DateTime(timezone=True), nullable=True)  # platform's pushed_at at last sync
+    risk_review_id = Column(Integer, nullable=True)  # review the risk index currently reflects
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # Upsert key for repo sync
+        Index("ux_repositories_user_platform_external", "user_id", "platform", "external_id", unique=True),
+        # Webhook lookup by the platform's repository id
+        Index("ix_repositories_platform_external", "platform", "external_id"),
+    )
+
     # Relationships
     # user = relationship("User", back_populates="repositories")
-    # reviews = relationship("Review", back_populates="repository")
+    reviews = relationship("Review", back_populates="repository")
 
     def __repr__(self):
         return f"<Repository {self.repo_name}>"
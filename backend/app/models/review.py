@@ -1,7 +1,7 @@
 """
 Review model
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index, func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -11,10 +11,11 @@ class Review(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=False)
-    commit_sha = Column(String(40), nullable=False, index=True)
+    commit_sha = Column(String(40), nullable=True, index=True)  # unset until a manual scan resolves its branch
     pr_number = Column(Integer, nullable=True)
     pr_url = Column(Text, nullable=True)
-    status = Column(String(50), nullable=False, index=True)  # 'pending', 'in_progress', 'completed', 'failed'
+    # 'pending', 'in_progress', 'completed', 'failed', 'superseded'
+    status = Column(String(50), nullable=False, index=True)
     quality_score = Column(Integer, nullable=True)  # 0-100
     total_issues = Column(Integer, default=0)
     critical_issues = Column(Integer, default=0)
@@ -24,10 +25,18 @@ class Review(Base):
     analysis_time_seconds = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     completed_at = Column(DateTime(timezone=True), nullable=True)
+    feedback_version = Column(Integer, nullable=False, default=0, server_default="0")  # bumped on every feedback change
+
+    __table_args__ = (
+        # Keyset pagination for review listings: filter prefix + (created_at, id) order
+        Index("ix_reviews_repo_status_created", "repository_id", "status", "created_at", "id"),
+        Index("ix_reviews_repo_created", "repository_id", "created_at", "id"),
+        Index("ix_reviews_status_created", "status", "created_at", "id"),
+    )
 
     # Relationships
-    # repository = relationship("Repository", back_populates="reviews")
-    # issues = relationship("Issue", back_populates="review")
+    repository = relationship("Repository", back_populates="reviews")
+    findings = relationship("ReviewFinding", back_populates="review")
 
     def __repr__(self):
-        return f"<Review {self.id} - {self.commit_sha[:7]}>"
+        return f"<Review {self.id} - {(self.commit_sha or 'unresolved')[:10]}>"
@@ -0,0 +1,29 @@
+"""
+Review finding membership model
+"""
+from sqlalchemy import Column, Integer, ForeignKey, Boolean, Index
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+
+class ReviewFinding(Base):
+    """Links a review to a finding it contains, with the per-review location"""
+
+    __tablename__ = "review_findings"
+
+    review_id = Column(Integer, ForeignKey("reviews.id"), primary_key=True)
+    finding_id = Column(Integer, ForeignKey("findings.id"), primary_key=True)
+    line_number = Column(Integer, nullable=True)  # lines shift between commits
+    in_diff = Column(Boolean, nullable=True)  # PR reviews: inside the changed hunks; NULL for full scans
+
+    __table_args__ = (
+        # Which reviews contain a finding (feedback, history)
+        Index("ix_review_findings_finding", "finding_id"),
+    )
+
+    # Relationships
+    review = relationship("Review", back_populates="findings")
+    finding = relationship("Finding", back_populates="review_links")
+
+    def __repr__(self):
+        return f"<ReviewFinding review={self.review_id} finding={self.finding_id}>"
@@ -0,0 +1,30 @@
+"""
+Risk node model - one row per file or directory in a repository's risk tree
+"""
+from sqlalchemy import Column, Integer, Float, Boolean, Text, ForeignKey, Index
+from app.core.database import Base
+
+
+class RiskNode(Base):
+    __tablename__ = "risk_nodes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    repository_id = Column(Integer, ForeignKey("repositories.id"), nullable=False)
+    path = Column(Text, nullable=False)  # '' is the repository root
+    parent_path = Column(Text, nullable=True)  # NULL only for the root
+    depth = Column(Integer, nullable=False)
+    is_file = Column(Boolean, nullable=False, default=False)
+    risk = Column(Float, nullable=False, default=0.0)  # this file's own weighted risk
+    subtree_risk = Column(Float, nullable=False, default=0.0)  # risk of everything below (incl. self)
+    subtree_issues = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index("ux_risk_nodes_repo_path", "repository_id", "path", unique=True),
+        # Drill-down: children of a directory ordered by risk
+        Index("ix_risk_nodes_repo_parent_risk", "repository_id", "parent_path", "subtree_risk"),
+        # Top-K hottest files in a repository
+        Index("ix_risk_nodes_repo_file_risk", "repository_id", "is_file", "risk"),
+    )
+
+    def __repr__(self):
+        return f"<RiskNode {self.repository_id}:{self.path or '/'} {self.subtree_risk:.1f}>"
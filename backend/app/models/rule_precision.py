@@ -0,0 +1,20 @@
+"""
+Rule precision model - per-repository feedback counts for each analyzer rule
+"""
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, func
+from app.core.database import Base
+
+
+class RulePrecision(Base):
+    __tablename__ = "rule_precision"
+
+    repository_id = Column(Integer, ForeignKey("repositories.id"), primary_key=True)
+    rule = Column(String, primary_key=True)  # static_rule_id, else issue_type
+    findings = Column(Integer, nullable=False, default=0)  # distinct findings the rule produced
+    false_positives = Column(Integer, nullable=False, default=0)  # of those, flagged by developers
+    precision = Column(Float, nullable=False)  # smoothed estimate, 0.0-1.0
+    suppressed = Column(Boolean, nullable=False, default=False)  # findings are dropped at ingestion
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self):
+        return f"<RulePrecision {self.repository_id} {self.rule} {self.precision:.2f}>"
@@ -20,6 +20,9 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
     last_login = Column(DateTime(timezone=True), nullable=True)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # bump to revoke issued JWTs
+    repos_synced_at = Column(DateTime(timezone=True), nullable=True)  # watermark for incremental repo sync
+    repos_full_synced_at = Column(DateTime(timezone=True), nullable=True)
 
     def __repr__(self):
         return f"<User {self.username}>"
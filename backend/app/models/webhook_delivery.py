@@ -0,0 +1,18 @@
+"""
+Webhook delivery model - remembers delivery ids so redeliveries are ignored
+"""
+from sqlalchemy import Column, Integer, String, DateTime, func
+from app.core.database import Base
+
+
+class WebhookDelivery(Base):
+    __tablename__ = "webhook_deliveries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    delivery_id = Column(String(64), unique=True, nullable=False, index=True)  # X-GitHub-Delivery
+    platform = Column(String(50), nullable=False)  # 'github', 'gitlab', 'bitbucket'
+    event = Column(String(50), nullable=True)
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    def __repr__(self):
+        return f"<WebhookDelivery {self.delivery_id}>"
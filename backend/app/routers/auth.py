@@ -3,13 +3,14 @@ Authentication routes - GitHub OAuth and JWT
 """
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.responses import RedirectResponse
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.auth import Principal, auth_cache, get_current_user as current_principal
+from app.core.database import get_async_db
 from app.core.config import settings
 from app.core.security import create_access_token
 from app.models.user import User
 from datetime import datetime
-import httpx
 
 router = APIRouter()
 
@@ -18,7 +19,7 @@ router = APIRouter()
 async def github_login():
     """Redirect to GitHub OAuth"""
     github_auth_url = (
-        f"https://github.com/login/oauth/authorize"
+        f"{settings.GITHUB_OAUTH_URL}/login/oauth/authorize"
         f"?client_id={settings.GITHUB_CLIENT_ID}"
         f"&redirect_uri={settings.GITHUB_REDIRECT_URI}"
         f"&scope=read:user,user:email,repo"
@@ -27,43 +28,39 @@ async def github_login():
 
 
 @router.get("/github/callback")
-async def github_callback(code: str, db: Session = Depends(get_db)):
+async def github_callback(code: str, db: AsyncSession = Depends(get_async_db)):
     """Handle GitHub OAuth callback"""
-    
+    from app.services.github_client import github
+
     # Exchange code for access token
-    async with httpx.AsyncClient() as client:
-        token_response = await client.post(
-            "https://github.com/login/oauth/access_token",
-            json={
-                "client_id": settings.GITHUB_CLIENT_ID,
-                "client_secret": settings.GITHUB_CLIENT_SECRET,
-                "code": code,
-                "redirect_uri": settings.GITHUB_REDIRECT_URI,
-            },
-            headers={"Accept": "application/json"},
-        )
-    
+    token_response = await github.post(
+        f"{settings.GITHUB_OAUTH_URL}/login/oauth/access_token",
+        json={
+            "client_id": settings.GITHUB_CLIENT_ID,
+            "client_secret": settings.GITHUB_CLIENT_SECRET,
+            "code": code,
+            "redirect_uri": settings.GITHUB_REDIRECT_URI,
+        },
+        headers={"Accept": "application/json"},
+    )
+
     token_data = token_response.json()
     access_token = token_data.get("access_token")
-    
+
     if not access_token:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Failed to get access token from GitHub"
         )
-    
+
     # Get user info from GitHub
-    async with httpx.AsyncClient() as client:
-        user_response = await client.get(
-            "https://api.github.com/user",
-            headers={"Authorization": f"Bearer {access_token}"},
-        )
-    
+    user_response = await github.get("/user", token=access_token)
+
     github_user = user_response.json()
-    
+
     # Check if user exists
-    user = db.query(User).filter(User.github_id == github_user["id"]).first()
-    
+    user = await db.scalar(select(User).where(User.github_id == github_user["id"]))
+
     if not user:
         # Create new user
         user = User(
@@ -75,8 +72,7 @@ async def github_callback(code: str, db: Session = Depends(get_db)):
             last_login=datetime.utcnow(),
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
     else:
         # Update user info and last login
         user.username = github_user["login"]
@@ -84,18 +80,43 @@ async def github_callback(code: str, db: Session = Depends(get_db)):
         user.avatar_url = github_user.get("avatar_url")
         user.access_token = access_token  # Update access token
         user.last_login = datetime.utcnow()
-        db.commit()
-    
+        await db.commit()
+        auth_cache.invalidate_user(user.id)  # cached claims may carry the old username
+
     # Create JWT token
-    jwt_token = create_access_token(data={"sub": str(user.id), "username": user.username})
-    
+    jwt_token = create_access_token(
+        data={"sub": str(user.id), "username": user.username, "ver": user.token_version or 0}
+    )
+
     # Redirect to frontend with token
     redirect_url = f"{settings.FRONTEND_URL}/dashboard?token={jwt_token}"
     return RedirectResponse(redirect_url)
 
 
 @router.get("/me")
-async def get_current_user(db: Session = Depends(get_db)):
+async def get_current_user(
+    principal: Principal = Depends(current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Get current user info"""
-    # TODO: Implement JWT token validation and user retrieval
-    return {"message": "Not implemented yet"}
+    user = await db.get(User, principal.id)
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "avatar_url": user.avatar_url,
+        "last_login": user.last_login.isoformat() if user.last_login else None,
+    }
+
+
+@router.post("/logout")
+async def logout(
+    principal: Principal = Depends(current_principal),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Revoke every token issued to the current user"""
+    user = await db.get(User, principal.id)
+    user.token_version = (user.token_version or 0) + 1
+    await db.commit()
+    auth_cache.invalidate_user(user.id)
+    return {"message": "Logged out", "status": "success"}
@@ -1,10 +1,15 @@
 """
 Dashboard and metrics routes
 """
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import Optional
-from app.core.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from datetime import datetime
+from app.core.auth import Principal, get_current_user, owned_repository, owned_repository_ids
+from app.core.database import get_async_db
+from app.core.config import settings
+from app.services import exports, risk_index, rollups, trends
 
 router = APIRouter()
 
@@ -13,62 +18,85 @@ router = APIRouter()
 async def get_metrics(
     repo_id: Optional[int] = Query(None),
     date_range: Optional[str] = Query("30d"),
-    db: Session = Depends(get_db)
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get dashboard metrics"""
-    # TODO: Implement metrics calculation
-    return {
-        "quality_score": 85,
-        "total_issues": 142,
-        "critical_issues": 3,
-        "high_issues": 12,
-        "medium_issues": 45,
-        "low_issues": 82,
-        "reviews_count": 89,
-        "avg_review_time": 120,
-        "false_positive_rate": 0.08,
-        "date_range": date_range
-    }
+    """Get dashboard metrics for one or all of the user's repositories (daily_metrics rollup)"""
+    if repo_id is not None:
+        await owned_repository(db, principal, repo_id)
+    try:
+        window = rollups.parse_date_range(date_range)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    since = (datetime.utcnow() - window).date()
+    repository_ids = [repo_id] if repo_id is not None else owned_repository_ids(principal)
+    metrics = await rollups.summarize(db, since, repository_ids)
+    return {**metrics, "date_range": date_range}
 
 
 @router.get("/heatmap")
 async def get_heatmap(
     repo_id: int = Query(...),
-    db: Session = Depends(get_db)
+    path: Optional[str] = Query(None, description="Directory to drill into; repository root when omitted"),
+    limit: int = Query(20, ge=1, le=200),
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get risk heatmap for repository"""
-    # TODO: Implement heatmap generation
-    return {
-        "repository_id": repo_id,
-        "hotspots": [],
-        "note": "Heatmap data will be generated after analysis"
-    }
+    """Get risk heatmap for repository (served from the risk_nodes tree)"""
+    await owned_repository(db, principal, repo_id)
+    heatmap = await risk_index.hotspots(db, repo_id, path=path, limit=limit)
+    return {"repository_id": repo_id, **heatmap}
 
 
 @router.get("/trends")
 async def get_trends(
     repo_id: int = Query(...),
-    db: Session = Depends(get_db)
+    bucket: str = Query("day", pattern="^(hour|day|week)$"),
+    date_range: str = Query("90d"),
+    points: int = Query(settings.TRENDS_DEFAULT_POINTS, ge=3, le=settings.TRENDS_MAX_POINTS),
+    downsample: str = Query("lttb", pattern="^(lttb|minmax|none)$"),
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get quality trends over time"""
-    # TODO: Implement trends calculation
-    return {
-        "repository_id": repo_id,
-        "trends": [],
-        "note": "Trend data will be available after multiple scans"
-    }
+    """Get quality trends over time (bucketed rollups, downsampled server-side)"""
+    await owned_repository(db, principal, repo_id)
+    try:
+        window = rollups.parse_date_range(date_range)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    series = await trends.trends(
+        db, repo_id, bucket, datetime.utcnow() - window, points, method=downsample
+    )
+    return {"repository_id": repo_id, "date_range": date_range, **series}
 
 
 @router.post("/export")
 async def export_report(
-    format: str = "pdf",
+    format: str = "ndjson",
     repo_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    severity: Optional[List[str]] = Query(None),
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Export dashboard report"""
-    # TODO: Implement report export (PDF/JSON)
-    return {
-        "message": "Report export",
-        "format": format,
-        "status": "not_implemented"
-    }
+    """Export the user's issues as a streamed NDJSON, JSON or CSV download"""
+    if format not in exports.MEDIA_TYPES:
+        # TODO: PDF reports
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format {format}; use one of {', '.join(exports.MEDIA_TYPES)}",
+        )
+
+    if repo_id is not None:
+        await owned_repository(db, principal, repo_id)
+    repository_ids = [repo_id] if repo_id is not None else owned_repository_ids(principal)
+    query = exports.export_query(repository_ids, since=since, until=until, severities=severity)
+    filename = f"sentinelcode-issues-{datetime.utcnow():%Y%m%d%H%M%S}.{format}"
+    return StreamingResponse(
+        exports.stream_issues(format, query),
+        media_type=exports.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,28 +1,83 @@
 """
 Repository management routes
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
+from dataclasses import asdict
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import TYPE_CHECKING, Optional
+from app.core.auth import Principal, get_current_user
+from app.core.database import get_async_db
+from app.models.repository import Repository
+from app.models.user import User
+from app.routers.webhooks import queue_full_response
+
+if TYPE_CHECKING:
+    from app.services.repo_sync import SyncStats
 
 router = APIRouter()
 
 
-@router.get("/")
-async def list_repositories(db: Session = Depends(get_db)):
-    """List all repositories for the authenticated user"""
-    # TODO: Implement user authentication
-    # TODO: Fetch repositories from database
+def serialize_repository(repository: Repository) -> dict:
     return {
-        "message": "Repository listing",
-        "repositories": [],
-        "note": "Will be implemented with GitHub integration"
+        "id": repository.id,
+        "platform": repository.platform,
+        "repo_name": repository.repo_name,
+        "repo_url": repository.repo_url,
+        "default_branch": repository.default_branch,
+        "is_enabled": repository.is_enabled,
+        "language_breakdown": repository.language_breakdown,
+        "last_scan_at": repository.last_scan_at.isoformat() if repository.last_scan_at else None,
     }
 
 
+@router.get("/")
+async def list_repositories(
+    sync: bool = Query(False, description="Pull changes from GitHub first"),
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List all repositories for the authenticated user"""
+    stats = None
+    if sync:
+        stats = await _sync(db, await db.get(User, principal.id), full=False)
+
+    repositories = (
+        await db.scalars(
+            select(Repository).where(Repository.user_id == principal.id).order_by(Repository.repo_name)
+        )
+    ).all()
+    response = {"repositories": [serialize_repository(repository) for repository in repositories]}
+    if stats is not None:
+        response["sync"] = asdict(stats)
+    return response
+
+
+@router.post("/sync")
+async def sync_repositories(
+    full: bool = Query(False, description="Ignore the watermark and page through everything"),
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Incrementally sync the user's repositories from GitHub"""
+    return asdict(await _sync(db, await db.get(User, principal.id), full=full))
+
+
+async def _sync(db: AsyncSession, user: User, full: bool) -> "SyncStats":
+    import httpx  # imported with the GitHub client, not at startup
+
+    from app.services import repo_sync
+
+    try:
+        return await repo_sync.sync_user_repositories(db, user, full=full)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except httpx.HTTPStatusError as exc:
+        raise HTTPException(status_code=502, detail=f"GitHub returned {exc.response.status_code}")
+
+
 @router.post("/{repo_id}/enable")
-async def enable_repository(repo_id: int, db: Session = Depends(get_db)):
+async def enable_repository(repo_id: int, db: AsyncSession = Depends(get_async_db)):
     """Enable monitoring for a repository"""
     # TODO: Implement repository enabling logic
     # TODO: Register webhook with GitHub
@@ -33,7 +88,7 @@ async def enable_repository(repo_id: int, db: Session = Depends(get_db)):
 
 
 @router.delete("/{repo_id}/disable")
-async def disable_repository(repo_id: int, db: Session = Depends(get_db)):
+async def disable_repository(repo_id: int, db: AsyncSession = Depends(get_async_db)):
     """Disable monitoring for a repository"""
     # TODO: Implement repository disabling logic
     # TODO: Unregister webhook from GitHub
@@ -44,12 +99,38 @@ async def disable_repository(repo_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/{repo_id}/scan")
-async def trigger_scan(repo_id: int, db: Session = Depends(get_db)):
+async def trigger_scan(
+    repo_id: int,
+    commit_sha: Optional[str] = Query(None, max_length=40),
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
     """Trigger a manual scan for a repository"""
-    # TODO: Implement manual scan trigger
-    # TODO: Queue analysis job
+    from app.services.job_queue import QueueFullError, enqueue_analysis, is_commit_sha
+
+    repository = await db.get(Repository, repo_id)
+    if repository is None or repository.user_id != principal.id:
+        raise HTTPException(status_code=404, detail="Repository not found")
+
+    # Without an explicit commit the worker resolves the default branch head
+    ref = commit_sha or repository.default_branch or "main"
+    if ref.startswith("-"):
+        # Would be read as an option by git fetch
+        raise HTTPException(status_code=422, detail="Invalid commit or branch name")
+    try:
+        review, created = await enqueue_analysis(
+            db,
+            repository_id=repository.id,
+            # A branch is resolved by the worker, which records the SHA it saw
+            commit_sha=ref if is_commit_sha(ref) else None,
+            kind="manual",
+            payload={"ref": ref},
+        )
+    except QueueFullError as exc:
+        raise queue_full_response(exc)
+
     return {
         "message": f"Scan triggered for repository {repo_id}",
-        "scan_id": "placeholder",
-        "status": "queued"
+        "scan_id": review.id,
+        "status": "queued" if created else "duplicate"
     }
@@ -1,49 +1,131 @@
 """
 Review routes
 """
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.core.database import get_db
+from app.core.auth import Principal, get_current_user, owned_repository, owned_repository_ids
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.models.review import Review
+from app.schemas.review import ReviewFeedback
+from app.services import review_queries
+from app.services.feedback import UnknownFindings, apply_feedback
 
 router = APIRouter()
 
 
+async def _owned_review(db: AsyncSession, principal: Principal, review_id: int) -> Optional[Review]:
+    """Review header (repository joined) if it belongs to one of the principal's repositories"""
+    review = await review_queries.get_review_header(db, review_id)
+    if review is None or review.repository.user_id != principal.id:
+        return None
+    return review
+
+
 @router.get("/")
 async def list_reviews(
     repo_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=settings.REVIEW_PAGE_SIZE_MAX),
+    include_total: bool = Query(False),
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """List reviews with optional filters"""
-    # TODO: Implement review listing with filters
-    return {
-        "message": "Review listing",
-        "reviews": [],
+    """List the user's reviews with optional filters, newest first (keyset paginated)"""
+    if repo_id is not None:
+        await owned_repository(db, principal, repo_id)
+        repository_ids = [repo_id]
+    else:
+        repository_ids = owned_repository_ids(principal)
+    try:
+        reviews, next_cursor = await review_queries.list_reviews(
+            db, repository_ids, status=status, cursor=cursor, limit=limit
+        )
+    except review_queries.InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    response = {
+        "reviews": [review_queries.serialize_review(review) for review in reviews],
+        "next_cursor": next_cursor,
         "filters": {
             "repo_id": repo_id,
             "status": status
         }
     }
+    if include_total:
+        total, exact = await review_queries.estimate_total(db, repository_ids, status=status)
+        response["total"] = total
+        response["total_is_exact"] = exact
+    return response
 
 
 @router.get("/{review_id}")
-async def get_review(review_id: int, db: Session = Depends(get_db)):
-    """Get detailed review with issues"""
-    # TODO: Implement review details retrieval
+async def get_review(
+    review_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get detailed review with issues grouped by file and severity"""
+    review = await _owned_review(db, principal, review_id)
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    etag = review_queries.review_etag(review)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if review_queries.etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
     return {
-        "message": f"Review {review_id} details",
-        "review": {},
-        "issues": []
+        "review": review_queries.serialize_review_detail(review),
+        "files": await review_queries.grouped_issues(db, review_id)
     }
 
 
-@router.post("/{review_id}/feedback")
-async def submit_feedback(review_id: int, db: Session = Depends(get_db)):
-    """Submit developer feedback on a review"""
-    # TODO: Implement feedback submission
-    # TODO: Update learning model
+@router.get("/{review_id}/changes")
+async def get_review_changes(
+    review_id: int,
+    base: Optional[int] = Query(None, description="Review to compare against; defaults to the previous completed one"),
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Findings new in, fixed by and persisting through a review"""
+    review = await _owned_review(db, principal, review_id)
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    if base is None:
+        base = await review_queries.previous_review_id(db, review)
+    else:
+        base_review = await review_queries.get_review_header(db, base)
+        if not base_review or base_review.repository_id != review.repository_id:
+            raise HTTPException(status_code=400, detail="Base review must belong to the same repository")
+
     return {
-        "message": f"Feedback submitted for review {review_id}",
-        "status": "success"
+        "review_id": review_id,
+        **await review_queries.review_changes(db, review, base)
     }
+
+
+@router.post("/{review_id}/feedback")
+async def submit_feedback(
+    review_id: int,
+    feedback: ReviewFeedback,
+    principal: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Flag or unflag findings of one of the user's reviews as false positives"""
+    review = await _owned_review(db, principal, review_id)
+    if not review:
+        raise HTTPException(status_code=404, detail="Review not found")
+
+    changes = {item.finding_id: item.false_positive for item in feedback.findings}
+    try:
+        result = await apply_feedback(db, review, changes)
+    except UnknownFindings as exc:
+        raise HTTPException(status_code=400, detail=f"Findings not in review {review_id}: {exc.args[0]}")
+    return {"review_id": review_id, **result}
@@ -1,59 +1,175 @@
 """
 Webhook routes for GitHub, GitLab, Bitbucket
 """
-from fastapi import APIRouter, Request, HTTPException, Header
-from typing import Optional
-import hmac
-import hashlib
+from fastapi import APIRouter, Depends, Request, HTTPException, Header, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import TYPE_CHECKING, Optional
+import logging
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.models.repository import Repository
+from app.models.webhook_delivery import WebhookDelivery
+from app.services.webhook_intake import (
+    GitHubEvent,
+    InvalidPayload,
+    PayloadTooLarge,
+    parse_github_event,
+    read_body,
+    verify_github_signature,
+)
+
+if TYPE_CHECKING:
+    from app.services.job_queue import QueueFullError  # the queue is imported by the handlers
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+HANDLED_GITHUB_EVENTS = ("push", "pull_request")
+HANDLED_PR_ACTIONS = ("opened", "synchronize", "reopened")
+
+
+async def find_github_repository(db: AsyncSession, event: GitHubEvent) -> Optional[Repository]:
+    """Resolve the enabled repository a GitHub event belongs to.
+
+    Synced repositories are matched on GitHub's repository id; ones added
+    before sync existed only have their URL.
+    """
+    base = select(Repository).where(
+        Repository.platform == "github",
+        Repository.is_enabled.is_(True),
+    )
+    if event.repo_id is not None:
+        repository = await db.scalar(base.where(Repository.external_id == event.repo_id).limit(1))
+        if repository is not None:
+            return repository
+    if not event.repo_url:
+        return None
+    return await db.scalar(base.where(Repository.repo_url == event.repo_url).limit(1))
 
-def verify_github_signature(payload: bytes, signature: str, secret: str) -> bool:
-    """Verify GitHub webhook signature"""
-    if not signature:
+
+def check_github_signature(body: bytes, signature: Optional[str]) -> None:
+    """Reject unsigned or forged deliveries; unsigned is tolerated outside production without a secret"""
+    if settings.GITHUB_WEBHOOK_SECRET:
+        if not verify_github_signature(body, signature, settings.GITHUB_WEBHOOK_SECRET):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid signature")
+    elif settings.ENV == "production":
+        logger.error("GITHUB_WEBHOOK_SECRET is not set; rejecting webhook")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Webhook secret not configured")
+
+
+async def claim_delivery(db: AsyncSession, delivery_id: Optional[str], platform: str, event: Optional[str]) -> bool:
+    """Record a delivery id; False if it was already processed.
+
+    The row is only flushed here so it commits together with the queued job -
+    a delivery rejected with 429 can still be redelivered later.
+    """
+    if not delivery_id:
+        return True
+    db.add(WebhookDelivery(delivery_id=delivery_id, platform=platform, event=event))
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
         return False
-    
-    expected_signature = "sha256=" + hmac.new(
-        secret.encode(),
-        payload,
-        hashlib.sha256
-    ).hexdigest()
-    
-    return hmac.compare_digest(expected_signature, signature)
+    return True
+
+
+def queue_full_response(exc: "QueueFullError") -> HTTPException:
+    """429 telling the sender (GitHub or the dashboard) when to retry"""
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Analysis queue is full, retry later",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 
 @router.post("/github")
 async def github_webhook(
     request: Request,
     x_hub_signature_256: Optional[str] = Header(None),
-    x_github_event: Optional[str] = Header(None)
+    x_github_event: Optional[str] = Header(None),
+    x_github_delivery: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Handle GitHub webhook events"""
-    # Get raw body for signature verification
-    body = await request.body()
-    
-    # TODO: Verify signature in production
-    # if not verify_github_signature(body, x_hub_signature_256, settings.GITHUB_WEBHOOK_SECRET):
-    #     raise HTTPException(status_code=401, detail="Invalid signature")
-    
-    # Parse payload
-    payload = await request.json()
-    
-    # Handle different event types
-    if x_github_event == "push":
-        # TODO: Handle push event
-        # TODO: Queue analysis job
-        return {"message": "Push event received", "status": "queued"}
-    
-    elif x_github_event == "pull_request":
-        # TODO: Handle PR event
-        # TODO: Queue analysis job
-        return {"message": "Pull request event received", "status": "queued"}
-    
-    else:
+    from app.services.job_queue import QueueFullError, enqueue_analysis, is_commit_sha
+
+    if x_github_event not in HANDLED_GITHUB_EVENTS:
+        # Decided from the header alone: the body is never read
         return {"message": f"Event {x_github_event} ignored"}
 
+    try:
+        body = await read_body(request)
+    except PayloadTooLarge:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Payload too large")
+    check_github_signature(body, x_hub_signature_256)
+    try:
+        event = parse_github_event(x_github_event, body)
+    except InvalidPayload as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    del body
+
+    if x_github_event == "pull_request" and event.action not in HANDLED_PR_ACTIONS:
+        return {"message": f"Pull request action {event.action} ignored"}
+
+    repository = await find_github_repository(db, event)
+    if repository is None:
+        return {"message": "Repository not monitored", "status": "ignored"}
+
+    if not await claim_delivery(db, x_github_delivery, "github", x_github_event):
+        return {"message": "Duplicate delivery ignored", "status": "duplicate"}
+
+    # Handle different event types
+    try:
+        if x_github_event == "push":
+            if event.deleted or not event.after:
+                await db.commit()
+                return {"message": "Branch deletion ignored", "status": "ignored"}
+            if not is_commit_sha(event.after):
+                await db.commit()
+                return {"message": "Push without a commit SHA ignored", "status": "ignored"}
+            review, created = await enqueue_analysis(
+                db,
+                repository_id=repository.id,
+                commit_sha=event.after,
+                kind="push",
+                payload={"ref": event.ref, "before": event.before},
+                coalesce_key=f"ref:{event.ref}",
+            )
+            return {
+                "message": "Push event received",
+                "status": "queued" if created else "duplicate",
+                "review_id": review.id,
+            }
+
+        if event.pr_number is None or not is_commit_sha(event.head_sha):
+            # Both key the review: the coalescing key and the commit it analyzes
+            await db.commit()
+            return {"message": "Pull request without number or head commit ignored", "status": "ignored"}
+        review, created = await enqueue_analysis(
+            db,
+            repository_id=repository.id,
+            commit_sha=event.head_sha,
+            kind="pull_request",
+            pr_number=event.pr_number,
+            pr_url=event.pr_url,
+            payload={
+                "ref": event.head_ref,
+                "base_sha": event.base_sha if is_commit_sha(event.base_sha) else None,
+            },
+            coalesce_key=f"pr:{event.pr_number}",
+        )
+        return {
+            "message": "Pull request event received",
+            "status": "queued" if created else "duplicate",
+            "review_id": review.id,
+        }
+    except QueueFullError as exc:
+        raise queue_full_response(exc)
+
 
 @router.post("/gitlab")
 async def gitlab_webhook(request: Request):
@@ -0,0 +1,15 @@
+"""
+Review request schemas
+"""
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class FindingFeedback(BaseModel):
+    finding_id: int
+    false_positive: bool
+
+
+class ReviewFeedback(BaseModel):
+    findings: List[FindingFeedback] = Field(..., min_length=1, max_length=1000)
@@ -0,0 +1,78 @@
+"""
+AI reasoning backends
+
+A backend turns one prompt into one completion for a given model. The
+scheduler (``ai_scheduler.py``) owns batching, caching and concurrency, so a
+backend only has to talk to its provider. ``StubBackend`` is a deterministic,
+offline stand-in that answers in the response format the scheduler expects;
+it is the default and is what tests and benchmarks run against.
+"""
+import asyncio
+import hashlib
+import json
+import re
+from typing import Dict, Optional, Type
+
+# "### <item id>" headers the scheduler puts in front of every packed item
+ITEM_HEADER = re.compile(r"^### (\S+)$", re.MULTILINE)
+
+
+class AIBackend:
+    """Base backend; subclasses implement ``complete``"""
+    name = ""
+
+    def __init__(self, model: str, options: Optional[dict] = None):
+        self.model = model
+        self.options = options or {}
+
+    def count_tokens(self, text: str) -> int:
+        """Token estimate used for packing (about four characters per token)"""
+        return len(text) // 4 + 1
+
+    async def complete(self, prompt: str) -> str:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        pass
+
+
+class StubBackend(AIBackend):
+    """Deterministic verdicts derived from a hash of each item's text.
+
+    Options: ``latency_seconds`` (per call) and ``seconds_per_1k_tokens``
+    simulate a remote model for benchmarks.
+    """
+    name = "stub"
+
+    async def complete(self, prompt: str) -> str:
+        delay = float(self.options.get("latency_seconds", 0.0))
+        delay += self.count_tokens(prompt) / 1000 * float(self.options.get("seconds_per_1k_tokens", 0.0))
+        if delay:
+            await asyncio.sleep(delay)
+
+        headers = list(ITEM_HEADER.finditer(prompt))
+        verdicts = []
+        for index, header in enumerate(headers):
+            end = headers[index + 1].start() if index + 1 < len(headers) else len(prompt)
+            digest = hashlib.sha256(prompt[header.end():end].strip().encode()).digest()
+            confidence = round(digest[0] / 255, 2)
+            verdicts.append({
+                "id": header.group(1),
+                "verdict": "confirm" if confidence >= 0.3 else "dismiss",
+                "confidence": confidence,
+                "explanation": f"{self.model} stub verdict",
+            })
+        return json.dumps(verdicts)
+
+
+BACKENDS: Dict[str, Type[AIBackend]] = {
+    backend.name: backend
+    for backend in (StubBackend,)
+}
+
+
+def get_backend(name: str, model: str, options: Optional[dict] = None) -> AIBackend:
+    try:
+        return BACKENDS[name](model, options)
+    except KeyError:
+        raise ValueError(f"Unknown AI backend: {name}")
@@ -0,0 +1,430 @@
+"""
+Token-budgeted scheduling of the AI reasoning stage
+
+Candidate findings are rendered to item prompts without their file path, so
+the same rule firing on the same code is one item whatever review, file or
+repository it came from. Each item's verdict is cached under the hash of its
+prompt (model and ``PROMPT_VERSION`` included), and items a concurrent review
+is already waiting on are shared instead of sent twice. The remaining items
+are packed first-fit-decreasing into prompts of at most
+``AI_PROMPT_MAX_TOKENS``, and each model runs at most
+``AI_MAX_CONCURRENCY_PER_MODEL`` prompts at a time.
+
+A failed or unparsable completion leaves its items unanswered and uncached;
+the static findings stand and a later review asks again.
+
+Answers are stored on the finding (``ai_verdict``, ``ai_explanation``) and
+``confidence_score`` becomes the model's confidence that the finding is a
+real problem, so a sure dismissal scores near 0. Dismissals at least
+``AI_DISMISS_MIN_CONFIDENCE`` sure are left out of the review's counters
+(and so its quality score and the rollups) like false positives, but are
+not treated as developer feedback.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.ai_verdict import AIVerdictCacheEntry
+from app.models.finding import Finding
+from app.models.review_finding import ReviewFinding
+from app.services.ai_backends import AIBackend, get_backend
+from app.services.fingerprint import LineReader
+from app.utils.sql import chunked, dialect_insert
+
+logger = logging.getLogger(__name__)
+
+# Bump when INSTRUCTIONS or the item layout change; old cache entries stop matching
+PROMPT_VERSION = "1"
+INSTRUCTIONS = (
+    "You review findings reported by static analyzers. For every item below, decide whether it is "
+    'a real problem ("confirm") or a false positive ("dismiss").\n'
+    "Answer with only a JSON array holding one object per item: "
+    '{"id": "<item id>", "verdict": "confirm" or "dismiss", "confidence": 0.0-1.0, '
+    '"explanation": "<one sentence>"}.\n\n'
+)
+VERDICTS = ("confirm", "dismiss")
+# Characters of item id shown to the model; unique enough within one prompt
+ITEM_ID_LENGTH = 16
+LOOKUP_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """A finding as the model sees it"""
+    finding_id: int
+    rule: str
+    title: str
+    severity: str
+    language: str
+    code: str
+
+
+@dataclass
+class PackedItem:
+    key: str  # prompt hash
+    text: str
+    tokens: int  # prompt tokens plus the expected answer
+
+
+@dataclass
+class AIStats:
+    """Counters for one run of the reasoning stage"""
+    candidates: int = 0
+    unique: int = 0
+    cache_hits: int = 0
+    shared: int = 0
+    prompts: int = 0
+    prompt_tokens: int = 0
+    answered: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+def render_item(candidate: Candidate, max_tokens: int) -> str:
+    code = candidate.code[: max_tokens * 4]
+    return (
+        f"Rule: {candidate.rule}\n"
+        f"Severity: {candidate.severity}\n"
+        f"Finding: {candidate.title}\n"
+        f"Language: {candidate.language}\n"
+        f"```\n{code}\n```"
+    )
+
+
+def prompt_hash(model: str, item: str) -> str:
+    return hashlib.sha256(f"{PROMPT_VERSION}\x1f{model}\x1f{item}".encode()).hexdigest()
+
+
+def pack(items: List[PackedItem], budget: int, max_items: int) -> List[List[PackedItem]]:
+    """First-fit-decreasing bins of at most ``budget`` tokens and ``max_items`` items.
+
+    An item larger than the budget gets a prompt of its own.
+    """
+    batches: List[List[PackedItem]] = []
+    loads: List[int] = []
+    for item in sorted(items, key=lambda item: (-item.tokens, item.key)):
+        for index, batch in enumerate(batches):
+            if len(batch) < max_items and loads[index] + item.tokens <= budget:
+                batch.append(item)
+                loads[index] += item.tokens
+                break
+        else:
+            batches.append([item])
+            loads.append(item.tokens)
+    return batches
+
+
+def build_prompt(batch: List[PackedItem]) -> str:
+    return INSTRUCTIONS + "\n\n".join(f"### {item.key[:ITEM_ID_LENGTH]}\n{item.text}" for item in batch)
+
+
+def parse_verdicts(text: str, batch: List[PackedItem]) -> Dict[str, dict]:
+    """``{prompt hash: verdict}`` for the well-formed answers in a completion"""
+    start, end = text.find("["), text.rfind("]")
+    try:
+        answers = json.loads(text[start:end + 1]) if start != -1 else []
+    except ValueError:
+        return {}
+    keys = {item.key[:ITEM_ID_LENGTH]: item.key for item in batch}
+    verdicts: Dict[str, dict] = {}
+    for answer in answers if isinstance(answers, list) else []:
+        if not isinstance(answer, dict) or answer.get("verdict") not in VERDICTS:
+            continue
+        key = keys.get(str(answer.get("id")))
+        try:
+            confidence = min(1.0, max(0.0, float(answer.get("confidence"))))
+        except (TypeError, ValueError):
+            continue
+        if key is not None:
+            verdicts[key] = {
+                "verdict": answer["verdict"],
+                "confidence": confidence,
+                "explanation": str(answer.get("explanation") or "")[:500],
+            }
+    return verdicts
+
+
+class AIScheduler:
+    """Backends, per-model concurrency limits and in-flight items of this process"""
+
+    def __init__(self):
+        self._backends: Dict[str, AIBackend] = {}
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def backend(self, model: str) -> AIBackend:
+        backend = self._backends.get(model)
+        if backend is None:
+            backend = self._backends[model] = get_backend(
+                settings.AI_BACKEND, model, settings.AI_BACKEND_OPTIONS.get(settings.AI_BACKEND)
+            )
+        return backend
+
+    def _limit(self, model: str) -> asyncio.Semaphore:
+        limit = self._limits.get(model)
+        if limit is None:
+            limit = self._limits[model] = asyncio.Semaphore(
+                settings.AI_MODEL_CONCURRENCY.get(model, settings.AI_MAX_CONCURRENCY_PER_MODEL)
+            )
+        return limit
+
+    async def evaluate(
+        self, candidates: Iterable[Candidate], model: Optional[str] = None, stats: Optional[AIStats] = None
+    ) -> Dict[int, dict]:
+        """``{finding id: verdict}`` for every candidate the model answered"""
+        model = model or settings.AI_MODEL
+        stats = stats if stats is not None else AIStats()
+        backend = self.backend(model)
+
+        keys: Dict[int, str] = {}
+        items: Dict[str, str] = {}
+        for candidate in candidates:
+            text = render_item(candidate, settings.AI_ITEM_MAX_TOKENS)
+            key = keys[candidate.finding_id] = prompt_hash(model, text)
+            items.setdefault(key, text)
+        stats.candidates += len(keys)
+        stats.unique += len(items)
+        if not items:
+            return {}
+
+        verdicts = await asyncio.to_thread(_cached_verdicts, list(items))
+        stats.cache_hits += len(verdicts)
+        shared = {key: self._inflight[key] for key in items if key not in verdicts and key in self._inflight}
+        stats.shared += len(shared)
+
+        loop = asyncio.get_running_loop()
+        owned: Dict[str, asyncio.Future] = {}
+        for key in items:
+            if key not in verdicts and key not in shared:
+                owned[key] = self._inflight[key] = loop.create_future()
+        try:
+            if owned:
+                per_answer = settings.AI_RESPONSE_TOKENS_PER_ITEM
+                packed = [PackedItem(key, items[key], backend.count_tokens(items[key]) + per_answer) for key in owned]
+                budget = settings.AI_PROMPT_MAX_TOKENS - backend.count_tokens(INSTRUCTIONS)
+                batches = pack(packed, budget, settings.AI_BATCH_MAX_ITEMS)
+                for answered in await asyncio.gather(*(self._run(backend, batch, owned, stats) for batch in batches)):
+                    verdicts.update(answered)
+        finally:
+            for key, future in owned.items():
+                self._inflight.pop(key, None)
+                if not future.done():
+                    future.set_result(None)  # unanswered; sharers get nothing either
+
+        for key, future in shared.items():
+            verdict = await asyncio.shield(future)
+            if verdict is not None:
+                verdicts[key] = verdict
+        stats.answered += sum(1 for key in keys.values() if key in verdicts)
+        return {finding_id: verdicts[key] for finding_id, key in keys.items() if key in verdicts}
+
+    async def _run(
+        self, backend: AIBackend, batch: List[PackedItem], owned: Dict[str, asyncio.Future], stats: AIStats
+    ) -> Dict[str, dict]:
+        prompt = build_prompt(batch)
+        async with self._limit(backend.model):
+            try:
+                text = await asyncio.wait_for(backend.complete(prompt), settings.AI_REQUEST_TIMEOUT_SECONDS)
+            except Exception as exc:
+                stats.errors.append(f"{backend.model}: {exc!r}")
+                logger.warning("AI prompt of %d items failed on %s: %r", len(batch), backend.model, exc)
+                return {}
+        stats.prompts += 1
+        stats.prompt_tokens += backend.count_tokens(prompt)
+
+        verdicts = parse_verdicts(text, batch)
+        if len(verdicts) < len(batch):
+            logger.warning("%s answered %d of %d items", backend.model, len(verdicts), len(batch))
+        if verdicts:
+            await asyncio.to_thread(_store_verdicts, backend.model, verdicts)
+        for key, verdict in verdicts.items():
+            owned[key].set_result(verdict)
+        return verdicts
+
+    async def aclose(self) -> None:
+        for backend in self._backends.values():
+            await backend.aclose()
+        self._backends.clear()
+        self._limits.clear()
+
+
+ai_scheduler = AIScheduler()
+
+
+async def run_ai_stage(review_id: int, read_line: Optional[LineReader] = None) -> AIStats:
+    """Ask the model about the review's not yet reasoned-over findings.
+
+    Answered findings become ``source='hybrid'`` with the model's verdict;
+    findings already reasoned over in an earlier review are not sent again.
+    """
+    stats = AIStats()
+    candidates = await asyncio.to_thread(_load_candidates, review_id, read_line)
+    verdicts = await ai_scheduler.evaluate(candidates, stats=stats)
+    if verdicts:
+        await asyncio.to_thread(_apply_verdicts, verdicts)
+    await asyncio.to_thread(_evict_verdicts)
+    logger.info("AI stage for review %s: %s", review_id, stats)
+    return stats
+
+
+def _context(read_line: Optional[LineReader], file_path: str, line_number: Optional[int]) -> str:
+    if read_line is None or not line_number:
+        return ""
+    radius = settings.AI_CONTEXT_LINES
+    lines = (read_line(file_path, number) for number in range(max(1, line_number - radius), line_number + radius + 1))
+    return "\n".join(line for line in lines if line is not None)
+
+
+def _load_candidates(review_id: int, read_line: Optional[LineReader]) -> List[Candidate]:
+    severity_rank = case(
+        *((Finding.severity == severity, rank) for rank, severity in enumerate(("critical", "high", "medium", "low"))),
+        else_=4,
+    )
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(
+                Finding.id,
+                Finding.static_rule_id,
+                Finding.issue_type,
+                Finding.title,
+                Finding.severity,
+                Finding.file_path,
+                Finding.code_snippet,
+                ReviewFinding.line_number,
+            )
+            .select_from(ReviewFinding)
+            .join(Finding, Finding.id == ReviewFinding.finding_id)
+            .where(
+                ReviewFinding.review_id == review_id,
+                ReviewFinding.in_diff.isnot(False),
+                Finding.source == "static_analysis",
+                Finding.is_false_positive.isnot(True),
+            )
+            .order_by(severity_rank, Finding.id)
+            .limit(settings.AI_MAX_CANDIDATES_PER_REVIEW)
+        ).all()
+    finally:
+        db.close()
+
+    return [
+        Candidate(
+            finding_id=row.id,
+            rule=row.static_rule_id or row.issue_type,
+            title=row.title,
+            severity=row.severity,
+            language=os.path.splitext(row.file_path)[1].lstrip(".") or "text",
+            code=row.code_snippet or _context(read_line, row.file_path, row.line_number),
+        )
+        for row in rows
+    ]
+
+
+def verdict_values(verdict: dict) -> dict:
+    """Finding columns for a model verdict; confidence is that the finding is real"""
+    confidence = verdict["confidence"]
+    return {
+        "source": "hybrid",
+        "ai_verdict": verdict["verdict"],
+        "ai_explanation": verdict.get("explanation") or None,
+        "confidence_score": confidence if verdict["verdict"] == "confirm" else round(1.0 - confidence, 4),
+    }
+
+
+def _apply_verdicts(verdicts: Dict[int, dict]) -> None:
+    db = SessionLocal()
+    try:
+        rows = [{"id": finding_id, **verdict_values(verdict)} for finding_id, verdict in verdicts.items()]
+        for batch in chunked(rows, LOOKUP_BATCH_SIZE):
+            db.execute(update(Finding), batch)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _cached_verdicts(keys: List[str]) -> Dict[str, dict]:
+    db = SessionLocal()
+    try:
+        hits = get_many(db, keys)
+        db.commit()
+        return hits
+    finally:
+        db.close()
+
+
+def _store_verdicts(model: str, verdicts: Dict[str, dict]) -> None:
+    db = SessionLocal()
+    try:
+        put_many(db, model, verdicts)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _evict_verdicts() -> None:
+    db = SessionLocal()
+    try:
+        evict(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def get_many(db: Session, keys: Iterable[str]) -> Dict[str, dict]:
+    """Cached verdicts by prompt hash; hits are touched for LRU"""
+    hits: Dict[str, dict] = {}
+    for batch in chunked(sorted(set(keys)), LOOKUP_BATCH_SIZE):
+        rows = db.execute(
+            select(AIVerdictCacheEntry.id, AIVerdictCacheEntry.prompt_hash, AIVerdictCacheEntry.verdict)
+            .where(AIVerdictCacheEntry.prompt_hash.in_(batch))
+        ).all()
+        if not rows:
+            continue
+        hits.update({row.prompt_hash: row.verdict for row in rows})
+        db.execute(
+            update(AIVerdictCacheEntry)
+            .where(AIVerdictCacheEntry.id.in_([row.id for row in rows]))
+            .values(last_used_at=datetime.utcnow(), hit_count=AIVerdictCacheEntry.hit_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+    return hits
+
+
+def put_many(db: Session, model: str, verdicts: Dict[str, dict]) -> None:
+    now = datetime.utcnow()
+    rows = [
+        {
+            "prompt_hash": key,
+            "model": model,
+            "verdict": verdict,
+            "hit_count": 0,
+            "last_used_at": now,
+            "created_at": now,
+        }
+        for key, verdict in verdicts.items()
+    ]
+    for batch in chunked(rows, LOOKUP_BATCH_SIZE):
+        db.execute(dialect_insert(db, AIVerdictCacheEntry).values(batch).on_conflict_do_nothing())
+
+
+def evict(db: Session) -> int:
+    """Drop least-recently-used verdicts beyond ``AI_CACHE_MAX_ENTRIES``"""
+    excess = db.scalar(select(func.count(AIVerdictCacheEntry.id))) - settings.AI_CACHE_MAX_ENTRIES
+    if excess <= 0:
+        return 0
+    victims = (
+        select(AIVerdictCacheEntry.id)
+        .order_by(AIVerdictCacheEntry.last_used_at, AIVerdictCacheEntry.id)
+        .limit(excess)
+        .scalar_subquery()
+    )
+    return db.query(AIVerdictCacheEntry).filter(AIVerdictCacheEntry.id.in_(victims)).delete(synchronize_session=False)
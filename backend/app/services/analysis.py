@@ -0,0 +1,98 @@
+"""
+Review analysis pipeline
+
+Runs inside the job queue workers, never inside a request handler. The
+stage modules are imported when the first review runs (or by the startup
+warm-up), so importing this module for its types stays cheap.
+"""
+import asyncio
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.repository import Repository
+from app.models.review import Review
+from app.models.user import User
+from app.services.issue_ingest import clear_review, recompute_review_counters
+
+if TYPE_CHECKING:
+    from app.services.analyzer_runner import RunStats
+
+# Penalty per issue for the 0-100 quality score (see DEVELOPMENT_GUIDE.md, Stage 6)
+SEVERITY_WEIGHTS = {"critical": 10, "high": 5, "medium": 2, "low": 1}
+
+
+@dataclass
+class AnalysisContext:
+    """Snapshot of a claimed job handed to the analysis pipeline"""
+    job_id: int
+    review_id: int
+    repository_id: int
+    kind: str
+    commit_sha: Optional[str]  # None for manual scans of a branch; the ref is in payload
+    attempt: int
+    pr_number: Optional[int] = None
+    payload: dict = field(default_factory=dict)
+
+
+def calculate_quality_score(severity_counts: dict) -> int:
+    """Weighted score: 100 - (critical*10 + high*5 + medium*2 + low*1), floored at 0"""
+    penalty = sum(severity_counts.get(severity, 0) * weight for severity, weight in SEVERITY_WEIGHTS.items())
+    return max(0, 100 - penalty)
+
+
+async def analyze_review(ctx: AnalysisContext) -> None:
+    """Run the analysis stages for a review.
+
+    Raising an exception marks the attempt as failed; the job queue decides
+    whether to retry it or fail the review.
+    """
+    from app.services.ai_scheduler import run_ai_stage
+    from app.services.analyzer_runner import run_analyzers
+    from app.services.checkout import checkout_commit
+    from app.services.diff_scope import build_scope
+    from app.services.fingerprint import file_line_reader
+
+    repo_url, token = await asyncio.to_thread(_prepare, ctx.review_id, ctx.repository_id)
+    ref = ctx.payload.get("ref") if ctx.kind == "manual" else ctx.commit_sha
+
+    async with checkout_commit(repo_url, ref, token) as checkout:
+        files = await checkout.files()
+        scope = None
+        base_sha = ctx.payload.get("base_sha")
+        if ctx.kind == "pull_request" and base_sha:
+            diff = await checkout.diff(base_sha)
+            scope = build_scope(diff, files.keys(), checkout.read_text)
+        stats = await run_analyzers(ctx.review_id, checkout.root, files, scope)
+        if settings.AI_REVIEW_ENABLED:
+            await run_ai_stage(ctx.review_id, file_line_reader(checkout.root))
+
+    await asyncio.to_thread(_record_results, ctx.review_id, checkout.sha, stats)
+
+
+def _prepare(review_id: int, repository_id: int) -> Tuple[str, Optional[str]]:
+    """Clear findings of an earlier failed attempt; return clone URL and token"""
+    db = SessionLocal()
+    try:
+        clear_review(db, review_id)
+        db.commit()
+        repository = db.get(Repository, repository_id)
+        owner = db.get(User, repository.user_id)
+        return repository.repo_url, owner.access_token if owner else None
+    finally:
+        db.close()
+
+
+def _record_results(review_id: int, commit_sha: str, stats: "RunStats") -> None:
+    db = SessionLocal()
+    try:
+        # One aggregate over everything the batches stored
+        severity_counts = recompute_review_counters(db, review_id)
+        review = db.get(Review, review_id)
+        review.quality_score = calculate_quality_score(severity_counts)
+        # Manual scans of a branch are queued without a SHA; keep the commit they saw
+        review.commit_sha = commit_sha
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,184 @@
+"""
+Content-addressed analysis result cache
+
+Findings are stored per (git blob SHA, analyzer name + version, rule-set
+hash). A file whose content did not change since any earlier review - in any
+branch or repository - reuses the stored findings instead of running the
+analyzer again. Entries are evicted least-recently-used once the table grows
+past ``ANALYSIS_CACHE_MAX_ENTRIES`` rows or ``ANALYSIS_CACHE_MAX_BYTES``.
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.analysis_cache import AnalysisCacheEntry
+from app.utils.sql import chunked, dialect_insert
+
+# Keeps IN (...) lists well below driver parameter limits
+LOOKUP_BATCH_SIZE = 500
+# Evict down to this fraction of the limits so eviction does not run on every put
+EVICTION_LOW_WATERMARK = 0.9
+
+# Finding columns a cached finding may carry; review_id and file_path come from
+# the review being built since the same blob can live at many paths
+FINDING_FIELDS = (
+    "line_number",
+    "issue_type",
+    "severity",
+    "title",
+    "description",
+    "fix_suggestion",
+    "code_snippet",
+    "confidence_score",
+    "source",
+    "static_rule_id",
+)
+
+
+@dataclass(frozen=True)
+class AnalyzerIdentity:
+    """Everything besides file content that determines an analyzer's output"""
+    name: str
+    version: str
+    ruleset_hash: str
+
+
+def git_blob_sha(content: bytes) -> str:
+    """SHA-1 git assigns to a blob with this content (``git hash-object``)"""
+    header = f"blob {len(content)}\0".encode()
+    return hashlib.sha1(header + content).hexdigest()
+
+
+def ruleset_hash(config: Optional[dict]) -> str:
+    """Stable hash of an analyzer's effective rule configuration"""
+    canonical = json.dumps(config or {}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def normalize_findings(findings: Iterable[dict]) -> List[dict]:
+    """Strip findings down to the path-independent finding fields"""
+    return [
+        {key: finding.get(key) for key in FINDING_FIELDS if finding.get(key) is not None}
+        for finding in findings
+    ]
+
+
+def get_many(db: Session, analyzer: AnalyzerIdentity, blob_shas: Iterable[str]) -> Dict[str, List[dict]]:
+    """Cached findings for every blob that has an entry; misses are absent.
+
+    Hits are touched for LRU in one UPDATE per batch.
+    """
+    hits: Dict[str, List[dict]] = {}
+    for batch in chunked(sorted(set(blob_shas)), LOOKUP_BATCH_SIZE):
+        rows = (
+            db.query(AnalysisCacheEntry.id, AnalysisCacheEntry.blob_sha, AnalysisCacheEntry.findings)
+            .filter(
+                AnalysisCacheEntry.analyzer == analyzer.name,
+                AnalysisCacheEntry.analyzer_version == analyzer.version,
+                AnalysisCacheEntry.ruleset_hash == analyzer.ruleset_hash,
+                AnalysisCacheEntry.blob_sha.in_(batch),
+            )
+            .all()
+        )
+        if not rows:
+            continue
+        for _, blob_sha, findings in rows:
+            hits[blob_sha] = findings
+        db.query(AnalysisCacheEntry).filter(
+            AnalysisCacheEntry.id.in_([row.id for row in rows])
+        ).update(
+            {
+                AnalysisCacheEntry.last_used_at: datetime.utcnow(),
+                AnalysisCacheEntry.hit_count: AnalysisCacheEntry.hit_count + 1,
+            },
+            synchronize_session=False,
+        )
+    return hits
+
+
+def partition(
+    db: Session, analyzer: AnalyzerIdentity, files: Dict[str, str]
+) -> Tuple[Dict[str, List[dict]], Dict[str, List[str]]]:
+    """Split ``{file_path: blob_sha}`` into cached findings and work to do.
+
+    Returns ``(hits, misses)``: ``hits`` maps file path to cached findings,
+    ``misses`` maps each uncached blob SHA to the paths that share it, so a
+    blob copied to several paths is analyzed once.
+    """
+    cached = get_many(db, analyzer, files.values())
+    hits: Dict[str, List[dict]] = {}
+    misses: Dict[str, List[str]] = {}
+    for file_path, blob_sha in files.items():
+        if blob_sha in cached:
+            hits[file_path] = cached[blob_sha]
+        else:
+            misses.setdefault(blob_sha, []).append(file_path)
+    return hits, misses
+
+
+def put_many(db: Session, analyzer: AnalyzerIdentity, results: Dict[str, Iterable[dict]]) -> int:
+    """Store findings per blob SHA; entries another worker wrote first are kept.
+
+    Returns the number of entries written. Clean files are cached too (as an
+    empty list) - they are the bulk of every repository.
+    """
+    now = datetime.utcnow()
+    rows = []
+    for blob_sha, findings in results.items():
+        normalized = normalize_findings(findings)
+        rows.append(
+            {
+                "blob_sha": blob_sha,
+                "analyzer": analyzer.name,
+                "analyzer_version": analyzer.version,
+                "ruleset_hash": analyzer.ruleset_hash,
+                "findings": normalized,
+                "size_bytes": len(json.dumps(normalized)),
+                "hit_count": 0,
+                "last_used_at": now,
+                "created_at": now,
+            }
+        )
+
+    written = 0
+    for batch in chunked(rows, LOOKUP_BATCH_SIZE):
+        stmt = dialect_insert(db, AnalysisCacheEntry).values(batch).on_conflict_do_nothing()
+        written += db.execute(stmt).rowcount or 0
+    return written
+
+
+def evict(db: Session) -> int:
+    """Drop least-recently-used entries once either size limit is exceeded"""
+    count, total_bytes = db.query(
+        func.count(AnalysisCacheEntry.id),
+        func.coalesce(func.sum(AnalysisCacheEntry.size_bytes), 0),
+    ).one()
+    if count <= settings.ANALYSIS_CACHE_MAX_ENTRIES and total_bytes <= settings.ANALYSIS_CACHE_MAX_BYTES:
+        return 0
+
+    avg_bytes = max(total_bytes / count, 1)
+    keep = int(
+        min(settings.ANALYSIS_CACHE_MAX_ENTRIES, settings.ANALYSIS_CACHE_MAX_BYTES / avg_bytes)
+        * EVICTION_LOW_WATERMARK
+    )
+    excess = count - keep
+    if excess <= 0:
+        return 0
+
+    victims = (
+        db.query(AnalysisCacheEntry.id)
+        .order_by(AnalysisCacheEntry.last_used_at, AnalysisCacheEntry.id)
+        .limit(excess)
+        .subquery()
+    )
+    return (
+        db.query(AnalysisCacheEntry)
+        .filter(AnalysisCacheEntry.id.in_(victims.select()))
+        .delete(synchronize_session=False)
+    )
@@ -0,0 +1,253 @@
+"""
+Parallel static analyzer runner
+
+Splits the files of a checkout into size-balanced batches and runs every
+(analyzer, batch) pair on a process pool sized to the CPU count. Results are
+recorded as review findings as each batch finishes. A batch that hits its
+timeout is split in half and retried, so one pathological file cannot hold
+a whole review hostage; a single file that still times out is skipped.
+"""
+import asyncio
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services import analysis_cache, issue_ingest
+from app.services.analyzers import BatchResult, analyzer_version, get_analyzer, run_batch
+from app.services.diff_scope import DiffScope, apply_scope
+from app.services.fingerprint import assign_fingerprints, file_line_reader
+
+logger = logging.getLogger(__name__)
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def pool_size() -> int:
+    return settings.ANALYZER_WORKERS or os.cpu_count() or 1
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """Process pool shared by all reviews in this process"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=pool_size())
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+@dataclass
+class RunStats:
+    """Counters for one review's analyzer stage"""
+    files_analyzed: int = 0
+    cache_hits: int = 0
+    batches: int = 0
+    skipped_files: List[str] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+    issues_stored: int = 0
+
+
+def shard(files: List[str], sizes: Dict[str, int], batch_files: int) -> List[List[str]]:
+    """Size-balanced batches of at most ``batch_files`` files.
+
+    Largest files are placed first into the currently lightest batch, so
+    batches finish at roughly the same time.
+    """
+    if not files:
+        return []
+    count = -(-len(files) // batch_files)
+    batches: List[List[str]] = [[] for _ in range(count)]
+    loads = [0] * count
+    for path in sorted(files, key=lambda p: sizes.get(p, 0), reverse=True):
+        open_batches = [i for i in range(count) if len(batches[i]) < batch_files]
+        target = min(open_batches, key=loads.__getitem__)
+        batches[target].append(path)
+        loads[target] += sizes.get(path, 0)
+    return batches
+
+
+async def run_analyzers(
+    review_id: int,
+    root: str,
+    files: Dict[str, str],
+    scope: Optional[DiffScope] = None,
+    analyzer_names: Optional[List[str]] = None,
+) -> RunStats:
+    """Analyze ``{path: blob_sha}`` under ``root`` and record the findings on the review"""
+    stats = RunStats()
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+    pending: Dict[asyncio.Future, Tuple[str, List[str], Dict[str, List[str]]]] = {}
+
+    if scope is not None:
+        in_scope = set(scope.paths_to_analyze)
+        files = {path: sha for path, sha in files.items() if path in in_scope}
+    sizes = {path: _file_size(root, path) for path in files}
+
+    def submit(name: str, options: dict, batch: List[str], paths_by_blob: Dict[str, List[str]]) -> None:
+        future = loop.run_in_executor(
+            pool,
+            run_batch,
+            name,
+            options,
+            root,
+            batch,
+            settings.ANALYZER_BATCH_TIMEOUT_SECONDS,
+            settings.ANALYZER_BATCH_MEMORY_MB,
+        )
+        pending[future] = (name, batch, paths_by_blob)
+        stats.batches += 1
+
+    identities: Dict[str, analysis_cache.AnalyzerIdentity] = {}
+    for name in analyzer_names or settings.ANALYZERS:
+        options = settings.ANALYZER_OPTIONS.get(name, {})
+        analyzer = get_analyzer(name, options)
+        version = await asyncio.to_thread(analyzer_version, name)
+        if version is None:
+            stats.errors.append(f"{name} is not installed")
+            continue
+        identity = analysis_cache.AnalyzerIdentity(name, version, analysis_cache.ruleset_hash(analyzer.ruleset))
+        identities[name] = identity
+
+        targets = {path: sha for path, sha in files.items() if analyzer.handles(path)}
+        if not targets:
+            continue
+        hits, misses = await asyncio.to_thread(_cached_findings, identity, targets)
+        stats.cache_hits += len(hits)
+        if hits:
+            await asyncio.to_thread(_store_issues, review_id, root, hits, scope, stats)
+
+        # Analyze one path per distinct blob; findings fan back out to every copy
+        representatives = {paths[0]: blob_sha for blob_sha, paths in misses.items()}
+        for batch in shard(list(representatives), sizes, settings.ANALYZER_BATCH_FILES):
+            submit(name, options, batch, {representatives[p]: misses[representatives[p]] for p in batch})
+
+    while pending:
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            name, batch, paths_by_blob = pending.pop(future)
+            if future.cancelled():
+                # Still queued when its pool was replaced after a crash: it never ran
+                submit(name, settings.ANALYZER_OPTIONS.get(name, {}), batch, paths_by_blob)
+                continue
+            try:
+                result: BatchResult = future.result()
+            except BrokenProcessPool as exc:
+                # A pool process died; start a fresh pool for the remaining work
+                shutdown_pool()
+                pool = get_pool()
+                result = BatchResult(analyzer=name, files=batch, error=repr(exc))
+
+            if result.timed_out:
+                if len(batch) > 1:
+                    half = len(batch) // 2
+                    options = settings.ANALYZER_OPTIONS.get(name, {})
+                    for part in (batch[:half], batch[half:]):
+                        members = set(part)
+                        blobs = {sha: paths for sha, paths in paths_by_blob.items() if paths[0] in members}
+                        submit(name, options, part, blobs)
+                else:
+                    stats.skipped_files.extend(batch)
+                    logger.warning("%s timed out on %s; skipped", name, batch[0])
+                continue
+            if result.error:
+                stats.errors.append(result.error)
+                logger.warning("Analyzer batch failed: %s", result.error)
+                continue
+
+            by_blob = {sha: result.findings.get(paths[0], []) for sha, paths in paths_by_blob.items()}
+            by_path = {path: by_blob[sha] for sha, paths in paths_by_blob.items() for path in paths}
+            stats.files_analyzed += len(batch)
+            await asyncio.to_thread(_store_batch, review_id, root, identities[name], by_blob, by_path, scope, stats)
+
+    await asyncio.to_thread(_evict_cache)
+    return stats
+
+
+def _cached_findings(
+    identity: analysis_cache.AnalyzerIdentity, targets: Dict[str, str]
+) -> Tuple[Dict[str, List[dict]], Dict[str, List[str]]]:
+    db = SessionLocal()
+    try:
+        hits, misses = analysis_cache.partition(db, identity, targets)
+        db.commit()
+        return hits, misses
+    finally:
+        db.close()
+
+
+def _store_issues(
+    review_id: int, root: str, by_path: Dict[str, List[dict]], scope: Optional[DiffScope], stats: RunStats
+) -> None:
+    db = SessionLocal()
+    try:
+        _add_issues(db, review_id, root, by_path, scope, stats)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _store_batch(
+    review_id: int,
+    root: str,
+    identity: analysis_cache.AnalyzerIdentity,
+    by_blob: Dict[str, List[dict]],
+    by_path: Dict[str, List[dict]],
+    scope: Optional[DiffScope],
+    stats: RunStats,
+) -> None:
+    """Cache a finished batch and record its findings on the review (one transaction)"""
+    db = SessionLocal()
+    try:
+        analysis_cache.put_many(db, identity, by_blob)
+        _add_issues(db, review_id, root, by_path, scope, stats)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _add_issues(
+    db: Session,
+    review_id: int,
+    root: str,
+    by_path: Dict[str, List[dict]],
+    scope: Optional[DiffScope],
+    stats: RunStats,
+) -> None:
+    findings = [
+        {**finding, "file_path": path}
+        for path, path_findings in by_path.items()
+        for finding in path_findings
+    ]
+    if scope is not None:
+        findings = apply_scope(findings, scope)
+    findings = assign_fingerprints(findings, file_line_reader(root))
+    stats.issues_stored += issue_ingest.bulk_insert_issues(db, review_id, findings)
+
+
+def _evict_cache() -> None:
+    db = SessionLocal()
+    try:
+        analysis_cache.evict(db)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _file_size(root: str, path: str) -> int:
+    try:
+        return os.path.getsize(os.path.join(root, path))
+    except OSError:
+        return 0
@@ -0,0 +1,224 @@
+"""
+Static analyzer adapters (Bandit, pylint, Semgrep)
+
+Each adapter knows which files it handles, how to invoke the tool on a batch
+of files and how to turn its JSON report into finding field dicts. ``run_batch``
+is the unit of work executed in the analyzer process pool, so everything here
+must stay picklable and free of database access.
+"""
+import json
+import os
+import subprocess
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, batches still get timeouts
+    resource = None
+
+CONFIDENCE_SCORES = {"HIGH": 0.9, "MEDIUM": 0.6, "LOW": 0.3}
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one analyzer invocation over a batch of files"""
+    analyzer: str
+    files: List[str]
+    findings: Dict[str, List[dict]] = field(default_factory=dict)
+    timed_out: bool = False
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+class Analyzer:
+    """Base adapter; subclasses fill in the command and report parsing"""
+    name = ""
+    extensions: Tuple[str, ...] = ()
+    version_command: Tuple[str, ...] = ()
+    # Exit codes meaning "ran fine" (most linters exit non-zero when they find issues)
+    ok_exit_codes: Tuple[int, ...] = (0, 1)
+
+    def __init__(self, options: Optional[dict] = None):
+        self.options = options or {}
+
+    def handles(self, file_path: str) -> bool:
+        return file_path.endswith(self.extensions)
+
+    def command(self, files: Sequence[str]) -> List[str]:
+        raise NotImplementedError
+
+    def parse(self, stdout: str) -> Dict[str, List[dict]]:
+        raise NotImplementedError
+
+    @property
+    def ruleset(self) -> dict:
+        """Configuration that changes findings, hashed into cache keys"""
+        return {"command": self.command([]), "options": self.options}
+
+
+class BanditAnalyzer(Analyzer):
+    name = "bandit"
+    extensions = (".py",)
+    version_command = ("bandit", "--version")
+
+    def command(self, files: Sequence[str]) -> List[str]:
+        return ["bandit", "-f", "json", "-q", *files]
+
+    def parse(self, stdout: str) -> Dict[str, List[dict]]:
+        findings: Dict[str, List[dict]] = {}
+        for result in json.loads(stdout or "{}").get("results", []):
+            findings.setdefault(_normalize_path(result["filename"]), []).append({
+                "line_number": result.get("line_number"),
+                "issue_type": "security",
+                "severity": result.get("issue_severity", "LOW").lower(),
+                "title": result.get("issue_text", result.get("test_name", "")),
+                "description": result.get("more_info"),
+                "code_snippet": result.get("code"),
+                "confidence_score": CONFIDENCE_SCORES.get(result.get("issue_confidence")),
+                "source": "static_analysis",
+                "static_rule_id": f"bandit-{result.get('test_id')}",
+            })
+        return findings
+
+
+class PylintAnalyzer(Analyzer):
+    name = "pylint"
+    extensions = (".py",)
+    version_command = ("pylint", "--version")
+    # pylint's exit status is a bit mask of message categories; 32 is usage error
+    ok_exit_codes = tuple(range(32))
+
+    SEVERITIES = {"fatal": "high", "error": "high", "warning": "medium", "refactor": "low", "convention": "low"}
+    TYPES = {"fatal": "bug", "error": "bug", "warning": "bug", "refactor": "style", "convention": "style"}
+
+    def command(self, files: Sequence[str]) -> List[str]:
+        return ["pylint", "--output-format=json", "--score=n", "--jobs=1", *files]
+
+    def parse(self, stdout: str) -> Dict[str, List[dict]]:
+        findings: Dict[str, List[dict]] = {}
+        for message in json.loads(stdout or "[]"):
+            kind = message.get("type", "convention")
+            findings.setdefault(_normalize_path(message["path"]), []).append({
+                "line_number": message.get("line"),
+                "issue_type": self.TYPES.get(kind, "style"),
+                "severity": self.SEVERITIES.get(kind, "low"),
+                "title": message.get("message", ""),
+                "description": message.get("symbol"),
+                "source": "static_analysis",
+                "static_rule_id": f"pylint-{message.get('message-id')}",
+            })
+        return findings
+
+
+class SemgrepAnalyzer(Analyzer):
+    name = "semgrep"
+    extensions = (".py", ".js", ".jsx", ".ts", ".tsx", ".go", ".java", ".rb", ".php")
+    version_command = ("semgrep", "--version")
+
+    SEVERITIES = {"ERROR": "high", "WARNING": "medium", "INFO": "low"}
+
+    def command(self, files: Sequence[str]) -> List[str]:
+        config = self.options.get("config", "p/default")
+        # One job per invocation: parallelism comes from the process pool
+        return ["semgrep", "scan", "--json", "--quiet", "--metrics=off", "--jobs=1", f"--config={config}", *files]
+
+    def parse(self, stdout: str) -> Dict[str, List[dict]]:
+        findings: Dict[str, List[dict]] = {}
+        for result in json.loads(stdout or "{}").get("results", []):
+            extra = result.get("extra", {})
+            metadata = extra.get("metadata", {})
+            findings.setdefault(_normalize_path(result["path"]), []).append({
+                "line_number": (result.get("start") or {}).get("line"),
+                "issue_type": "security" if metadata.get("category", "security") == "security" else "bug",
+                "severity": self.SEVERITIES.get(extra.get("severity"), "low"),
+                "title": extra.get("message", result.get("check_id", "")),
+                "code_snippet": extra.get("lines"),
+                "confidence_score": CONFIDENCE_SCORES.get(metadata.get("confidence")),
+                "source": "static_analysis",
+                "static_rule_id": f"semgrep-{result.get('check_id')}",
+            })
+        return findings
+
+
+ANALYZERS = {
+    analyzer.name: analyzer
+    for analyzer in (BanditAnalyzer, PylintAnalyzer, SemgrepAnalyzer)
+}
+
+
+def get_analyzer(name: str, options: Optional[dict] = None) -> Analyzer:
+    try:
+        return ANALYZERS[name](options)
+    except KeyError:
+        raise ValueError(f"Unknown analyzer: {name}")
+
+
+@lru_cache(maxsize=None)
+def analyzer_version(name: str) -> Optional[str]:
+    """Installed tool version, or None when the tool is not available"""
+    try:
+        completed = subprocess.run(
+            list(ANALYZERS[name].version_command), capture_output=True, text=True, timeout=30
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if completed.returncode != 0:
+        return None
+    lines = (completed.stdout or completed.stderr).strip().splitlines()
+    return lines[0].strip() if lines else "unknown"
+
+
+def run_batch(
+    name: str,
+    options: Optional[dict],
+    root: str,
+    files: List[str],
+    timeout: float,
+    memory_mb: int,
+) -> BatchResult:
+    """Run one analyzer over a batch of files (executes in a pool process)"""
+    analyzer = get_analyzer(name, options)
+    result = BatchResult(analyzer=name, files=files)
+    started = time.monotonic()
+    try:
+        completed = subprocess.run(
+            analyzer.command(files),
+            cwd=root,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            preexec_fn=_memory_limiter(memory_mb),
+        )
+    except subprocess.TimeoutExpired:
+        result.timed_out = True
+    except OSError as exc:
+        result.error = f"{name} could not be started: {exc}"
+    else:
+        if completed.returncode not in analyzer.ok_exit_codes:
+            result.error = f"{name} exited {completed.returncode}: {completed.stderr[-500:]}"
+        else:
+            try:
+                result.findings = analyzer.parse(completed.stdout)
+            except (ValueError, KeyError) as exc:
+                result.error = f"{name} report could not be parsed: {exc}"
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def _memory_limiter(memory_mb: int):
+    if resource is None or memory_mb <= 0 or os.name != "posix":
+        return None
+    limit = memory_mb * 1024 * 1024
+
+    def apply_limit():
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    return apply_limit
+
+
+def _normalize_path(path: str) -> str:
+    path = path.replace(os.sep, "/")
+    return path[2:] if path.startswith("./") else path
@@ -0,0 +1,137 @@
+"""
+Git checkouts of the commit under review
+
+Fetches exactly one commit (shallow) into a scratch directory. File listing
+comes from ``git ls-tree`` so every path arrives with its blob SHA, which is
+what the analysis cache is keyed on.
+
+The user's GitHub token reaches git as an HTTP header set through the
+environment, never in the remote URL, the command line or ``.git/config``,
+and git's error output is redacted before it is raised.
+"""
+import asyncio
+import base64
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
+
+from app.core.config import settings
+from app.core.security import redact_secrets
+
+
+class CheckoutError(Exception):
+    """A git command needed to prepare the checkout failed"""
+
+
+class Checkout:
+    """Working tree of a single fetched commit"""
+
+    def __init__(self, root: str, sha: str, env: Optional[Dict[str, str]] = None):
+        self.root = root
+        self.sha = sha  # resolved commit, also when a branch was requested
+        self.env = env or {}
+
+    async def git(self, *args: str) -> str:
+        return await run_git(self.root, *args, env=self.env)
+
+    async def files(self) -> Dict[str, str]:
+        """``{path: blob_sha}`` for every regular file in the commit"""
+        output = await self.git("ls-tree", "-r", "-z", "HEAD")
+        files: Dict[str, str] = {}
+        for entry in output.split("\0"):
+            if not entry:
+                continue
+            meta, path = entry.split("\t", 1)
+            mode, kind, sha = meta.split()
+            # Skip submodules (commit) and symlinks (120000)
+            if kind == "blob" and mode != "120000":
+                files[path] = sha
+        return files
+
+    async def diff(self, base_sha: str) -> str:
+        """Unified diff of the checked out commit against its merge-base with ``base_sha``.
+
+        Like GitHub's pull request diff, commits that reached the base branch
+        after the head branched off are not part of it. Both histories are
+        deepened (doubling) until the merge-base is fetched; if it is more
+        than ``PR_REVIEW_MAX_HISTORY`` commits back the trees are compared
+        directly instead.
+        """
+        await self.git("fetch", "--quiet", "--depth=1", "--no-tags", "--end-of-options", "origin", base_sha)
+        depth = 1
+        merge_base = await self.merge_base(base_sha)
+        while merge_base is None and depth < settings.PR_REVIEW_MAX_HISTORY:
+            if (await self.git("rev-parse", "--is-shallow-repository")).strip() != "true":
+                break  # complete history and still no common ancestor
+            await self.git(
+                "fetch", "--quiet", f"--deepen={depth}", "--no-tags", "--end-of-options", "origin", self.sha, base_sha
+            )
+            depth *= 2
+            merge_base = await self.merge_base(base_sha)
+        return await self.git(
+            "diff", "--no-color", "--no-ext-diff", "--end-of-options", merge_base or base_sha, "HEAD"
+        )
+
+    async def merge_base(self, sha: str) -> Optional[str]:
+        try:
+            return (await self.git("merge-base", "--end-of-options", sha, "HEAD")).strip() or None
+        except CheckoutError:  # exits 1 while no common ancestor has been fetched
+            return None
+
+    def read_text(self, path: str) -> Optional[str]:
+        try:
+            with open(os.path.join(self.root, path), encoding="utf-8", errors="replace") as handle:
+                return handle.read()
+        except OSError:
+            return None
+
+
+async def run_git(cwd: str, *args: str, env: Optional[Dict[str, str]] = None) -> str:
+    process = await asyncio.create_subprocess_exec(
+        "git", *args,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0", **(env or {})},
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        error = redact_secrets(stderr.decode(errors="replace").strip()[-500:])
+        raise CheckoutError(f"git {args[0]} failed: {error}")
+    return stdout.decode(errors="replace")
+
+
+def clone_url(repo_url: str) -> str:
+    """HTTPS clone URL of a repository page URL (host and port kept as-is)"""
+    return repo_url if repo_url.endswith(".git") else f"{repo_url}.git"
+
+
+def auth_env(token: Optional[str]) -> Dict[str, str]:
+    """Environment making git send ``token`` as HTTP basic auth (git >= 2.31)"""
+    if not token:
+        return {}
+    credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+    return {
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": "http.extraheader",
+        "GIT_CONFIG_VALUE_0": f"Authorization: Basic {credentials}",
+    }
+
+
+@asynccontextmanager
+async def checkout_commit(repo_url: str, ref: str, token: Optional[str] = None) -> AsyncIterator[Checkout]:
+    """Shallow-fetch ``ref`` (a SHA or branch) and yield its working tree"""
+    os.makedirs(settings.CHECKOUT_ROOT, exist_ok=True)
+    root = tempfile.mkdtemp(prefix="review-", dir=settings.CHECKOUT_ROOT)
+    env = auth_env(token)
+    try:
+        await run_git(root, "init", "--quiet")
+        await run_git(root, "remote", "add", "origin", clone_url(repo_url))
+        # Refs come from requests and payloads: never let one be read as an option
+        await run_git(root, "fetch", "--quiet", "--depth=1", "--no-tags", "--end-of-options", "origin", ref, env=env)
+        await run_git(root, "checkout", "--quiet", "--detach", "FETCH_HEAD")
+        yield Checkout(root, (await run_git(root, "rev-parse", "HEAD")).strip(), env)
+    finally:
+        await asyncio.to_thread(shutil.rmtree, root, True)
@@ -0,0 +1,255 @@
+"""
+Diff-hunk scoping for incremental pull request reviews
+
+A PR review analyzes only the files its diff touches and reports only
+findings on changed lines (widened by ``PR_REVIEW_CONTEXT_LINES``). When
+out-of-diff findings are tagged rather than dropped, files the changed files
+import are analyzed too. Work therefore scales with the size of the diff
+rather than the size of the repository.
+"""
+import ast
+import posixpath
+import re
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+LineRange = Tuple[int, int]  # inclusive, 1-based, new side of the diff
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+JS_IMPORT = re.compile(
+    r"""(?:import\s[^'"]*?from\s*|import\s*|require\s*\(\s*|import\s*\(\s*)['"](\.{1,2}/[^'"]+)['"]"""
+)
+JS_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs")
+
+
+@dataclass
+class DiffScope:
+    """Changed line ranges per file and the files analyzed for context"""
+    changed: Dict[str, List[LineRange]] = field(default_factory=dict)
+    linked: Set[str] = field(default_factory=set)
+
+    @property
+    def paths_to_analyze(self) -> List[str]:
+        return sorted(set(self.changed) | self.linked)
+
+    def contains(self, file_path: str, line_number: Optional[int]) -> bool:
+        """Whether a finding at this location falls inside the diff"""
+        ranges = self.changed.get(file_path)
+        if not ranges:
+            return False
+        if line_number is None:
+            # File-level findings (e.g. module docstring rules) belong to touched files
+            return True
+        idx = bisect_right(ranges, (line_number, float("inf"))) - 1
+        return idx >= 0 and ranges[idx][0] <= line_number <= ranges[idx][1]
+
+
+class PathIndex:
+    """Tree paths and the Python package roots they imply"""
+
+    def __init__(self, tree_paths: Iterable[str]):
+        self.paths: Set[str] = set(tree_paths)
+        # The tree root plus the parent of every top-level package (src/
+        # layouts, monorepo subprojects): where absolute imports start
+        self.package_roots: Set[str] = {""}
+        for path in self.paths:
+            if posixpath.basename(path) != "__init__.py":
+                continue
+            package = posixpath.dirname(path)
+            parent = posixpath.dirname(package)
+            while parent and posixpath.join(parent, "__init__.py") in self.paths:
+                package, parent = parent, posixpath.dirname(parent)
+            self.package_roots.add(parent)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.paths
+
+    def module_files(self, module: str, roots: Iterable[str]) -> Set[str]:
+        """Files ``module`` (dotted) resolves to under any of ``roots``"""
+        relative = module.replace(".", "/")
+        found: Set[str] = set()
+        for root in roots:
+            for candidate in (f"{relative}.py", f"{relative}/__init__.py"):
+                path = posixpath.join(root, candidate) if root else candidate
+                if path in self.paths:
+                    found.add(path)
+        return found
+
+
+def merge_ranges(ranges: Iterable[LineRange]) -> List[LineRange]:
+    """Sort and merge overlapping or adjacent ranges"""
+    merged: List[LineRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def parse_unified_diff(diff_text: str) -> Dict[str, List[LineRange]]:
+    """Changed line ranges on the new side of a ``git diff`` per file.
+
+    Added lines are reported as-is; a pure deletion marks the line that now
+    sits where the removed block was. Deleted files are omitted. Hunk bodies
+    are consumed by the line counts in their headers, so a removed ``-- x``
+    or added ``++ x`` line is never mistaken for a file header.
+    """
+    changed: Dict[str, List[LineRange]] = {}
+    current: Optional[str] = None
+    new_line = old_left = new_left = 0
+    for line in diff_text.splitlines():
+        if old_left > 0 or new_left > 0:
+            marker = line[:1]
+            if marker == "\\":  # "\ No newline at end of file"
+                continue
+            if marker == "+":
+                new_left -= 1
+                if current is not None:
+                    changed[current].append((new_line, new_line))
+                new_line += 1
+            elif marker == "-":
+                old_left -= 1
+                if current is not None:
+                    anchor = max(new_line, 1)
+                    changed[current].append((anchor, anchor))
+            else:  # context; some tools strip the space from blank ones
+                old_left -= 1
+                new_left -= 1
+                new_line += 1
+            continue
+        if line.startswith("+++ "):
+            target = line[4:].strip()
+            current = None if target == "/dev/null" else _strip_prefix(target)
+            if current is not None:
+                changed.setdefault(current, [])
+            continue
+        match = HUNK_HEADER.match(line)
+        if match:
+            old_count, new_start, new_count = match.groups()
+            old_left = 1 if old_count is None else int(old_count)
+            new_left = 1 if new_count is None else int(new_count)
+            new_line = int(new_start)
+    return {path: merge_ranges(ranges) for path, ranges in changed.items()}
+
+
+def widen(ranges: Dict[str, List[LineRange]], context_lines: int) -> Dict[str, List[LineRange]]:
+    """Extend every range by ``context_lines`` on both sides"""
+    return {
+        path: merge_ranges((max(start - context_lines, 1), end + context_lines) for start, end in spans)
+        for path, spans in ranges.items()
+    }
+
+
+def python_imports(source: str, file_path: str, tree: PathIndex) -> Set[str]:
+    """Repository files a Python module imports (absolute and relative).
+
+    Absolute imports resolve against the package roots and the importing
+    file's own directory (where a script's imports start), so ``import os``
+    does not pull in some ``vendor/lib/os.py``. Relative imports resolve
+    against the file's package.
+    """
+    try:
+        module_ast = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return set()
+
+    package = posixpath.dirname(file_path)
+    absolute: Set[str] = set()
+    relative: Set[str] = set()  # dotted from the tree root
+    for node in ast.walk(module_ast):
+        if isinstance(node, ast.Import):
+            absolute.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package
+                for _ in range(node.level - 1):
+                    base = posixpath.dirname(base)
+                prefix = base.replace("/", ".")
+                module = ".".join(part for part in (prefix, node.module) if part)
+                modules = relative
+            else:
+                module = node.module or ""
+                modules = absolute
+            modules.add(module)
+            # ``from pkg import mod`` may name a submodule rather than an attribute
+            modules.update(f"{module}.{alias.name}" if module else alias.name for alias in node.names)
+
+    roots = tree.package_roots | {package}
+    linked: Set[str] = set()
+    for module in absolute:
+        linked |= tree.module_files(module, roots)
+    for module in relative:
+        linked |= tree.module_files(module, ("",))
+    return linked
+
+
+def js_imports(source: str, file_path: str, tree: PathIndex) -> Set[str]:
+    """Repository files a JS/TS module imports through relative specifiers"""
+    base = posixpath.dirname(file_path)
+    linked: Set[str] = set()
+    for specifier in JS_IMPORT.findall(source):
+        target = posixpath.normpath(posixpath.join(base, specifier))
+        candidates = [target] + [target + ext for ext in JS_EXTENSIONS]
+        candidates += [f"{target}/index{ext}" for ext in JS_EXTENSIONS]
+        linked.update(path for path in candidates if path in tree)
+    return linked
+
+
+def build_scope(
+    diff_text: str,
+    tree_paths: Iterable[str],
+    read_file: Callable[[str], Optional[str]],
+    context_lines: Optional[int] = None,
+    follow_imports: Optional[bool] = None,
+) -> DiffScope:
+    """Scope for a PR: changed ranges plus files the changed files import.
+
+    ``read_file`` is only called for changed files, so the cost does not grow
+    with the number of files in the tree.
+    """
+    if context_lines is None:
+        context_lines = settings.PR_REVIEW_CONTEXT_LINES
+    if follow_imports is None:
+        # Findings in imported files are outside the diff, so with 'drop'
+        # analyzing those files would only produce findings to throw away
+        follow_imports = settings.PR_REVIEW_FOLLOW_IMPORTS and settings.PR_REVIEW_OUT_OF_SCOPE != "drop"
+
+    changed = widen(parse_unified_diff(diff_text), context_lines)
+    scope = DiffScope(changed=changed)
+    if not follow_imports:
+        return scope
+
+    tree = PathIndex(tree_paths)
+    for file_path in changed:
+        source = read_file(file_path)
+        if source is None:
+            continue
+        if file_path.endswith(".py"):
+            scope.linked |= python_imports(source, file_path, tree)
+        elif file_path.endswith(JS_EXTENSIONS):
+            scope.linked |= js_imports(source, file_path, tree)
+    scope.linked -= set(changed)
+    return scope
+
+
+def apply_scope(findings: Iterable[dict], scope: DiffScope, mode: Optional[str] = None) -> List[dict]:
+    """Drop findings outside the diff, or keep them tagged ``in_diff=False``"""
+    mode = mode or settings.PR_REVIEW_OUT_OF_SCOPE
+    scoped = []
+    for finding in findings:
+        in_diff = scope.contains(finding.get("file_path"), finding.get("line_number"))
+        if not in_diff and mode == "drop":
+            continue
+        scoped.append({**finding, "in_diff": in_diff})
+    return scoped
+
+
+def _strip_prefix(path: str) -> str:
+    """Remove git's a/ b/ path prefixes"""
+    if path.startswith(("a/", "b/")):
+        return path[2:]
+    return path
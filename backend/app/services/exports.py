@@ -0,0 +1,132 @@
+"""
+Streaming issue exports
+
+Rows are read through a server-side cursor (``AsyncSession.stream`` with
+``yield_per``) and encoded one partition at a time, so memory stays flat no
+matter how many issues match and the first bytes go out as soon as the first
+partition arrives.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models.finding import Finding
+from app.models.review import Review
+from app.models.review_finding import ReviewFinding
+
+# One row per (review, finding); created_at is when the review ran
+EXPORT_COLUMNS = (
+    ("id", Finding.id),
+    ("review_id", ReviewFinding.review_id),
+    ("repository_id", Review.repository_id),
+    ("commit_sha", Review.commit_sha),
+    ("pr_number", Review.pr_number),
+    ("file_path", Finding.file_path),
+    ("line_number", ReviewFinding.line_number),
+    ("issue_type", Finding.issue_type),
+    ("severity", Finding.severity),
+    ("title", Finding.title),
+    ("description", Finding.description),
+    ("fix_suggestion", Finding.fix_suggestion),
+    ("confidence_score", Finding.confidence_score),
+    ("source", Finding.source),
+    ("static_rule_id", Finding.static_rule_id),
+    ("is_false_positive", Finding.is_false_positive),
+    ("created_at", Review.created_at),
+)
+FIELD_NAMES = [name for name, _ in EXPORT_COLUMNS]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+    "csv": "text/csv",
+}
+
+
+def export_query(
+    repository_ids,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    severities: Optional[Sequence[str]] = None,
+):
+    """Export rows of the reviews of ``repository_ids`` (a list or an id subquery)"""
+    query = (
+        select(*(column for _, column in EXPORT_COLUMNS))
+        .select_from(ReviewFinding)
+        .join(Review, Review.id == ReviewFinding.review_id)
+        .join(Finding, Finding.id == ReviewFinding.finding_id)
+        .where(Review.repository_id.in_(repository_ids))
+    )
+    if since is not None:
+        query = query.where(Review.created_at >= since)
+    if until is not None:
+        query = query.where(Review.created_at < until)
+    if severities:
+        query = query.where(Finding.severity.in_(severities))
+    # Stable order keeps exports reproducible and walks the primary key
+    return query.order_by(ReviewFinding.review_id, ReviewFinding.finding_id).execution_options(
+        yield_per=settings.EXPORT_BATCH_SIZE
+    )
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _encode_ndjson(rows: List[dict], first: bool) -> str:
+    return "".join(json.dumps(row, default=_json_default, separators=(",", ":")) + "\n" for row in rows)
+
+
+def _encode_json(rows: List[dict], first: bool) -> str:
+    body = ",\n".join(json.dumps(row, default=_json_default, separators=(",", ":")) for row in rows)
+    return body if first else ",\n" + body
+
+
+def _encode_csv(rows: List[dict], first: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELD_NAMES)
+    for row in rows:
+        writer.writerow({
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in row.items()
+        })
+    return buffer.getvalue()
+
+
+ENCODERS: Dict[str, Callable[[List[dict], bool], str]] = {
+    "ndjson": _encode_ndjson,
+    "json": _encode_json,
+    "csv": _encode_csv,
+}
+
+
+async def stream_issues(fmt: str, query) -> AsyncIterator[bytes]:
+    """Encoded export chunks, one per cursor partition.
+
+    Opens its own session: the response body is produced after the request's
+    dependencies have been torn down.
+    """
+    encode = ENCODERS[fmt]
+    if fmt == "json":
+        yield b"["
+    elif fmt == "csv":
+        yield (",".join(FIELD_NAMES) + "\r\n").encode()
+
+    first = True
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            rows = [dict(zip(FIELD_NAMES, row)) for row in partition]
+            yield encode(rows, first).encode()
+            first = False
+
+    if fmt == "json":
+        yield b"]\n"
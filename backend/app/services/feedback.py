@@ -0,0 +1,125 @@
+"""
+Developer feedback on review findings
+
+Flagging a finding as a false positive marks the repository-wide finding, so
+it stays flagged in every later review that reports it, and adds it to the
+repository's similarity index (``fp_index.py``) so near-duplicates are
+suppressed at ingestion. Unflagging also releases the findings that were
+suppressed because they resembled it. Each feedback request refreshes the
+repository's rule precision (``rule_precision.py``) in one pass.
+
+Findings are shared by every review that reports them, so each review
+containing a changed finding has its ``feedback_version`` (and so its ETag)
+bumped and its counters, quality score and rollups recomputed, a few hundred
+reviews per aggregate query.
+"""
+import asyncio
+from collections import defaultdict
+from typing import Dict
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import SessionLocal
+from app.models.finding import Finding
+from app.models.review import Review
+from app.models.review_finding import ReviewFinding
+from app.services import rollups
+from app.services.analysis import calculate_quality_score
+from app.services.issue_ingest import SEVERITIES, set_review_counters, severity_counts_query
+from app.utils.sql import chunked
+
+# Finding / review ids per IN (...) query
+LOOKUP_BATCH_SIZE = 500
+
+
+class UnknownFindings(ValueError):
+    """Feedback names findings the review does not contain"""
+
+
+async def apply_feedback(db: AsyncSession, review: Review, changes: Dict[int, bool]) -> dict:
+    """Set ``{finding id: false positive}`` for findings of ``review`` and commit"""
+    rows = await db.execute(
+        select(Finding.id, Finding.is_false_positive)
+        .join(ReviewFinding, ReviewFinding.finding_id == Finding.id)
+        .where(ReviewFinding.review_id == review.id, Finding.id.in_(list(changes)))
+    )
+    current = {finding_id: bool(flag) for finding_id, flag in rows}
+    unknown = sorted(set(changes) - set(current))
+    if unknown:
+        raise UnknownFindings(unknown)
+
+    flagged = [finding_id for finding_id, flag in changes.items() if flag and not current[finding_id]]
+    unflagged = [finding_id for finding_id, flag in changes.items() if not flag and current[finding_id]]
+    # +1 / -1 per finding whose flag changes, including the ones unflagging releases
+    changed = {finding_id: 1 for finding_id in flagged}
+    changed.update({finding_id: -1 for finding_id in unflagged})
+    if flagged:
+        await db.execute(
+            update(Finding).where(Finding.id.in_(flagged)).values(is_false_positive=True, suppressed_by_id=None)
+        )
+    if unflagged:
+        released = await db.scalars(
+            select(Finding.id).where(Finding.suppressed_by_id.in_(unflagged), Finding.is_false_positive.is_(True))
+        )
+        changed.update({finding_id: -1 for finding_id in released})
+        await db.execute(
+            update(Finding)
+            .where(Finding.id.in_(unflagged) | Finding.suppressed_by_id.in_(unflagged))
+            .values(is_false_positive=False, suppressed_by_id=None)
+        )
+
+    reviews = await refresh_reviews(db, changed) if changed else 0
+    await db.commit()
+
+    if changed:
+        await asyncio.to_thread(_refresh_models, review.repository_id)
+    return {
+        "flagged": len(flagged),
+        "unflagged": len(unflagged),
+        "released": len(changed) - len(flagged) - len(unflagged),
+        "reviews_updated": reviews,
+        "feedback_version": review.feedback_version or 0,
+    }
+
+
+async def refresh_reviews(db: AsyncSession, changed: Dict[int, int]) -> int:
+    """Bump, recount and re-roll-up every review containing a finding in ``changed``.
+
+    ``changed`` maps finding id to +1 (now a false positive) or -1 (no
+    longer one). Returns the number of reviews updated; the caller commits.
+    """
+    false_positives: Dict[int, int] = defaultdict(int)
+    for batch in chunked(list(changed), LOOKUP_BATCH_SIZE):
+        rows = await db.execute(
+            select(ReviewFinding.review_id, ReviewFinding.finding_id).where(ReviewFinding.finding_id.in_(batch))
+        )
+        for review_id, finding_id in rows:
+            false_positives[review_id] += changed[finding_id]
+
+    for batch in chunked(sorted(false_positives), LOOKUP_BATCH_SIZE):
+        counts = {
+            row[0]: dict(zip(SEVERITIES, row[1:])) for row in await db.execute(severity_counts_query(batch))
+        }
+        for review in (await db.scalars(select(Review).where(Review.id.in_(batch)))).all():
+            review_counts = counts.get(review.id, dict.fromkeys(SEVERITIES, 0))
+            before = rollups.review_counters(review)
+            set_review_counters(review, review_counts)
+            review.feedback_version = (review.feedback_version or 0) + 1
+            if review.status == "completed":
+                review.quality_score = calculate_quality_score(review_counts)
+                await rollups.record_adjustment(db, review, before, false_positives[review.id])
+    return len(false_positives)
+
+
+def _refresh_models(repository_id: int) -> None:
+    from app.services import fp_index, rule_precision  # numpy; deferred to keep startup cheap
+
+    db = SessionLocal()
+    try:
+        fp_index.build(db, repository_id)
+        rule_precision.refresh(db, [repository_id])
+        db.commit()
+    finally:
+        db.close()
+    rule_precision.rule_model.invalidate(repository_id)
@@ -0,0 +1,90 @@
+"""
+Finding fingerprints
+
+A fingerprint identifies "the same finding" across commits: the rule that
+fired, the file, and the normalized code around it. That is the analyzer's
+snippet when it reports one (bandit's already spans a line either side), or
+else the flagged source line with ``CONTEXT_LINES`` lines either side, read
+from the checkout. Line numbers are deliberately left out so edits elsewhere
+in the file do not change it. Identical code flagged by the same rule more
+than once in a file is told apart by its occurrence order.
+
+Changing anything here re-keys stored findings: every one of them shows up
+as new (and loses its false-positive flag) on the next review.
+"""
+import hashlib
+import os
+import re
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# "12 " / "12:" line-number gutters analyzers put in front of snippet lines
+_LINE_GUTTER = re.compile(r"^\s*\d+[:|]?\s", re.MULTILINE)
+_WHITESPACE = re.compile(r"\s+")
+
+LineReader = Callable[[str, int], Optional[str]]
+
+# Source lines either side of the flagged one for findings without a snippet
+CONTEXT_LINES = 1
+
+
+def normalize_code(text: Optional[str]) -> str:
+    """Code with line gutters removed and all whitespace runs collapsed"""
+    if not text:
+        return ""
+    return _WHITESPACE.sub(" ", _LINE_GUTTER.sub("", text)).strip()
+
+
+def rule_key(finding: dict) -> str:
+    return finding.get("static_rule_id") or f"{finding.get('issue_type')}:{finding.get('title')}"
+
+
+def fingerprint(rule: str, file_path: str, context: str, occurrence: int = 0) -> str:
+    raw = "\x1f".join((rule, file_path, context, str(occurrence)))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def source_context(read_line: LineReader, file_path: str, line_number: int) -> str:
+    """Normalized flagged line and its neighbours; empty when the line cannot be read"""
+    if not normalize_code(read_line(file_path, line_number)):
+        return ""
+    lines = (
+        read_line(file_path, number)
+        for number in range(max(1, line_number - CONTEXT_LINES), line_number + CONTEXT_LINES + 1)
+    )
+    return normalize_code("\n".join(line for line in lines if line is not None))
+
+
+def assign_fingerprints(findings: Iterable[dict], read_line: Optional[LineReader] = None) -> List[dict]:
+    """Set ``finding["fingerprint"]`` on each finding (which must carry ``file_path``)"""
+    findings = list(findings)
+    groups: Dict[Tuple[str, str, str], List[dict]] = defaultdict(list)
+    for finding in findings:
+        context = normalize_code(finding.get("code_snippet"))
+        if not context and read_line is not None and finding.get("line_number"):
+            context = source_context(read_line, finding["file_path"], finding["line_number"])
+        groups[(rule_key(finding), finding["file_path"], context)].append(finding)
+
+    for (rule, file_path, context), members in groups.items():
+        members.sort(key=lambda finding: finding.get("line_number") or 0)
+        for occurrence, finding in enumerate(members):
+            finding["fingerprint"] = fingerprint(rule, file_path, context, occurrence)
+    return findings
+
+
+def file_line_reader(root: str) -> LineReader:
+    """``read_line(path, line_number)`` over a checkout, caching each file it opens"""
+    files: Dict[str, List[str]] = {}
+
+    def read_line(path: str, line_number: int) -> Optional[str]:
+        lines = files.get(path)
+        if lines is None:
+            try:
+                with open(os.path.join(root, path), encoding="utf-8", errors="replace") as handle:
+                    lines = handle.read().splitlines()
+            except OSError:
+                lines = []
+            files[path] = lines
+        return lines[line_number - 1] if 0 < line_number <= len(lines) else None
+
+    return read_line
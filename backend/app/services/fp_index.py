@@ -0,0 +1,315 @@
+"""
+False-positive similarity index
+
+Findings developers marked as false positives are embedded (title plus
+normalized code snippet) into one small matrix per repository. Vectors are
+L2-normalized and stored quantized (int8 with a float16 scale per row, or
+plain float16) as ``.npy`` files that are memory-mapped on load, so an index
+costs a few hundred bytes per entry and loads in constant time. A batch of new
+findings is checked with one matrix product per chunk.
+
+The index is derived data: it is rebuilt from the database after feedback,
+and lazily whenever its file is missing or was built by a different
+embedder, so ``FP_INDEX_DIR`` may live on ephemeral disk. Each build writes
+a new version directory and repoints the repository's symlink at it, with
+builds of one repository serialized by a file lock across worker processes.
+"""
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.finding import Finding
+from app.services.fingerprint import normalize_code
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+|[^\sA-Za-z0-9_]")
+
+
+def embedding_text(title: Optional[str], code_snippet: Optional[str]) -> str:
+    return f"{title or ''}\n{normalize_code(code_snippet)}"
+
+
+class Embedder:
+    """Base embedder: texts in, L2-normalized float32 rows out"""
+    name = ""
+
+    def __init__(self, dim: int, options: Optional[dict] = None):
+        self.dim = dim
+        self.options = options or {}
+
+    @property
+    def identity(self) -> str:
+        """Changes whenever vectors from this embedder stop being comparable"""
+        return f"{self.name}:{self.dim}:{json.dumps(self.options, sort_keys=True)}"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """Signed feature hashing of code tokens and token bigrams.
+
+    Deterministic across processes and platforms; no model download.
+    """
+    name = "hashing"
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = _TOKEN.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                digest = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "little")
+                vectors[row, digest % self.dim] += 1.0 if digest >> 63 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+
+EMBEDDERS = {
+    embedder.name: embedder
+    for embedder in (HashingEmbedder,)
+}
+
+
+def get_embedder(name: str, dim: int, options: Optional[dict] = None) -> Embedder:
+    try:
+        return EMBEDDERS[name](dim, options)
+    except KeyError:
+        raise ValueError(f"Unknown embedder: {name}")
+
+
+_embedder: Optional[Embedder] = None
+
+
+def default_embedder() -> Embedder:
+    global _embedder
+    if _embedder is None:
+        _embedder = get_embedder(settings.FP_EMBEDDER, settings.FP_EMBEDDING_DIM, settings.FP_EMBEDDER_OPTIONS)
+    return _embedder
+
+
+def quantize(vectors: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Compact storage of unit vectors: ``(int8 rows, float16 scales)`` or ``(float16 rows, None)``"""
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    peak = np.maximum(np.abs(vectors).max(axis=1, keepdims=True), 1e-12)
+    codes = np.round(vectors / peak * 127).astype(np.int8)
+    return codes, (peak / 127).astype(np.float16).ravel()
+
+
+class FalsePositiveIndex:
+    """Known false positives of one repository"""
+
+    def __init__(self, finding_ids: np.ndarray, vectors: np.ndarray, scales: Optional[np.ndarray]):
+        self.finding_ids = finding_ids
+        self.vectors = vectors
+        self.scales = scales
+
+    def __len__(self) -> int:
+        return len(self.finding_ids)
+
+    def search(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-``k`` cosine similarities and finding ids per query row, best first.
+
+        Missing neighbours (fewer than ``k`` entries) have id -1 and score -inf.
+        """
+        count = len(queries)
+        scores = np.full((count, k), -np.inf, dtype=np.float32)
+        ids = np.full((count, k), -1, dtype=np.int64)
+        if not len(self) or not count:
+            return scores, ids
+        top = min(k, len(self))
+        # Dequantize once per call; scales fold into the product column-wise
+        matrix = np.asarray(self.vectors, dtype=np.float32).T
+        scales = None if self.scales is None else np.asarray(self.scales, dtype=np.float32)
+        for start in range(0, count, settings.FP_INDEX_QUERY_BATCH):
+            block = np.asarray(queries[start:start + settings.FP_INDEX_QUERY_BATCH], dtype=np.float32)
+            similarity = block @ matrix
+            if scales is not None:
+                similarity *= scales
+            if top < len(self):
+                best = np.argpartition(-similarity, top - 1, axis=1)[:, :top]
+            else:
+                best = np.tile(np.arange(top), (len(block), 1))
+            best_scores = np.take_along_axis(similarity, best, axis=1)
+            order = np.argsort(-best_scores, axis=1, kind="stable")
+            rows = slice(start, start + len(block))
+            scores[rows, :top] = np.take_along_axis(best_scores, order, axis=1)
+            ids[rows, :top] = np.asarray(self.finding_ids)[np.take_along_axis(best, order, axis=1)]
+        return scores, ids
+
+
+def _index_dir(repository_id: int) -> str:
+    """Symlink to the repository's current index version"""
+    return os.path.join(settings.FP_INDEX_DIR, str(repository_id))
+
+
+@contextmanager
+def _build_lock(repository_id: int) -> Iterator[None]:
+    """Exclusive per repository, across threads and processes sharing ``FP_INDEX_DIR``"""
+    with open(os.path.join(settings.FP_INDEX_DIR, f"{repository_id}.lock"), "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _publish(repository_id: int, version: str) -> None:
+    """Point the repository's symlink at ``version`` and drop every other version.
+
+    The rename replaces the link atomically, so a reader resolves either the
+    old or the new version; files it already mapped stay readable after the
+    old version is removed. Must hold ``_build_lock``.
+    """
+    link = _index_dir(repository_id)
+    if os.path.isdir(link) and not os.path.islink(link):
+        shutil.rmtree(link)  # plain directory written before indexes were versioned
+    staged = f"{version}.link"
+    os.symlink(os.path.basename(version), staged)
+    os.replace(staged, link)
+    prefix = f"{repository_id}."
+    with os.scandir(settings.FP_INDEX_DIR) as entries:
+        for entry in entries:
+            # Earlier versions and ones left behind by crashed builds
+            if entry.name.startswith(prefix) and entry.is_dir(follow_symlinks=False) and entry.path != version:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def build(db: Session, repository_id: int, embedder: Optional[Embedder] = None) -> FalsePositiveIndex:
+    """Embed the repository's false positives and write the index files"""
+    embedder = embedder or default_embedder()
+    rows = db.execute(
+        select(Finding.id, Finding.title, Finding.code_snippet)
+        .where(
+            Finding.repository_id == repository_id,
+            Finding.is_false_positive.is_(True),
+            Finding.suppressed_by_id.is_(None),  # only what developers flagged themselves
+            Finding.code_snippet.isnot(None),
+        )
+        .order_by(Finding.id)
+    ).all()
+    finding_ids = np.array([row.id for row in rows], dtype=np.int64)
+    vectors = embedder.embed([embedding_text(row.title, row.code_snippet) for row in rows])
+    codes, scales = quantize(vectors, settings.FP_INDEX_DTYPE)
+
+    os.makedirs(settings.FP_INDEX_DIR, exist_ok=True)
+    with _build_lock(repository_id):
+        version = tempfile.mkdtemp(prefix=f"{repository_id}.", dir=settings.FP_INDEX_DIR)
+        np.save(os.path.join(version, "ids.npy"), finding_ids)
+        np.save(os.path.join(version, "vectors.npy"), codes)
+        if scales is not None:
+            np.save(os.path.join(version, "scales.npy"), scales)
+        with open(os.path.join(version, "meta.json"), "w") as handle:
+            json.dump({"embedder": embedder.identity, "dtype": settings.FP_INDEX_DTYPE, "count": len(rows)}, handle)
+        _publish(repository_id, version)
+
+    _cache.forget(repository_id)
+    logger.info("Built false-positive index for repository %s (%d entries)", repository_id, len(rows))
+    return FalsePositiveIndex(finding_ids, codes, scales)
+
+
+def _load(repository_id: int, embedder: Embedder) -> Optional[FalsePositiveIndex]:
+    directory = os.path.realpath(_index_dir(repository_id))  # resolved once: all files from one version
+    try:
+        with open(os.path.join(directory, "meta.json")) as handle:
+            meta = json.load(handle)
+        if meta.get("embedder") != embedder.identity or meta.get("dtype") != settings.FP_INDEX_DTYPE:
+            return None
+        if not meta.get("count"):
+            return FalsePositiveIndex(np.zeros(0, dtype=np.int64), np.zeros((0, embedder.dim), dtype=np.float32), None)
+        finding_ids = np.load(os.path.join(directory, "ids.npy"), mmap_mode="r")
+        vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r")
+        scales_path = os.path.join(directory, "scales.npy")
+        scales = np.load(scales_path, mmap_mode="r") if os.path.exists(scales_path) else None
+    except (OSError, ValueError):
+        return None
+    return FalsePositiveIndex(finding_ids, vectors, scales)
+
+
+def _stamp(repository_id: int) -> Optional[float]:
+    try:
+        return os.stat(os.path.join(_index_dir(repository_id), "meta.json")).st_mtime_ns
+    except OSError:
+        return None
+
+
+class _LoadedIndexes:
+    """Bounded LRU of memory-mapped indexes, revalidated against the files"""
+
+    def __init__(self):
+        self._entries: "OrderedDict[int, Tuple[Optional[float], FalsePositiveIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, repository_id: int) -> Optional[FalsePositiveIndex]:
+        with self._lock:
+            entry = self._entries.get(repository_id)
+            if entry is None or entry[0] != _stamp(repository_id):
+                return None
+            self._entries.move_to_end(repository_id)
+            return entry[1]
+
+    def put(self, repository_id: int, index: FalsePositiveIndex) -> None:
+        with self._lock:
+            self._entries[repository_id] = (_stamp(repository_id), index)
+            self._entries.move_to_end(repository_id)
+            while len(self._entries) > settings.FP_INDEX_MAX_LOADED:
+                self._entries.popitem(last=False)
+
+    def forget(self, repository_id: int) -> None:
+        with self._lock:
+            self._entries.pop(repository_id, None)
+
+
+_cache = _LoadedIndexes()
+
+
+def get_index(db: Session, repository_id: int) -> FalsePositiveIndex:
+    """The repository's index, loading or (re)building it as needed"""
+    index = _cache.get(repository_id)
+    if index is None:
+        embedder = default_embedder()
+        index = _load(repository_id, embedder)
+        if index is None:
+            build(db, repository_id, embedder)
+            index = _load(repository_id, embedder)
+        _cache.put(repository_id, index)
+    return index
+
+
+def match_false_positives(db: Session, repository_id: int, findings: List[dict]) -> Dict[int, int]:
+    """``{position in findings: known false positive id}`` for near-duplicates.
+
+    Only findings with a code snippet are compared; a title alone is too
+    generic to suppress on.
+    """
+    positions = [i for i, finding in enumerate(findings) if finding.get("code_snippet")]
+    if not positions:
+        return {}
+    index = get_index(db, repository_id)
+    if not len(index):
+        return {}
+    queries = default_embedder().embed(
+        [embedding_text(findings[i].get("title"), findings[i].get("code_snippet")) for i in positions]
+    )
+    scores, ids = index.search(queries, k=1)
+    return {
+        position: int(ids[row, 0])
+        for row, position in enumerate(positions)
+        if scores[row, 0] >= settings.FP_SUPPRESS_SIMILARITY
+    }
@@ -0,0 +1,234 @@
+"""
+Shared GitHub HTTP client
+
+One ``httpx.AsyncClient`` per process, opened by the startup warm-up, so GitHub
+calls reuse pooled keep-alive (and, with ``h2`` installed, HTTP/2)
+connections instead of paying a TLS handshake each. GET responses carrying an
+``ETag`` or ``Last-Modified`` are remembered and revalidated with conditional
+headers; GitHub answers unchanged resources with a 304 that does not count
+against the rate limit, and the cached body is returned in its place.
+
+Calls to the API host are paced per credential by ``github_scheduler`` and
+retried after rate-limit pauses.
+
+Base URLs come from settings so the client can be pointed at a mock server.
+``httpx`` itself is imported when the client is built, not with the app.
+"""
+import hashlib
+import importlib.util
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from app.core.config import settings
+from app.services.github_scheduler import PRIORITY_INTERACTIVE, GitHubScheduler, scheduler as default_scheduler
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None  # httpx[http2] extra
+
+# Response headers worth replaying from the cache
+CACHED_HEADERS = ("content-type", "etag", "last-modified", "link")
+
+
+@dataclass
+class CachedResponse:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    headers: dict
+    content: bytes
+
+
+class ResponseCache:
+    """Bounded LRU of validator + body per (URL, credential)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CachedResponse]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple[str, str]) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple[str, str], entry: CachedResponse) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: Tuple[str, str]) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def _credential_key(token: Optional[str]) -> str:
+    # Responses differ per user; key on a digest rather than the raw token
+    return hashlib.sha256(token.encode()).hexdigest()[:16] if token else ""
+
+
+class GitHubClient:
+    """App-lifetime GitHub API client with conditional-request caching"""
+
+    def __init__(
+        self,
+        transport: Optional["httpx.AsyncBaseTransport"] = None,
+        scheduler: Optional[GitHubScheduler] = None,
+    ):
+        self.transport = transport
+        self.scheduler = scheduler or default_scheduler
+        self.cache = ResponseCache(settings.GITHUB_CACHE_MAX_ENTRIES)
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """The pooled client, opened on first use outside the lifespan (scripts)"""
+        if self._client is None or self._client.is_closed:
+            self._client = self._build()
+        return self._client
+
+    def _build(self) -> "httpx.AsyncClient":
+        import httpx
+
+        http2 = settings.GITHUB_HTTP2 and HTTP2_AVAILABLE
+        if settings.GITHUB_HTTP2 and not HTTP2_AVAILABLE:
+            logger.info("h2 is not installed; GitHub client falls back to HTTP/1.1")
+        return httpx.AsyncClient(
+            base_url=settings.GITHUB_API_URL,
+            http2=http2,
+            transport=self.transport,
+            limits=httpx.Limits(
+                max_connections=settings.GITHUB_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GITHUB_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.GITHUB_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            timeout=httpx.Timeout(
+                settings.GITHUB_READ_TIMEOUT_SECONDS,
+                connect=settings.GITHUB_CONNECT_TIMEOUT_SECONDS,
+                pool=settings.GITHUB_POOL_TIMEOUT_SECONDS,
+            ),
+            headers={
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": settings.GITHUB_API_VERSION,
+                "User-Agent": settings.APP_NAME,
+            },
+        )
+
+    async def start(self) -> None:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build()
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self.cache.clear()
+
+    async def _send(
+        self, request: "httpx.Request", token: Optional[str], priority: int, budget: Optional[str]
+    ) -> "httpx.Response":
+        """Send through the credential's rate budget, retrying after rate-limit pauses"""
+        if request.url.host != self.client.base_url.host:
+            return await self.client.send(request)  # e.g. OAuth on github.com: not API-metered
+
+        key = budget or _credential_key(token)
+        write = request.method not in ("GET", "HEAD")
+        for attempt in range(settings.GITHUB_RATE_LIMIT_MAX_RETRIES + 1):
+            async with self.scheduler.slot(key, priority, write=write) as slot:
+                response = await self.client.send(request)
+                retry = slot.observe(response)
+            if not retry or attempt == settings.GITHUB_RATE_LIMIT_MAX_RETRIES:
+                return response
+        return response
+
+    async def get(
+        self,
+        url: str,
+        token: Optional[str] = None,
+        params: Optional[dict] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        budget: Optional[str] = None,
+    ) -> "httpx.Response":
+        """GET with ``If-None-Match``/``If-Modified-Since`` revalidation.
+
+        A 304 is turned back into a 200 carrying the cached body, with
+        ``response.extensions["from_cache"]`` set. ``budget`` overrides the
+        rate budget key (e.g. ``installation:<id>``); by default the token's.
+        """
+        request = self.client.build_request("GET", url, params=params, headers=_auth(token))
+        key = (str(request.url), _credential_key(token))
+        cached = self.cache.get(key)
+        if cached is not None:
+            if cached.etag:
+                request.headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                request.headers["If-Modified-Since"] = cached.last_modified
+
+        response = await self._send(request, token, priority, budget)
+        if response.status_code == 304 and cached is not None:
+            import httpx
+
+            return httpx.Response(
+                200,
+                headers={**cached.headers, **_rate_limit_headers(response)},
+                content=cached.content,
+                request=request,
+                extensions={"from_cache": True},
+            )
+
+        if response.status_code == 200:
+            etag = response.headers.get("etag")
+            last_modified = response.headers.get("last-modified")
+            if etag or last_modified:
+                self.cache.put(key, CachedResponse(
+                    etag=etag,
+                    last_modified=last_modified,
+                    headers={name: response.headers[name] for name in CACHED_HEADERS if name in response.headers},
+                    content=response.content,
+                ))
+        elif cached is not None:
+            self.cache.discard(key)
+        return response
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        token: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        budget: Optional[str] = None,
+        **kwargs,
+    ) -> "httpx.Response":
+        """Uncached request on the shared pool (writes, OAuth exchanges)"""
+        headers = {**_auth(token), **kwargs.pop("headers", {})}
+        request = self.client.build_request(method, url, headers=headers, **kwargs)
+        return await self._send(request, token, priority, budget)
+
+    async def post(self, url: str, token: Optional[str] = None, **kwargs) -> "httpx.Response":
+        return await self.request("POST", url, token=token, **kwargs)
+
+    async def get_json(self, url: str, token: Optional[str] = None, **kwargs):
+        response = await self.get(url, token=token, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+
+def _auth(token: Optional[str]) -> dict:
+    return {"Authorization": f"Bearer {token}"} if token else {}
+
+
+def _rate_limit_headers(response: "httpx.Response") -> dict:
+    return {name: value for name, value in response.headers.items() if name.startswith("x-ratelimit-")}
+
+
+github = GitHubClient()
@@ -0,0 +1,217 @@
+"""
+Rate-limit-aware scheduling of outbound GitHub API calls
+
+Every credential (a user's OAuth token, or an app installation) gets a
+``RateBudget``: a token bucket refilled at the pace that spends the remaining
+primary quota evenly until ``X-RateLimit-Reset``, a cap on concurrent
+requests, and a minimum gap between writes (GitHub's secondary limits).
+Callers wait in priority order, so PR review work overtakes background syncs,
+and background work stops while the budget is inside its reserve. Exhausted
+budgets and 403/429 responses pause the budget instead of failing; the client
+then retries the request.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_PR_REVIEW = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_BACKGROUND = 2
+
+_sequence = itertools.count()
+
+
+def _int_header(response: "httpx.Response", name: str) -> Optional[int]:
+    try:
+        return int(response.headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Classic token bucket on the monotonic clock"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class RateBudget:
+    """Request budget of a single GitHub credential"""
+
+    def __init__(self, key: str, limit: int):
+        self.key = key
+        self.limit = limit
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None  # epoch seconds, from X-RateLimit-Reset
+        self.paused_until = 0.0  # monotonic
+        self.next_write_at = 0.0  # monotonic
+        self.secondary_strikes = 0
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        self.bucket = TokenBucket(rate=limit / 3600, capacity=settings.GITHUB_RATE_LIMIT_BURST)
+        self._waiters: List[Tuple[int, int]] = []
+        self._changed = asyncio.Condition()
+
+    @property
+    def idle(self) -> bool:
+        return self.in_flight == 0 and not self._waiters
+
+    def _delay(self, priority: int, write: bool) -> float:
+        """Seconds the head-of-line request must still wait (0 = go now)"""
+        now = time.monotonic()
+        if self.reset_at is not None and time.time() >= self.reset_at:
+            # New rate-limit window: back to the nominal pace until headers say otherwise
+            self.remaining, self.reset_at = None, None
+            self.bucket.rate = self.limit / 3600
+        if self.paused_until > now:
+            return self.paused_until - now
+        if self.in_flight >= settings.GITHUB_MAX_CONCURRENT_PER_TOKEN:
+            return float("inf")  # woken by release()
+        if (
+            priority >= PRIORITY_BACKGROUND
+            and self.remaining is not None
+            and self.remaining <= self.limit * settings.GITHUB_RATE_LIMIT_RESERVE
+        ):
+            # Keep the reserve for PR reviews and interactive requests
+            return max(1.0, self._seconds_to_reset())
+        if write and self.next_write_at > now:
+            return self.next_write_at - now
+        return self.bucket.wait_time(now)
+
+    def _seconds_to_reset(self) -> float:
+        return max(0.0, (self.reset_at or 0) - time.time())
+
+    async def acquire(self, priority: int, write: bool) -> None:
+        entry = (priority, next(_sequence))
+        async with self._changed:
+            heapq.heappush(self._waiters, entry)
+            self._changed.notify_all()  # a more urgent request may now be head of line
+            try:
+                while True:
+                    delay = self._delay(priority, write) if self._waiters[0] == entry else float("inf")
+                    if delay <= 0:
+                        break
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), None if delay == float("inf") else delay)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+                self._changed.notify_all()
+                raise
+            heapq.heappop(self._waiters)
+            self.bucket.take()
+            if self.remaining is not None:
+                self.remaining -= 1
+            if write:
+                self.next_write_at = time.monotonic() + settings.GITHUB_WRITE_INTERVAL_SECONDS
+            self.in_flight += 1
+            self.last_used = time.monotonic()
+            self._changed.notify_all()
+
+    async def release(self) -> None:
+        async with self._changed:
+            self.in_flight -= 1
+            self._changed.notify_all()
+
+    def observe(self, response: "httpx.Response") -> bool:
+        """Update the budget from response headers; True if the request should be retried"""
+        limit = _int_header(response, "x-ratelimit-limit")
+        remaining = _int_header(response, "x-ratelimit-remaining")
+        reset = _int_header(response, "x-ratelimit-reset")
+        if limit:
+            self.limit = limit
+        if remaining is not None:
+            self.remaining = remaining
+        if reset is not None:
+            self.reset_at = reset
+        if remaining is not None and reset is not None:
+            # Spread what is left over the rest of the window
+            self.bucket.rate = max(remaining, 0) / max(self._seconds_to_reset(), 1.0)
+            self.bucket.tokens = min(self.bucket.tokens, max(remaining, 0))
+
+        if response.status_code not in (403, 429):
+            self.secondary_strikes = 0
+            return False
+
+        retry_after = _int_header(response, "retry-after")
+        if retry_after is not None:
+            pause = float(retry_after)
+        elif remaining == 0:
+            pause = self._seconds_to_reset() + 1
+        elif response.status_code == 429 or "secondary rate limit" in response.text.lower():
+            self.secondary_strikes += 1
+            pause = settings.GITHUB_SECONDARY_BACKOFF_SECONDS * 2 ** (self.secondary_strikes - 1)
+        else:
+            return False  # a real permission error
+
+        self.paused_until = max(self.paused_until, time.monotonic() + pause)
+        logger.warning("GitHub rate limit hit for budget %s; pausing %.0fs", self.key, pause)
+        return True
+
+
+class GitHubScheduler:
+    """Registry of per-credential budgets"""
+
+    def __init__(self):
+        self._budgets: Dict[str, RateBudget] = {}
+
+    def budget(self, key: str) -> RateBudget:
+        budget = self._budgets.get(key)
+        if budget is None:
+            if len(self._budgets) >= settings.GITHUB_MAX_BUDGETS:
+                self._prune()
+            limit = settings.GITHUB_RATE_LIMIT_PER_HOUR if key else settings.GITHUB_UNAUTHENTICATED_RATE_LIMIT_PER_HOUR
+            budget = self._budgets[key] = RateBudget(key, limit)
+        return budget
+
+    def _prune(self) -> None:
+        idle = sorted((b.last_used, k) for k, b in self._budgets.items() if b.idle)
+        for _, key in idle[: max(1, len(idle) // 2)]:
+            del self._budgets[key]
+
+    @asynccontextmanager
+    async def slot(
+        self, key: str, priority: int = PRIORITY_INTERACTIVE, write: bool = False
+    ) -> AsyncIterator[RateBudget]:
+        """Hold one request slot of ``key``'s budget; call ``observe`` on the response"""
+        budget = self.budget(key)
+        await budget.acquire(priority, write)
+        try:
+            yield budget
+        finally:
+            await budget.release()
+
+
+scheduler = GitHubScheduler()
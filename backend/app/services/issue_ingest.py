@@ -0,0 +1,186 @@
+"""
+Bulk issue ingestion
+
+Each finding is fingerprinted (``fingerprint.py``) and stored once per
+repository in ``findings``; a review only adds narrow ``review_findings``
+membership rows. Findings already known from earlier commits cost one indexed
+lookup and no write, so a re-scan of an unchanged codebase writes membership
+rows only. Everything runs in chunked multi-row statements without ORM
+objects. The review's severity counters are recomputed with a single
+aggregate query once all batches are in (``recompute_review_counters``).
+
+New findings that closely resemble a known false positive of the repository
+(``fp_index.py``) are stored already flagged, with ``suppressed_by_id``
+pointing at the match, and are left out of the counters. Before that,
+findings of rules suppressed for the repository (``rule_precision.py``) are
+dropped and the confidence of the rest is scaled by their rule's precision.
+"""
+from typing import Dict, Iterable, List
+
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.finding import Finding
+from app.models.review import Review
+from app.models.review_finding import ReviewFinding
+from app.services.fingerprint import assign_fingerprints
+from app.utils.sql import chunked, dialect_insert
+
+SEVERITIES = ("critical", "high", "medium", "low")
+
+# Finding columns taken from analyzer output
+FINDING_COLUMNS = (
+    "file_path",
+    "line_number",
+    "issue_type",
+    "severity",
+    "title",
+    "description",
+    "fix_suggestion",
+    "code_snippet",
+    "confidence_score",
+    "source",
+    "static_rule_id",
+)
+# Fingerprints per IN (...) lookup; keeps bound parameters under SQLite's limit
+LOOKUP_BATCH_SIZE = 500
+
+
+def _known_ids(db: Session, repository_id: int, fingerprints: List[str]) -> Dict[str, int]:
+    known: Dict[str, int] = {}
+    for batch in chunked(fingerprints, LOOKUP_BATCH_SIZE):
+        rows = db.execute(
+            select(Finding.fingerprint, Finding.id).where(
+                Finding.repository_id == repository_id, Finding.fingerprint.in_(batch)
+            )
+        )
+        known.update(dict(rows.all()))
+    return known
+
+
+def resolve_findings(db: Session, repository_id: int, review_id: int, findings: List[dict]) -> Dict[str, int]:
+    """``{fingerprint: finding id}``, inserting findings the repository has not seen"""
+    by_fingerprint = {finding["fingerprint"]: finding for finding in findings}
+    ids = _known_ids(db, repository_id, list(by_fingerprint))
+
+    new = [
+        {
+            **{column: finding.get(column) for column in FINDING_COLUMNS},
+            "repository_id": repository_id,
+            "fingerprint": fingerprint,
+            "is_false_positive": False,
+            "suppressed_by_id": None,
+            "first_seen_review_id": review_id,
+        }
+        for fingerprint, finding in by_fingerprint.items()
+        if fingerprint not in ids
+    ]
+    if new and settings.FP_SUPPRESS_ENABLED:
+        from app.services.fp_index import match_false_positives  # numpy; deferred to keep startup cheap
+
+        for position, match in match_false_positives(db, repository_id, new).items():
+            new[position]["is_false_positive"] = True
+            new[position]["suppressed_by_id"] = match
+    stmt = (
+        dialect_insert(db, Finding)
+        .on_conflict_do_nothing(index_elements=["repository_id", "fingerprint"])
+        .returning(Finding.fingerprint, Finding.id)
+    )
+    for batch in chunked(new, settings.ISSUE_INGEST_BATCH_SIZE):
+        # executemany + RETURNING is sent as batched multi-row INSERTs ("insertmanyvalues")
+        ids.update(dict(db.execute(stmt, batch).all()))
+
+    missing = [fingerprint for fingerprint in by_fingerprint if fingerprint not in ids]
+    if missing:
+        # Inserted concurrently by another review of the same repository
+        ids.update(_known_ids(db, repository_id, missing))
+    return ids
+
+
+def bulk_insert_issues(db: Session, review_id: int, findings: Iterable[dict]) -> int:
+    """Record findings (fingerprinted if they are not yet) as part of a review"""
+    findings = list(findings)
+    if not findings:
+        return 0
+    if any("fingerprint" not in finding for finding in findings):
+        findings = assign_fingerprints(findings)
+    repository_id = db.scalar(select(Review.repository_id).where(Review.id == review_id))
+    if settings.RULE_PRECISION_ENABLED:
+        from app.services.rule_precision import rule_model  # numpy; deferred to keep startup cheap
+
+        findings = rule_model.apply(db, repository_id, findings)
+        if not findings:
+            return 0
+    ids = resolve_findings(db, repository_id, review_id, findings)
+
+    links = {}
+    for finding in findings:
+        finding_id = ids[finding["fingerprint"]]
+        links[finding_id] = {
+            "review_id": review_id,
+            "finding_id": finding_id,
+            "line_number": finding.get("line_number"),
+            "in_diff": finding.get("in_diff"),
+        }
+    for batch in chunked(links.values(), settings.ISSUE_INGEST_BATCH_SIZE):
+        db.execute(
+            dialect_insert(db, ReviewFinding).on_conflict_do_nothing(index_elements=["review_id", "finding_id"]),
+            batch,
+        )
+    return len(links)
+
+
+def clear_review(db: Session, review_id: int) -> None:
+    """Drop a review's memberships before it is re-run; findings stay for other reviews"""
+    db.execute(delete(ReviewFinding).where(ReviewFinding.review_id == review_id))
+
+
+def counted_findings():
+    """Condition for findings that count towards a review's counters.
+
+    Findings tagged outside a PR's diff (``in_diff`` false), false positives
+    and confident AI dismissals are stored but not counted.
+    """
+    return and_(
+        ReviewFinding.in_diff.isnot(False),
+        Finding.is_false_positive.isnot(True),
+        or_(
+            func.coalesce(Finding.ai_verdict, "") != "dismiss",
+            Finding.confidence_score > 1.0 - settings.AI_DISMISS_MIN_CONFIDENCE,
+        ),
+    )
+
+
+def severity_counts_query(review_ids):
+    """``(review_id, critical, high, medium, low)`` per review over its counted findings.
+
+    Reviews without findings have no row.
+    """
+    counted = counted_findings()
+    return (
+        select(
+            ReviewFinding.review_id,
+            *(func.count().filter(counted, Finding.severity == severity) for severity in SEVERITIES),
+        )
+        .select_from(ReviewFinding)
+        .join(Finding, Finding.id == ReviewFinding.finding_id)
+        .where(ReviewFinding.review_id.in_(review_ids))
+        .group_by(ReviewFinding.review_id)
+    )
+
+
+def set_review_counters(review: Review, counts: Dict[str, int]) -> None:
+    review.total_issues = sum(counts.values())
+    review.critical_issues = counts["critical"]
+    review.high_issues = counts["high"]
+    review.medium_issues = counts["medium"]
+    review.low_issues = counts["low"]
+
+
+def recompute_review_counters(db: Session, review_id: int) -> Dict[str, int]:
+    """Set the review's issue counters from one aggregate over its counted findings"""
+    row = db.execute(severity_counts_query([review_id])).first()
+    counts = dict(zip(SEVERITIES, row[1:] if row else (0,) * len(SEVERITIES)))
+    set_review_counters(db.get(Review, review_id), counts)
+    return counts
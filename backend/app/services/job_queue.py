@@ -0,0 +1,488 @@
+"""
+Durable analysis job queue
+
+Jobs live in the ``analysis_jobs`` table so they survive restarts. Request
+handlers only insert a ``Review`` + ``AnalysisJob`` pair and return; a pool of
+asyncio workers started in ``main.lifespan`` claims jobs and drives the review
+through ``pending -> in_progress -> completed/failed``.
+
+A claimed job is leased to the pool that claimed it (``locked_by``) and the
+pool renews ``heartbeat_at`` every ``JOB_HEARTBEAT_SECONDS``. Jobs whose
+lease has not been renewed for ``JOB_LEASE_SECONDS`` belonged to a process
+that died and are re-queued by whichever pool notices first; jobs other
+pools are still working on are left alone. A pool that lost its lease does
+not write the outcome of the job.
+
+Enqueueing holds a transaction-level advisory lock so the dedupe lookup,
+the depth check and the insert cannot interleave between requests.
+"""
+import asyncio
+import logging
+import os
+import random
+import re
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.metrics import JOB_SECONDS, JOBS_FINISHED, WORKERS_BUSY
+from app.core.security import redact_secrets
+from app.models.analysis_job import AnalysisJob
+from app.models.repository import Repository
+from app.models.review import Review
+from app.models.webhook_delivery import WebhookDelivery
+from app.services import risk_index, rollups
+from app.services.analysis import AnalysisContext, analyze_review
+from app.utils.sql import advisory_xact_lock
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_JOB_STATUSES = ("queued", "running")
+# Reviews that make a new analysis of the same commit redundant
+LIVE_REVIEW_STATUSES = ("pending", "in_progress", "completed")
+COMMIT_SHA = re.compile(r"[0-9a-fA-F]{40}")
+# pg_advisory_xact_lock key serializing enqueue_analysis
+ENQUEUE_LOCK_KEY = 0x53454E51
+
+JobHandler = Callable[[AnalysisContext], Awaitable[None]]
+
+
+class QueueFullError(Exception):
+    """Raised when the queue is at capacity and new work must be rejected"""
+
+    def __init__(self, depth: int, retry_after: int):
+        super().__init__(f"Analysis queue is full ({depth} active jobs)")
+        self.depth = depth
+        self.retry_after = retry_after
+
+
+async def queue_depth(db: AsyncSession) -> int:
+    """Number of jobs that are queued or running"""
+    return await db.scalar(
+        select(func.count(AnalysisJob.id)).where(AnalysisJob.status.in_(ACTIVE_JOB_STATUSES))
+    )
+
+
+async def job_counts(db: AsyncSession) -> Dict[str, int]:
+    """Active jobs per status (every active status present, zero when idle)"""
+    rows = await db.execute(
+        select(AnalysisJob.status, func.count(AnalysisJob.id))
+        .where(AnalysisJob.status.in_(ACTIVE_JOB_STATUSES))
+        .group_by(AnalysisJob.status)
+    )
+    return {**dict.fromkeys(ACTIVE_JOB_STATUSES, 0), **dict(rows.all())}
+
+
+def is_commit_sha(ref: Optional[str]) -> bool:
+    """True for a full 40-character hex commit SHA (not a branch or tag name)"""
+    return ref is not None and COMMIT_SHA.fullmatch(ref) is not None
+
+
+async def find_existing_review(db: AsyncSession, repository_id: int, commit_sha: str) -> Optional[Review]:
+    """Latest live review of this exact commit, if any (uses the commit_sha index)"""
+    return await db.scalar(
+        select(Review)
+        .where(
+            Review.commit_sha == commit_sha,
+            Review.repository_id == repository_id,
+            Review.status.in_(LIVE_REVIEW_STATUSES),
+        )
+        .order_by(Review.id.desc())
+        .limit(1)
+    )
+
+
+async def supersede_queued(db: AsyncSession, repository_id: int, coalesce_key: str) -> int:
+    """Mark queued jobs (and their pending reviews) for the same branch/PR superseded.
+
+    Running jobs are left to finish; only work that has not started is dropped.
+    """
+    now = datetime.utcnow()
+    review_ids = (
+        await db.scalars(
+            update(AnalysisJob)
+            .where(
+                AnalysisJob.repository_id == repository_id,
+                AnalysisJob.coalesce_key == coalesce_key,
+                AnalysisJob.status == "queued",
+            )
+            .values(status="superseded", finished_at=now)
+            .returning(AnalysisJob.review_id)
+        )
+    ).all()
+    if not review_ids:
+        return 0
+    await db.execute(
+        update(Review)
+        .where(Review.id.in_(review_ids), Review.status == "pending")
+        .values(status="superseded", completed_at=now)
+    )
+    return len(review_ids)
+
+
+async def enqueue_analysis(
+    db: AsyncSession,
+    repository_id: int,
+    commit_sha: Optional[str],
+    kind: str,
+    pr_number: Optional[int] = None,
+    pr_url: Optional[str] = None,
+    payload: Optional[dict] = None,
+    coalesce_key: Optional[str] = None,
+) -> Tuple[Review, bool]:
+    """Create a pending review and queue a job for it.
+
+    ``commit_sha`` is the full SHA to analyze, or None for a manual scan of a
+    branch (``payload["ref"]``), whose review gets the SHA the worker
+    resolved. Returns ``(review, created)``. When the commit already has a
+    live review it is returned with ``created=False`` instead of starting a
+    second analysis. Queued jobs sharing ``coalesce_key`` are superseded by the new
+    one. Raises ``QueueFullError`` when ``JOB_QUEUE_MAX_DEPTH`` active jobs
+    exist. Objects already added to ``db`` are committed with the new job.
+    """
+    await advisory_xact_lock(db, ENQUEUE_LOCK_KEY)
+    existing = None
+    if commit_sha is not None:
+        existing = await find_existing_review(db, repository_id, commit_sha)
+    if existing is not None:
+        if existing.status == "pending" and pr_number and not existing.pr_number:
+            # Same head pushed to a branch and reported on its PR: keep one
+            # review and let it carry the PR context
+            existing.pr_number = pr_number
+            existing.pr_url = pr_url
+            job = await db.scalar(
+                select(AnalysisJob)
+                .where(AnalysisJob.review_id == existing.id)
+                .order_by(AnalysisJob.id.desc())
+                .limit(1)
+            )
+            if job is not None:
+                job.kind = kind
+                job.coalesce_key = coalesce_key
+                job.payload = {**(job.payload or {}), **(payload or {})}
+        await db.commit()
+        return existing, False
+
+    if coalesce_key:
+        await supersede_queued(db, repository_id, coalesce_key)
+
+    depth = await queue_depth(db)
+    if depth >= settings.JOB_QUEUE_MAX_DEPTH:
+        await db.rollback()
+        raise QueueFullError(depth, settings.JOB_QUEUE_RETRY_AFTER_SECONDS)
+
+    review = Review(
+        repository_id=repository_id,
+        commit_sha=commit_sha,
+        pr_number=pr_number,
+        pr_url=pr_url,
+        status="pending",
+    )
+    db.add(review)
+    await db.flush()
+
+    job = AnalysisJob(
+        review_id=review.id,
+        repository_id=repository_id,
+        kind=kind,
+        status="queued",
+        coalesce_key=coalesce_key,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        run_after=datetime.utcnow(),
+        payload=payload or {},
+    )
+    db.add(job)
+    await db.commit()
+
+    worker_pool.notify()
+    return review, True
+
+
+def retry_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter for the given (1-based) attempt"""
+    ceiling = min(
+        settings.JOB_RETRY_MAX_SECONDS,
+        settings.JOB_RETRY_BASE_SECONDS * (2 ** (attempt - 1)),
+    )
+    return random.uniform(ceiling / 2, ceiling)
+
+
+class JobWorkerPool:
+    """Fixed-size pool of asyncio workers consuming ``analysis_jobs``"""
+
+    def __init__(self, handler: JobHandler = analyze_review, concurrency: Optional[int] = None):
+        self.handler = handler
+        self.concurrency = concurrency or settings.JOB_WORKER_CONCURRENCY
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        # Lease owner id, unique per process and pool
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self) -> None:
+        """Recover expired leases and spawn the workers and the maintenance loop"""
+        if self._tasks:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        await self._recover_expired()
+        await self._prune_expired()
+        self._tasks = [
+            asyncio.create_task(self._worker(i), name=f"analysis-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._maintain(), name="analysis-maintenance"))
+
+    async def stop(self) -> None:
+        """Stop claiming jobs and wait for in-flight handlers to be cancelled"""
+        self._stopping = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wake idle workers after a job was enqueued"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self, index: int) -> None:
+        while not self._stopping:
+            ctx = await self._claim_next()
+            if ctx is None:
+                await self._wait_for_work()
+                continue
+            await self._run(ctx)
+
+    async def _wait_for_work(self) -> None:
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(
+                self._wakeup.wait(), timeout=settings.JOB_POLL_INTERVAL_SECONDS
+            )
+        except asyncio.TimeoutError:
+            pass
+
+    async def _maintain(self) -> None:
+        """Renew this pool's leases, recover expired ones and prune on a timer"""
+        last_prune = time.monotonic()
+        while not self._stopping:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+            try:
+                await self._heartbeat()
+                await self._recover_expired()
+                if time.monotonic() - last_prune >= settings.JOB_PRUNE_INTERVAL_SECONDS:
+                    await self._prune_expired()
+                    last_prune = time.monotonic()
+            except Exception:
+                logger.exception("Analysis job maintenance failed")
+
+    async def _run(self, ctx: AnalysisContext) -> None:
+        started = time.monotonic()
+        outcome = "interrupted"
+        WORKERS_BUSY.inc()
+        try:
+            await self.handler(ctx)
+        except asyncio.CancelledError:
+            # Shutdown mid-job: hand it back so the next boot picks it up
+            await asyncio.shield(self._release(ctx.job_id))
+            raise
+        except Exception as exc:
+            outcome = "failed"
+            logger.exception("Analysis job %d failed (attempt %d)", ctx.job_id, ctx.attempt)
+            await self._fail(ctx, redact_secrets(repr(exc)))
+        else:
+            outcome = "succeeded"
+            await self._complete(ctx, time.monotonic() - started)
+        finally:
+            WORKERS_BUSY.dec()
+            JOBS_FINISHED.inc(kind=ctx.kind, outcome=outcome)
+            JOB_SECONDS.observe(time.monotonic() - started, kind=ctx.kind, outcome=outcome)
+
+    async def _claim_next(self) -> Optional[AnalysisContext]:
+        """Atomically move the oldest runnable job from queued to running"""
+        async with AsyncSessionLocal() as db:
+            now = datetime.utcnow()
+            candidates = (
+                await db.scalars(
+                    select(AnalysisJob.id)
+                    .where(AnalysisJob.status == "queued", AnalysisJob.run_after <= now)
+                    .order_by(AnalysisJob.run_after, AnalysisJob.id)
+                    .limit(self.concurrency)
+                )
+            ).all()
+            for job_id in candidates:
+                # Conditional update so two workers can never claim the same job
+                claimed = await db.execute(
+                    update(AnalysisJob)
+                    .where(AnalysisJob.id == job_id, AnalysisJob.status == "queued")
+                    .values(
+                        status="running",
+                        started_at=now,
+                        locked_by=self.owner,
+                        heartbeat_at=now,
+                        attempts=AnalysisJob.attempts + 1,
+                    )
+                )
+                if not claimed.rowcount:
+                    continue
+                job = await db.get(AnalysisJob, job_id)
+                review = await db.get(Review, job.review_id)
+                review.status = "in_progress"
+                await db.commit()
+                return AnalysisContext(
+                    job_id=job.id,
+                    review_id=review.id,
+                    repository_id=job.repository_id,
+                    kind=job.kind,
+                    commit_sha=review.commit_sha,
+                    attempt=job.attempts,
+                    pr_number=review.pr_number,
+                    payload=dict(job.payload or {}),
+                )
+            await db.rollback()
+            return None
+
+    def _holds_lease(self, job: Optional[AnalysisJob]) -> bool:
+        """True while ``job`` is still running under this pool's lease"""
+        return job is not None and job.status == "running" and job.locked_by == self.owner
+
+    async def _complete(self, ctx: AnalysisContext, elapsed: float) -> None:
+        async with AsyncSessionLocal() as db:
+            now = datetime.utcnow()
+            job = await db.get(AnalysisJob, ctx.job_id, with_for_update=True)
+            if not self._holds_lease(job):
+                logger.warning("Lease on analysis job %d expired; dropping its outcome", ctx.job_id)
+                return
+            job.status = "succeeded"
+            job.finished_at = now
+            job.last_error = None
+            review = await db.get(Review, ctx.review_id)
+            review.status = "completed"
+            review.completed_at = now
+            review.analysis_time_seconds = int(round(elapsed))
+            await rollups.record_review(db, review)
+            repository = await db.get(Repository, ctx.repository_id)
+            if risk_index.covers_default_branch(ctx.kind, ctx.payload.get("ref"), repository.default_branch):
+                await risk_index.apply_review(db, ctx.repository_id, ctx.review_id)
+            await db.commit()
+
+    async def _fail(self, ctx: AnalysisContext, error: str) -> None:
+        async with AsyncSessionLocal() as db:
+            now = datetime.utcnow()
+            job = await db.get(AnalysisJob, ctx.job_id, with_for_update=True)
+            if not self._holds_lease(job):
+                logger.warning("Lease on analysis job %d expired; dropping its outcome", ctx.job_id)
+                return
+            job.last_error = error
+            review = await db.get(Review, ctx.review_id)
+            if job.attempts < job.max_attempts:
+                job.status = "queued"
+                job.locked_by = None
+                job.run_after = now + timedelta(seconds=retry_delay(job.attempts))
+                review.status = "pending"
+            else:
+                job.status = "failed"
+                job.finished_at = now
+                review.status = "failed"
+                review.completed_at = now
+            await db.commit()
+
+    async def _release(self, job_id: int) -> None:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(AnalysisJob, job_id, with_for_update=True)
+            if self._holds_lease(job):
+                job.status = "queued"
+                job.locked_by = None
+                job.attempts = max(job.attempts - 1, 0)
+                await db.execute(
+                    update(Review).where(Review.id == job.review_id).values(status="pending")
+                )
+                await db.commit()
+
+    async def _heartbeat(self) -> None:
+        """Renew the lease on every job this pool is running"""
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.status == "running", AnalysisJob.locked_by == self.owner)
+                .values(heartbeat_at=datetime.utcnow())
+            )
+            await db.commit()
+
+    async def _recover_expired(self) -> int:
+        """Re-queue running jobs whose lease expired (their process died).
+
+        A job that was on its last attempt is failed instead, so one that
+        keeps killing its worker (OOM, segfault) is not retried forever.
+        """
+        async with AsyncSessionLocal() as db:
+            now = datetime.utcnow()
+            cutoff = now - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+            expired = (
+                AnalysisJob.status == "running",
+                func.coalesce(AnalysisJob.heartbeat_at, AnalysisJob.started_at) < cutoff,
+            )
+            failed_ids = (
+                await db.scalars(
+                    update(AnalysisJob)
+                    .where(*expired, AnalysisJob.attempts >= AnalysisJob.max_attempts)
+                    .values(
+                        status="failed",
+                        locked_by=None,
+                        finished_at=now,
+                        last_error="Worker lost while running the final attempt (lease expired)",
+                    )
+                    .returning(AnalysisJob.review_id)
+                )
+            ).all()
+            requeued_ids = (
+                await db.scalars(
+                    update(AnalysisJob)
+                    .where(*expired)
+                    .values(status="queued", locked_by=None, run_after=now)
+                    .returning(AnalysisJob.review_id)
+                )
+            ).all()
+            if failed_ids:
+                await db.execute(
+                    update(Review)
+                    .where(Review.id.in_(failed_ids), Review.status == "in_progress")
+                    .values(status="failed", completed_at=now)
+                )
+            if requeued_ids:
+                await db.execute(
+                    update(Review)
+                    .where(Review.id.in_(requeued_ids), Review.status == "in_progress")
+                    .values(status="pending")
+                )
+            await db.commit()
+        if failed_ids:
+            logger.warning("Failed %d analysis jobs that lost their worker on the last attempt", len(failed_ids))
+        if requeued_ids:
+            logger.warning("Re-queued %d analysis jobs with expired leases", len(requeued_ids))
+            self.notify()
+        return len(requeued_ids) + len(failed_ids)
+
+    async def _prune_expired(self) -> None:
+        """Forget delivery ids past the redelivery window and stale hourly rollups"""
+        async with AsyncSessionLocal() as db:
+            cutoff = datetime.utcnow() - timedelta(hours=settings.WEBHOOK_DELIVERY_RETENTION_HOURS)
+            await db.execute(delete(WebhookDelivery).where(WebhookDelivery.received_at < cutoff))
+            await rollups.prune_hourly(db)
+            await db.commit()
+
+
+# Shared pool, started and stopped by main.lifespan
+worker_pool = JobWorkerPool()
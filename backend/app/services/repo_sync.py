@@ -0,0 +1,262 @@
+"""
+Incremental GitHub repository sync
+
+A full sync pages through ``/user/repos`` (sorted by name, so pages are
+stable) with the pages after the first fetched concurrently. Incremental
+syncs sort by ``updated`` and stop at the first repository older than the
+user's watermark, which for an unchanged account is a single (usually 304)
+page. Only repositories whose ``updated_at``/``pushed_at`` moved are written,
+in multi-row upserts.
+
+Per-repository ``/languages`` calls would cost one request each, so they are
+only made for enabled (monitored) repositories that were pushed to; the rest
+get the listing's primary ``language``.
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.repository import Repository
+from app.models.user import User
+from app.services.github_client import github
+from app.services.github_scheduler import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE
+from app.utils.sql import chunked, dialect_insert
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SyncStats:
+    full: bool = False
+    pages: int = 0
+    fetched: int = 0
+    changed: int = 0
+    languages_fetched: int = 0
+    written: int = 0
+
+
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Naive UTC, so database values (aware on PostgreSQL) compare with parsed ones"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return _utc(datetime.fromisoformat(value.replace("Z", "+00:00"))) if value else None
+
+
+def language_breakdown(languages: Dict[str, int]) -> Optional[dict]:
+    """GitHub's bytes-per-language map as lower-cased fractions"""
+    total = sum(languages.values())
+    if not total:
+        return None
+    return {name.lower(): round(size / total, 4) for name, size in languages.items()}
+
+
+def primary_language(repo: dict) -> Optional[dict]:
+    return {repo["language"].lower(): 1.0} if repo.get("language") else None
+
+
+def _last_page(response: "httpx.Response") -> int:
+    import httpx
+
+    last = response.links.get("last", {}).get("url")
+    return int(httpx.URL(last).params.get("page", 1)) if last else 1
+
+
+async def _get_page(token: str, params: dict, page: int, stats: SyncStats) -> "httpx.Response":
+    response = await github.get(
+        "/user/repos", token=token, params={**params, "page": page}, priority=PRIORITY_INTERACTIVE
+    )
+    response.raise_for_status()
+    stats.pages += 1
+    return response
+
+
+async def fetch_remote(token: str, since: Optional[datetime], stats: SyncStats) -> List[dict]:
+    """Repositories visible to the token; with ``since``, only those updated after it"""
+    base = {"per_page": settings.REPO_SYNC_PAGE_SIZE}
+    if since is None:
+        params = {**base, "sort": "full_name", "direction": "asc"}
+        first = await _get_page(token, params, 1, stats)
+        semaphore = asyncio.Semaphore(settings.REPO_SYNC_CONCURRENCY)
+
+        async def page(number: int) -> List[dict]:
+            async with semaphore:
+                return (await _get_page(token, params, number, stats)).json()
+
+        rest = await asyncio.gather(*(page(n) for n in range(2, _last_page(first) + 1)))
+        return [repo for batch in (first.json(), *rest) for repo in batch]
+
+    params = {**base, "sort": "updated", "direction": "desc"}
+    cutoff = since - timedelta(seconds=settings.REPO_SYNC_SKEW_SECONDS)
+    repos: List[dict] = []
+    page = 1
+    while True:
+        batch = (await _get_page(token, params, page, stats)).json()
+        for repo in batch:
+            updated_at = _parse_time(repo.get("updated_at"))
+            if updated_at is not None and updated_at <= cutoff:
+                return repos
+            repos.append(repo)
+        if len(batch) < settings.REPO_SYNC_PAGE_SIZE:
+            return repos
+        page += 1
+
+
+async def _fetch_languages(token: str, repos: List[dict], stats: SyncStats) -> Dict[int, Optional[dict]]:
+    semaphore = asyncio.Semaphore(settings.REPO_SYNC_CONCURRENCY)
+
+    async def one(repo: dict) -> Tuple[int, Optional[dict]]:
+        async with semaphore:
+            response = await github.get(
+                f"/repos/{repo['full_name']}/languages", token=token, priority=PRIORITY_BACKGROUND
+            )
+        stats.languages_fetched += 1
+        if response.status_code != 200:
+            return repo["id"], None
+        return repo["id"], language_breakdown(response.json())
+
+    return dict(await asyncio.gather(*(one(repo) for repo in repos)))
+
+
+async def _existing(db: AsyncSession, user_id: int, external_ids: List[int]) -> Dict[int, tuple]:
+    known: Dict[int, tuple] = {}
+    for batch in chunked(external_ids, settings.REPO_SYNC_BATCH_SIZE):
+        rows = await db.execute(
+            select(
+                Repository.external_id,
+                Repository.remote_updated_at,
+                Repository.remote_pushed_at,
+                Repository.language_breakdown,
+                Repository.is_enabled,
+            ).where(
+                Repository.user_id == user_id,
+                Repository.platform == "github",
+                Repository.external_id.in_(batch),
+            )
+        )
+        for external_id, updated_at, pushed_at, languages, is_enabled in rows:
+            known[external_id] = (_utc(updated_at), _utc(pushed_at), languages, is_enabled)
+    return known
+
+
+async def _link_existing(db: AsyncSession, user_id: int, remote: List[dict]) -> int:
+    """Give repositories added before sync existed their GitHub id, matched by URL.
+
+    The upsert conflicts on ``external_id``, so without this those rows
+    would be inserted a second time.
+    """
+    by_url = {repo["html_url"]: repo["id"] for repo in remote}
+    links = []
+    for batch in chunked(list(by_url), settings.REPO_SYNC_BATCH_SIZE):
+        rows = await db.execute(
+            select(Repository.id, Repository.repo_url).where(
+                Repository.user_id == user_id,
+                Repository.platform == "github",
+                Repository.external_id.is_(None),
+                Repository.repo_url.in_(batch),
+            )
+        )
+        links.extend({"id": row_id, "external_id": by_url[url]} for row_id, url in rows)
+    if links:
+        await db.execute(update(Repository), links)
+    return len(links)
+
+
+async def upsert_repositories(db: AsyncSession, rows: List[dict]) -> int:
+    """Multi-row upsert on (user_id, platform, external_id); unchanged rows are not rewritten"""
+    written = 0
+    for batch in chunked(rows, settings.REPO_SYNC_BATCH_SIZE):
+        stmt = dialect_insert(db, Repository).values(batch)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "platform", "external_id"],
+            set_={
+                "repo_name": excluded.repo_name,
+                "repo_url": excluded.repo_url,
+                "default_branch": excluded.default_branch,
+                "language_breakdown": excluded.language_breakdown,
+                "remote_updated_at": excluded.remote_updated_at,
+                "remote_pushed_at": excluded.remote_pushed_at,
+            },
+            where=or_(
+                Repository.remote_updated_at.is_distinct_from(excluded.remote_updated_at),
+                Repository.remote_pushed_at.is_distinct_from(excluded.remote_pushed_at),
+            ),
+        )
+        written += (await db.execute(stmt)).rowcount
+    return written
+
+
+def _breakdown(repo: dict, previous: Optional[tuple], fetched: Dict[int, Optional[dict]]) -> Optional[dict]:
+    if fetched.get(repo["id"]):
+        return fetched[repo["id"]]
+    if previous is not None and previous[2] and previous[3]:
+        return previous[2]  # keep the detailed breakdown of a monitored repository
+    return primary_language(repo)
+
+
+async def sync_user_repositories(db: AsyncSession, user: User, full: bool = False) -> SyncStats:
+    """Bring ``user``'s GitHub repositories up to date and commit"""
+    if not user.access_token:
+        raise ValueError("User has no GitHub access token")
+
+    started = datetime.utcnow()
+    last_full = _utc(user.repos_full_synced_at)
+    full = (
+        full
+        or user.repos_synced_at is None
+        or last_full is None
+        or started - last_full > timedelta(hours=settings.REPO_SYNC_FULL_INTERVAL_HOURS)
+    )
+    stats = SyncStats(full=full)
+    remote = await fetch_remote(user.access_token, None if full else _utc(user.repos_synced_at), stats)
+    stats.fetched = len(remote)
+
+    await _link_existing(db, user.id, remote)
+    known = await _existing(db, user.id, [repo["id"] for repo in remote])
+    changed, pushed = [], []
+    for repo in remote:
+        updated_at, pushed_at = _parse_time(repo.get("updated_at")), _parse_time(repo.get("pushed_at"))
+        previous = known.get(repo["id"])
+        if previous is not None and previous[:2] == (updated_at, pushed_at):
+            continue
+        changed.append(repo)
+        if previous is not None and previous[3] and (previous[1] != pushed_at or previous[2] is None):
+            pushed.append(repo)
+    stats.changed = len(changed)
+
+    languages = await _fetch_languages(user.access_token, pushed, stats) if pushed else {}
+    rows = [
+        {
+            "user_id": user.id,
+            "platform": "github",
+            "external_id": repo["id"],
+            "repo_name": repo["full_name"],
+            "repo_url": repo["html_url"],
+            "default_branch": repo.get("default_branch") or "main",
+            "language_breakdown": _breakdown(repo, known.get(repo["id"]), languages),
+            "remote_updated_at": _parse_time(repo.get("updated_at")),
+            "remote_pushed_at": _parse_time(repo.get("pushed_at")),
+        }
+        for repo in changed
+    ]
+    stats.written = await upsert_repositories(db, rows) if rows else 0
+
+    user.repos_synced_at = started
+    if full:
+        user.repos_full_synced_at = started
+    await db.commit()
+    logger.info("Synced repositories for user %s: %s", user.id, stats)
+    return stats
@@ -0,0 +1,318 @@
+"""
+Review read paths for the API
+
+Listings use keyset (cursor) pagination over ``(created_at, id)`` behind the
+``ix_reviews_*_created`` composite indexes, so any page costs the same as the
+first. Every listing is limited to the caller's repositories
+(``repository_ids``: a list or an id subquery). Totals are estimated from
+the query planner on PostgreSQL instead of running ``COUNT(*)``.
+
+Review detail is two queries regardless of issue count: the review row (with
+its repository joined) and one flat select over its findings, grouped in
+Python. The review row alone is enough to compute the ETag, so a conditional
+request that matches never reads the issues.
+
+Findings are stored once per repository and linked to reviews, so the changes
+between two reviews are set differences over the narrow membership rows:
+new (only in the review), fixed (only in the base) and persisting (both).
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import joinedload
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.core.config import settings
+from app.models.finding import Finding
+from app.models.review import Review
+from app.models.review_finding import ReviewFinding
+from app.utils.sql import chunked
+
+REVIEW_SUMMARY_FIELDS = (
+    "id",
+    "repository_id",
+    "commit_sha",
+    "pr_number",
+    "pr_url",
+    "status",
+    "quality_score",
+    "total_issues",
+    "critical_issues",
+    "high_issues",
+    "medium_issues",
+    "low_issues",
+    "analysis_time_seconds",
+    "created_at",
+    "completed_at",
+)
+
+SEVERITY_ORDER = ("critical", "high", "medium", "low")
+
+# Columns sent per issue in review detail; file_path and severity are implied
+# by the grouping and omitted from each entry
+ISSUE_DETAIL_COLUMNS = (
+    Finding.id,
+    Finding.file_path,
+    Finding.severity,
+    ReviewFinding.line_number,
+    Finding.issue_type,
+    Finding.title,
+    Finding.description,
+    Finding.fix_suggestion,
+    Finding.code_snippet,
+    Finding.confidence_score,
+    Finding.source,
+    Finding.static_rule_id,
+    Finding.ai_verdict,
+    Finding.ai_explanation,
+    Finding.is_false_positive,
+    ReviewFinding.in_diff,
+    Finding.first_seen_review_id,
+)
+
+
+class InvalidCursor(ValueError):
+    """The pagination cursor was not produced by ``encode_cursor``"""
+
+
+def encode_cursor(created_at: datetime, review_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), review_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, review_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(review_id)
+    except (ValueError, TypeError) as exc:
+        raise InvalidCursor("Invalid pagination cursor") from exc
+
+
+def serialize_review(review: Review) -> dict:
+    data = {field: getattr(review, field) for field in REVIEW_SUMMARY_FIELDS}
+    for field in ("created_at", "completed_at"):
+        if data[field] is not None:
+            data[field] = data[field].isoformat()
+    return data
+
+
+def _filtered(query, repository_ids, status: Optional[str]):
+    query = query.where(Review.repository_id.in_(repository_ids))
+    if status is not None:
+        query = query.where(Review.status == status)
+    return query
+
+
+async def list_reviews(
+    db: AsyncSession,
+    repository_ids,
+    status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = 50,
+) -> Tuple[List[Review], Optional[str]]:
+    """One page of reviews, newest first, and the cursor for the next page"""
+    query = _filtered(select(Review), repository_ids, status)
+    column = Review.created_at
+    sqlite = db.bind.dialect.name == "sqlite"
+    if sqlite:
+        # SQLite stores timestamps as text; normalise them so server-default
+        # values without microseconds compare correctly. The sort uses the
+        # same key, or rows within one second could be skipped or repeated.
+        column = func.datetime(column)
+    if cursor:
+        created_at, review_id = decode_cursor(cursor)
+        boundary = literal(created_at, Review.created_at.type)
+        if sqlite:
+            boundary = func.datetime(boundary)
+        query = query.where(tuple_(column, Review.id) < tuple_(boundary, review_id))
+    # Fetch one extra row to learn whether another page exists
+    rows = (await db.scalars(query.order_by(column.desc(), Review.id.desc()).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return rows, next_cursor
+
+
+class ExplainJSON(Executable, ClauseElement):
+    """``EXPLAIN (FORMAT JSON) <query>`` that keeps the query's bind parameters"""
+
+    inherit_cache = False
+
+    def __init__(self, query):
+        self.query = query
+
+
+@compiles(ExplainJSON, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return f"EXPLAIN (FORMAT JSON) {compiler.process(element.query, **kw)}"
+
+
+async def estimate_total(
+    db: AsyncSession, repository_ids, status: Optional[str] = None
+) -> Tuple[int, bool]:
+    """``(count, exact)`` for the filtered listing without a full ``COUNT(*)``.
+
+    PostgreSQL returns the planner's row estimate. Other databases count up
+    to ``REVIEW_COUNT_CAP`` rows; ``exact`` is False when the cap was hit.
+    """
+    query = _filtered(select(Review.id), repository_ids, status)
+    if db.bind.dialect.name == "postgresql":
+        plan = await db.scalar(ExplainJSON(query))
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"]), False
+
+    cap = settings.REVIEW_COUNT_CAP
+    count = await db.scalar(select(func.count()).select_from(query.limit(cap + 1).subquery()))
+    return min(count, cap), count <= cap
+
+
+async def get_review_header(db: AsyncSession, review_id: int) -> Optional[Review]:
+    """The review row and its repository, without issues"""
+    return await db.scalar(
+        select(Review).options(joinedload(Review.repository)).where(Review.id == review_id)
+    )
+
+
+def review_etag(review: Review) -> str:
+    """Strong ETag for the detail view.
+
+    Issues are only rewritten while a review runs (status changes) and at
+    completion (``completed_at``); feedback bumps ``feedback_version``.
+    """
+    completed_at = review.completed_at.isoformat() if review.completed_at else ""
+    raw = f"{review.id}:{review.status}:{completed_at}:{review.feedback_version or 0}"
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` check (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _compact_issue(row, review_id: int) -> dict:
+    data = {
+        "id": row.id,
+        "line": row.line_number,
+        "type": row.issue_type,
+        "title": row.title,
+        "description": row.description,
+        "fix": row.fix_suggestion,
+        "snippet": row.code_snippet,
+        "confidence": row.confidence_score,
+        "source": row.source,
+        "rule": row.static_rule_id,
+        "ai_verdict": row.ai_verdict,
+        "ai_explanation": row.ai_explanation,
+        "in_diff": row.in_diff,
+    }
+    data = {key: value for key, value in data.items() if value is not None}
+    if row.is_false_positive:
+        data["false_positive"] = True
+    if row.first_seen_review_id == review_id:
+        data["new"] = True
+    return data
+
+
+async def grouped_issues(db: AsyncSession, review_id: int) -> List[dict]:
+    """Issues of a review grouped by file, then by severity (most severe first)"""
+    rows = await db.execute(
+        select(*ISSUE_DETAIL_COLUMNS)
+        .select_from(ReviewFinding)
+        .join(Finding, Finding.id == ReviewFinding.finding_id)
+        .where(ReviewFinding.review_id == review_id)
+        .order_by(Finding.file_path, ReviewFinding.line_number, Finding.id)
+    )
+
+    files: Dict[str, Dict[str, List[dict]]] = {}
+    for row in rows:
+        by_severity = files.setdefault(row.file_path, {})
+        by_severity.setdefault(row.severity, []).append(_compact_issue(row, review_id))
+
+    groups = []
+    for file_path, by_severity in files.items():
+        ordered = {severity: by_severity.pop(severity) for severity in SEVERITY_ORDER if severity in by_severity}
+        ordered.update(by_severity)  # unexpected severities keep their place at the end
+        groups.append({
+            "file_path": file_path,
+            "counts": {severity: len(issues) for severity, issues in ordered.items()},
+            "issues": ordered,
+        })
+    return groups
+
+
+def serialize_review_detail(review: Review) -> dict:
+    data = serialize_review(review)
+    data["feedback_version"] = review.feedback_version or 0
+    data["repository"] = {
+        "id": review.repository.id,
+        "repo_name": review.repository.repo_name,
+        "platform": review.repository.platform,
+    }
+    return data
+
+
+async def previous_review_id(db: AsyncSession, review: Review) -> Optional[int]:
+    """The latest completed review of the same repository created before ``review``"""
+    return await db.scalar(
+        select(Review.id)
+        .where(
+            Review.repository_id == review.repository_id,
+            Review.status == "completed",
+            Review.id != review.id,
+            Review.created_at <= review.created_at,
+        )
+        .order_by(Review.created_at.desc(), Review.id.desc())
+        .limit(1)
+    )
+
+
+async def _finding_ids(db: AsyncSession, review_id: int) -> set:
+    rows = await db.scalars(select(ReviewFinding.finding_id).where(ReviewFinding.review_id == review_id))
+    return set(rows)
+
+
+async def _detail_rows(db: AsyncSession, review_id: int, finding_ids: List[int]) -> List[dict]:
+    issues = []
+    for batch in chunked(sorted(finding_ids), 500):
+        rows = await db.execute(
+            select(*ISSUE_DETAIL_COLUMNS)
+            .select_from(ReviewFinding)
+            .join(Finding, Finding.id == ReviewFinding.finding_id)
+            .where(ReviewFinding.review_id == review_id, ReviewFinding.finding_id.in_(batch))
+        )
+        for row in rows:
+            issue = _compact_issue(row, review_id)
+            issue["file_path"] = row.file_path
+            issue["severity"] = row.severity
+            issues.append(issue)
+    issues.sort(key=lambda issue: (issue["file_path"], issue.get("line") or 0, issue["id"]))
+    return issues
+
+
+async def review_changes(db: AsyncSession, review: Review, base_id: Optional[int]) -> dict:
+    """New, fixed and persisting findings of ``review`` relative to review ``base_id``.
+
+    Without a base every finding of the review is new.
+    """
+    current = await _finding_ids(db, review.id)
+    base = await _finding_ids(db, base_id) if base_id is not None else set()
+    return {
+        "base_review_id": base_id,
+        "new": await _detail_rows(db, review.id, current - base),
+        "fixed": await _detail_rows(db, base_id, base - current) if base_id is not None else [],
+        "persisting": len(current & base),
+    }
@@ -0,0 +1,227 @@
+"""
+Directory-tree risk index for the heatmap
+
+Every file with findings and each of its ancestor directories has a
+``risk_nodes`` row carrying the subtree's weighted risk. When a full review
+of the default branch completes, only files whose risk changed are touched:
+the per-file delta is added to the file and all of its ancestors, so any
+directory's risk is a single-row read and never requires rescanning issues.
+
+Updates of one repository are serialized on its row (``FOR UPDATE``), and
+``repositories.risk_review_id`` records the review the index reflects: a
+review queued before it (an older commit finishing late) or a repeat of it
+is skipped. Deltas are computed against the nodes of the files in either
+that review or the new one, not the whole tree.
+"""
+import posixpath
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.finding import Finding
+from app.models.repository import Repository
+from app.models.review_finding import ReviewFinding
+from app.models.risk_node import RiskNode
+from app.services.analysis import SEVERITY_WEIGHTS
+from app.services.issue_ingest import counted_findings
+from app.utils.sql import chunked, dialect_insert
+
+UPSERT_BATCH_SIZE = 500
+# Deltas below this are float noise from repeated add/subtract
+RISK_EPSILON = 1e-9
+
+
+def ancestors(path: str) -> List[str]:
+    """'a/b/c.py' -> ['a/b', 'a', ''] (nearest first, root last)"""
+    parents = []
+    while path:
+        path = posixpath.dirname(path)
+        parents.append(path)
+    return parents
+
+
+def covers_default_branch(kind: str, ref: Optional[str], default_branch: Optional[str]) -> bool:
+    """Only full reviews of the default branch feed the index"""
+    branch = default_branch or "main"
+    if kind == "push":
+        return ref == f"refs/heads/{branch}"
+    if kind == "manual":
+        return ref == branch
+    return False
+
+
+def issue_weight():
+    """SQL expression: severity weight scaled by confidence (unknown = 1.0)"""
+    severity = case(
+        *((Finding.severity == name, weight) for name, weight in SEVERITY_WEIGHTS.items()),
+        else_=0,
+    )
+    return severity * func.coalesce(Finding.confidence_score, 1.0)
+
+
+async def file_risk_for_review(db: AsyncSession, review_id: int) -> Dict[str, Tuple[float, int]]:
+    """``{file_path: (risk, issue_count)}`` for a review, aggregated in SQL"""
+    rows = await db.execute(
+        select(Finding.file_path, func.sum(issue_weight()), func.count(Finding.id))
+        .select_from(ReviewFinding)
+        .join(Finding, Finding.id == ReviewFinding.finding_id)
+        .where(ReviewFinding.review_id == review_id, counted_findings())
+        .group_by(Finding.file_path)
+    )
+    return {path: (float(risk or 0.0), count) for path, risk, count in rows}
+
+
+async def _file_paths(db: AsyncSession, review_id: int) -> set:
+    rows = await db.scalars(
+        select(Finding.file_path)
+        .distinct()
+        .select_from(ReviewFinding)
+        .join(Finding, Finding.id == ReviewFinding.finding_id)
+        .where(ReviewFinding.review_id == review_id)
+    )
+    return set(rows)
+
+
+async def _indexed_files(db: AsyncSession, repository_id: int, paths: set) -> Dict[str, Tuple[float, int]]:
+    indexed = {}
+    for batch in chunked(sorted(paths), UPSERT_BATCH_SIZE):
+        rows = await db.execute(
+            select(RiskNode.path, RiskNode.risk, RiskNode.subtree_issues).where(
+                RiskNode.repository_id == repository_id,
+                RiskNode.is_file.is_(True),
+                RiskNode.path.in_(batch),
+            )
+        )
+        indexed.update({path: (risk, issues) for path, risk, issues in rows})
+    return indexed
+
+
+async def apply_review(db: AsyncSession, repository_id: int, review_id: int) -> int:
+    """Replace the indexed risk of every file with this review's findings.
+
+    Files that had risk before but no findings now drop to zero. Returns the
+    number of nodes written (0 when the review is skipped). The caller
+    commits, which releases the repository lock.
+    """
+    repository = await db.scalar(
+        select(Repository)
+        .where(Repository.id == repository_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    previous = repository.risk_review_id
+    if previous is not None and review_id <= previous:
+        return 0
+    repository.risk_review_id = review_id
+
+    new_files = await file_risk_for_review(db, review_id)
+    touched = set(new_files)
+    if previous is not None:
+        touched |= await _file_paths(db, previous)
+    else:
+        # First review through the index since it was introduced: every node may be stale
+        touched |= set(await db.scalars(
+            select(RiskNode.path).where(RiskNode.repository_id == repository_id, RiskNode.is_file.is_(True))
+        ))
+    old_files = await _indexed_files(db, repository_id, touched)
+
+    deltas: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0.0, 0])
+    for path in set(new_files) | set(old_files):
+        new_risk, new_issues = new_files.get(path, (0.0, 0))
+        old_risk, old_issues = old_files.get(path, (0.0, 0))
+        risk_delta, issue_delta = new_risk - old_risk, new_issues - old_issues
+        if abs(risk_delta) < RISK_EPSILON and not issue_delta:
+            continue
+        own = deltas[path]
+        own[0] += risk_delta
+        own[1] += risk_delta
+        own[2] += issue_delta
+        for parent in ancestors(path):
+            node = deltas[parent]
+            node[1] += risk_delta
+            node[2] += issue_delta
+
+    if not deltas:
+        return 0
+    await _upsert(db, repository_id, deltas, files=set(new_files) | set(old_files))
+    # Subtrees with no remaining findings leave the index
+    await db.execute(
+        delete(RiskNode).where(RiskNode.repository_id == repository_id, RiskNode.subtree_issues <= 0)
+    )
+    return len(deltas)
+
+
+async def _upsert(db: AsyncSession, repository_id: int, deltas: Dict[str, List[float]], files: set) -> None:
+    table = RiskNode.__table__
+    rows = [
+        {
+            "repository_id": repository_id,
+            "path": path,
+            "parent_path": posixpath.dirname(path) if path else None,
+            "depth": path.count("/") + 1 if path else 0,
+            "is_file": path in files,
+            "risk": risk,
+            "subtree_risk": subtree_risk,
+            "subtree_issues": int(issues),
+        }
+        for path, (risk, subtree_risk, issues) in sorted(deltas.items())
+    ]
+    for batch in chunked(rows, UPSERT_BATCH_SIZE):
+        stmt = dialect_insert(db, RiskNode).values(batch)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["repository_id", "path"],
+            set_={
+                "risk": table.c.risk + stmt.excluded.risk,
+                "subtree_risk": table.c.subtree_risk + stmt.excluded.subtree_risk,
+                "subtree_issues": table.c.subtree_issues + stmt.excluded.subtree_issues,
+            },
+        )
+        await db.execute(stmt)
+
+
+async def hotspots(
+    db: AsyncSession, repository_id: int, path: Optional[str] = None, limit: int = 20
+) -> dict:
+    """Top-K riskiest files and immediate children under ``path`` (root if None)"""
+    prefix = (path or "").strip("/")
+    node = await db.scalar(
+        select(RiskNode).where(RiskNode.repository_id == repository_id, RiskNode.path == prefix)
+    )
+
+    files_query = select(RiskNode).where(
+        RiskNode.repository_id == repository_id, RiskNode.is_file.is_(True)
+    )
+    if prefix:
+        files_query = files_query.where(
+            (RiskNode.path == prefix) | RiskNode.path.startswith(prefix + "/", autoescape=True)
+        )
+    top_files = (await db.scalars(files_query.order_by(RiskNode.risk.desc()).limit(limit))).all()
+
+    children = []
+    if node is not None and not node.is_file:
+        children = (
+            await db.scalars(
+                select(RiskNode)
+                .where(and_(RiskNode.repository_id == repository_id, RiskNode.parent_path == prefix))
+                .order_by(RiskNode.subtree_risk.desc())
+                .limit(limit)
+            )
+        ).all()
+
+    return {
+        "path": prefix,
+        "risk": _serialize(node) if node is not None else None,
+        "hotspots": [_serialize(item) for item in top_files],
+        "children": [_serialize(item) for item in children],
+    }
+
+
+def _serialize(node: RiskNode) -> dict:
+    return {
+        "path": node.path,
+        "is_file": node.is_file,
+        "risk": round(node.subtree_risk, 3),
+        "issues": node.subtree_issues,
+    }
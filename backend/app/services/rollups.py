@@ -0,0 +1,201 @@
+"""
+Dashboard rollups
+
+``daily_metrics`` and ``hourly_metrics`` hold one row per (repository, day)
+and (repository, hour) that is incremented in the same transaction that
+completes a review, so dashboard reads touch O(buckets) rows instead of
+scanning ``reviews`` / ``review_findings``. Hourly rows are kept for
+``HOURLY_METRICS_RETENTION_DAYS``.
+"""
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.daily_metric import DailyMetric, HourlyMetric
+from app.models.finding import Finding
+from app.models.review import Review
+from app.models.review_finding import ReviewFinding
+from app.utils.sql import dialect_insert
+
+COUNTER_COLUMNS = (
+    "reviews_count",
+    "total_issues",
+    "critical_issues",
+    "high_issues",
+    "medium_issues",
+    "low_issues",
+    "false_positives",
+    "analysis_time_sum",
+    "analysis_time_count",
+    "quality_score_sum",
+    "quality_score_count",
+)
+
+
+async def increment(db: AsyncSession, repository_id: int, day: date, **deltas: int) -> None:
+    """Add ``deltas`` to the (repository, day) row, creating it if needed"""
+    await _increment(db, DailyMetric, "date", repository_id, day, deltas)
+
+
+async def increment_hour(db: AsyncSession, repository_id: int, hour: datetime, **deltas: int) -> None:
+    """Add ``deltas`` to the (repository, hour) row, creating it if needed"""
+    hour = hour.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    await _increment(db, HourlyMetric, "hour", repository_id, hour, deltas)
+
+
+async def _increment(db: AsyncSession, model, bucket_column: str, repository_id: int, bucket, deltas: dict) -> None:
+    values = {column: deltas.get(column, 0) for column in COUNTER_COLUMNS}
+    stmt = dialect_insert(db, model).values(
+        repository_id=repository_id, **{bucket_column: bucket}, **values
+    )
+    table = model.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["repository_id", bucket_column],
+        set_={
+            column: table.c[column] + stmt.excluded[column]
+            for column in COUNTER_COLUMNS
+            if column in deltas
+        },
+    )
+    await db.execute(stmt)
+
+
+async def record_review(db: AsyncSession, review: Review) -> None:
+    """Fold a just-completed review into its day and hour rollups (caller commits)"""
+    completed_at = review.completed_at or datetime.utcnow()
+    deltas = {
+        "reviews_count": 1,
+        "total_issues": review.total_issues or 0,
+        "critical_issues": review.critical_issues or 0,
+        "high_issues": review.high_issues or 0,
+        "medium_issues": review.medium_issues or 0,
+        "low_issues": review.low_issues or 0,
+    }
+    if review.analysis_time_seconds is not None:
+        deltas["analysis_time_sum"] = review.analysis_time_seconds
+        deltas["analysis_time_count"] = 1
+    if review.quality_score is not None:
+        deltas["quality_score_sum"] = review.quality_score
+        deltas["quality_score_count"] = 1
+    await increment(db, review.repository_id, completed_at.date(), **deltas)
+    await increment_hour(db, review.repository_id, completed_at, **deltas)
+
+
+# Review counters feedback can change after completion, by rollup column
+ADJUSTABLE_COUNTERS = {
+    "total_issues": "total_issues",
+    "critical_issues": "critical_issues",
+    "high_issues": "high_issues",
+    "medium_issues": "medium_issues",
+    "low_issues": "low_issues",
+    "quality_score_sum": "quality_score",
+}
+
+
+def review_counters(review: Review) -> dict:
+    """Snapshot of a review's adjustable counters, for ``record_adjustment``"""
+    return {column: getattr(review, field) for column, field in ADJUSTABLE_COUNTERS.items()}
+
+
+async def record_adjustment(db: AsyncSession, review: Review, before: dict, false_positives: int) -> None:
+    """Fold a completed review's counter changes since ``before`` into its rollups.
+
+    Used when feedback flags or unflags findings after completion;
+    ``false_positives`` is the change in the review's flagged findings. The
+    caller commits.
+    """
+    if review.completed_at is None:
+        return
+    deltas = {"false_positives": false_positives} if false_positives else {}
+    for column, value in review_counters(review).items():
+        if value is not None and before[column] is not None and value != before[column]:
+            deltas[column] = value - before[column]
+    if deltas:
+        await increment(db, review.repository_id, review.completed_at.date(), **deltas)
+        await increment_hour(db, review.repository_id, review.completed_at, **deltas)
+
+
+async def summarize(db: AsyncSession, since: date, repository_ids) -> dict:
+    """Totals and averages over the ``daily_metrics`` rows of ``repository_ids``
+    (a list or an id subquery) from ``since`` onwards"""
+    sums = [func.coalesce(func.sum(getattr(DailyMetric, column)), 0) for column in COUNTER_COLUMNS]
+    query = select(*sums).where(DailyMetric.date >= since, DailyMetric.repository_id.in_(repository_ids))
+    totals = dict(zip(COUNTER_COLUMNS, (await db.execute(query)).one()))
+
+    return {
+        "quality_score": _ratio(totals["quality_score_sum"], totals["quality_score_count"], digits=1),
+        "total_issues": totals["total_issues"],
+        "critical_issues": totals["critical_issues"],
+        "high_issues": totals["high_issues"],
+        "medium_issues": totals["medium_issues"],
+        "low_issues": totals["low_issues"],
+        "reviews_count": totals["reviews_count"],
+        "avg_review_time": _ratio(totals["analysis_time_sum"], totals["analysis_time_count"], digits=1),
+        # total_issues leaves flagged findings out, so add them back for the share of all reported
+        "false_positive_rate": _ratio(
+            totals["false_positives"], totals["total_issues"] + totals["false_positives"], digits=4
+        ),
+    }
+
+
+async def rebuild(db: AsyncSession, repository_id: int) -> None:
+    """Recompute a repository's daily rollups from ``reviews`` (backfill / repair).
+
+    Hourly rows only cover the retention window and are not backfilled.
+    """
+    await db.execute(
+        DailyMetric.__table__.delete().where(DailyMetric.repository_id == repository_id)
+    )
+    day = func.date(Review.completed_at)
+    false_positives = (
+        select(func.count(ReviewFinding.finding_id))
+        .join(Finding, Finding.id == ReviewFinding.finding_id)
+        .where(ReviewFinding.review_id == Review.id, Finding.is_false_positive.is_(True))
+        .correlate(Review)
+        .scalar_subquery()
+    )
+    rows = await db.execute(
+        select(
+            day,
+            func.count(Review.id),
+            func.coalesce(func.sum(Review.total_issues), 0),
+            func.coalesce(func.sum(Review.critical_issues), 0),
+            func.coalesce(func.sum(Review.high_issues), 0),
+            func.coalesce(func.sum(Review.medium_issues), 0),
+            func.coalesce(func.sum(Review.low_issues), 0),
+            func.coalesce(func.sum(false_positives), 0),
+            func.coalesce(func.sum(Review.analysis_time_seconds), 0),
+            func.count(Review.analysis_time_seconds),
+            func.coalesce(func.sum(Review.quality_score), 0),
+            func.count(Review.quality_score),
+        )
+        .where(Review.repository_id == repository_id, Review.status == "completed")
+        .group_by(day)
+    )
+    for row in rows:
+        row_day = row[0] if isinstance(row[0], date) else date.fromisoformat(row[0])
+        await increment(db, repository_id, row_day, **dict(zip(COUNTER_COLUMNS, row[1:])))
+
+
+async def prune_hourly(db: AsyncSession) -> None:
+    """Drop hourly rows older than the retention window"""
+    cutoff = datetime.utcnow() - timedelta(days=settings.HOURLY_METRICS_RETENTION_DAYS)
+    await db.execute(delete(HourlyMetric).where(HourlyMetric.hour < cutoff))
+
+
+def parse_date_range(date_range: str) -> timedelta:
+    """'30d' / '12w' -> timedelta; raises ValueError for anything else"""
+    units = {"d": 1, "w": 7}
+    value, unit = date_range[:-1], date_range[-1:].lower()
+    if unit not in units or not value.isdigit() or int(value) <= 0:
+        raise ValueError(f"Invalid date range: {date_range}")
+    return timedelta(days=int(value) * units[unit])
+
+
+def _ratio(numerator: int, denominator: int, digits: int) -> Optional[float]:
+    if not denominator:
+        return None
+    return round(numerator / denominator, digits)
@@ -0,0 +1,207 @@
+"""
+Per-repository rule precision
+
+For every (repository, rule) - ``static_rule_id``, else ``issue_type`` - the
+``rule_precision`` table holds how many distinct findings the rule produced
+and how many of them developers flagged as false positives. Findings nobody
+flagged count as accepted. The smoothed precision is the posterior mean
+under a Beta prior of ``RULE_PRECISION_PRIOR_ACCEPTED`` /
+``RULE_PRECISION_PRIOR_FALSE_POSITIVE`` pseudo-findings; a rule with at least
+``RULE_SUPPRESS_MIN_FALSE_POSITIVES`` flags and a precision below
+``RULE_SUPPRESS_BELOW_PRECISION`` is suppressed for that repository.
+
+``refresh`` recomputes any set of repositories (or all of them) from one
+``GROUP BY`` over ``findings`` and NumPy arrays, writes only rows whose
+counts moved and deletes rows of rules that no longer have findings. At
+ingestion ``rule_model.apply`` drops findings of suppressed rules and scales
+the confidence of the rest by their rule's precision relative to the prior,
+from a per-process cache refreshed every ``RULE_PRECISION_TTL_SECONDS``.
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, delete, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.finding import Finding
+from app.models.rule_precision import RulePrecision
+from app.utils.sql import chunked, dialect_insert
+
+UPSERT_BATCH_SIZE = 1000
+
+
+def rule_of(finding: dict) -> str:
+    return finding.get("static_rule_id") or finding.get("issue_type") or ""
+
+
+def prior_precision() -> float:
+    accepted = settings.RULE_PRECISION_PRIOR_ACCEPTED
+    return accepted / (accepted + settings.RULE_PRECISION_PRIOR_FALSE_POSITIVE)
+
+
+def estimate(findings: np.ndarray, false_positives: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Smoothed precision and suppression flag for arrays of counts"""
+    accepted = findings - false_positives
+    precision = (accepted + settings.RULE_PRECISION_PRIOR_ACCEPTED) / (
+        findings + settings.RULE_PRECISION_PRIOR_ACCEPTED + settings.RULE_PRECISION_PRIOR_FALSE_POSITIVE
+    )
+    suppressed = (false_positives >= settings.RULE_SUPPRESS_MIN_FALSE_POSITIVES) & (
+        precision < settings.RULE_SUPPRESS_BELOW_PRECISION
+    )
+    return precision, suppressed
+
+
+def refresh(db: Session, repository_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute rule precision for ``repository_ids`` (default: all); returns rows written or deleted"""
+    rule = func.coalesce(Finding.static_rule_id, Finding.issue_type)
+    # Findings suppressed as near-duplicates of a false positive are the
+    # index's call, not a developer's; they count neither way
+    counted = Finding.suppressed_by_id.is_(None)
+    query = (
+        select(
+            Finding.repository_id,
+            rule,
+            func.count().filter(counted),
+            func.count().filter(and_(counted, Finding.is_false_positive.is_(True))),
+        )
+        .group_by(Finding.repository_id, rule)
+    )
+    existing = select(
+        RulePrecision.repository_id, RulePrecision.rule, RulePrecision.findings, RulePrecision.false_positives
+    )
+    if repository_ids is not None:
+        repository_ids = list(repository_ids)
+        query = query.where(Finding.repository_id.in_(repository_ids))
+        existing = existing.where(RulePrecision.repository_id.in_(repository_ids))
+
+    rows = db.execute(query).all()
+    stored = {
+        (repository_id, rule_name): (total, flagged)
+        for repository_id, rule_name, total, flagged in db.execute(existing)
+    }
+    keys = [(repository_id, rule_name) for repository_id, rule_name, _, _ in rows]
+
+    # Rules whose findings are all gone would otherwise keep suppressing
+    # (or scaling) new findings on counts that no longer exist
+    stale = sorted(set(stored) - set(keys))
+    for batch in chunked(stale, UPSERT_BATCH_SIZE):
+        db.execute(delete(RulePrecision).where(tuple_(RulePrecision.repository_id, RulePrecision.rule).in_(batch)))
+    if not rows:
+        return len(stale)
+
+    counts = np.array([(total, flagged) for _, _, total, flagged in rows], dtype=np.int64)
+    precision, suppressed = estimate(counts[:, 0], counts[:, 1])
+    previous = np.array([stored.get(key, (-1, -1)) for key in keys], dtype=np.int64)
+    changed = np.flatnonzero((previous != counts).any(axis=1))
+    if not len(changed):
+        return len(stale)
+
+    now = datetime.utcnow()
+    values = [
+        {
+            "repository_id": keys[i][0],
+            "rule": keys[i][1],
+            "findings": int(counts[i, 0]),
+            "false_positives": int(counts[i, 1]),
+            "precision": float(precision[i]),
+            "suppressed": bool(suppressed[i]),
+            "updated_at": now,
+        }
+        for i in changed
+    ]
+    stmt = dialect_insert(db, RulePrecision)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["repository_id", "rule"],
+        set_={
+            column: stmt.excluded[column]
+            for column in ("findings", "false_positives", "precision", "suppressed", "updated_at")
+        },
+    )
+    for batch in chunked(values, UPSERT_BATCH_SIZE):
+        db.execute(stmt, batch)
+    return len(values) + len(stale)
+
+
+@dataclass
+class RepositoryRules:
+    """One repository's rules as arrays, indexed through ``positions``"""
+    positions: Dict[str, int]
+    precision: np.ndarray
+    suppressed: np.ndarray
+    loaded_at: float
+
+
+class RulePrecisionModel:
+    """Bounded, time-limited per-process cache of ``rule_precision``"""
+
+    def __init__(self):
+        self._repositories: "OrderedDict[int, RepositoryRules]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def rules(self, db: Session, repository_id: int) -> RepositoryRules:
+        with self._lock:
+            cached = self._repositories.get(repository_id)
+            if cached is not None and time.monotonic() - cached.loaded_at < settings.RULE_PRECISION_TTL_SECONDS:
+                self._repositories.move_to_end(repository_id)
+                return cached
+
+        rows = db.execute(
+            select(RulePrecision.rule, RulePrecision.precision, RulePrecision.suppressed)
+            .where(RulePrecision.repository_id == repository_id)
+        ).all()
+        loaded = RepositoryRules(
+            positions={row.rule: i for i, row in enumerate(rows)},
+            precision=np.array([row.precision for row in rows], dtype=np.float32),
+            suppressed=np.array([bool(row.suppressed) for row in rows], dtype=bool),
+            loaded_at=time.monotonic(),
+        )
+        with self._lock:
+            self._repositories[repository_id] = loaded
+            self._repositories.move_to_end(repository_id)
+            while len(self._repositories) > settings.RULE_PRECISION_MAX_LOADED:
+                self._repositories.popitem(last=False)
+        return loaded
+
+    def invalidate(self, repository_id: Optional[int] = None) -> None:
+        with self._lock:
+            if repository_id is None:
+                self._repositories.clear()
+            else:
+                self._repositories.pop(repository_id, None)
+
+    def apply(self, db: Session, repository_id: int, findings: List[dict]) -> List[dict]:
+        """Findings of non-suppressed rules, with confidence scaled by rule precision"""
+        rules = self.rules(db, repository_id)
+        if not findings or not rules.positions:
+            return findings
+
+        rows = np.array([rules.positions.get(rule_of(finding), -1) for finding in findings], dtype=np.int64)
+        known = rows >= 0
+        safe_rows = np.where(known, rows, 0)
+        keep = ~(known & rules.suppressed[safe_rows])
+        factor = np.where(known, rules.precision[safe_rows] / prior_precision(), 1.0)
+        confidence = np.array(
+            [
+                np.nan if finding.get("confidence_score") is None else finding["confidence_score"]
+                for finding in findings
+            ],
+            dtype=np.float64,
+        )
+        adjusted = np.clip(confidence * factor, 0.0, 1.0).round(3)
+
+        kept = []
+        for i in np.flatnonzero(keep):
+            finding = findings[i]
+            if known[i] and not np.isnan(adjusted[i]):
+                finding = {**finding, "confidence_score": float(adjusted[i])}
+            kept.append(finding)
+        return kept
+
+
+rule_model = RulePrecisionModel()
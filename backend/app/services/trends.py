@@ -0,0 +1,167 @@
+"""
+Quality trends over fixed time buckets
+
+Series are built from the rollup tables (``hourly_metrics`` for hour
+buckets, ``daily_metrics`` for day and week buckets) and downsampled on the
+server to at most the requested number of points, so a year of history is
+a few hundred rows in and a few hundred points out.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.daily_metric import DailyMetric, HourlyMetric
+from app.services.rollups import COUNTER_COLUMNS
+
+BUCKETS = ("hour", "day", "week")
+DOWNSAMPLE_METHODS = ("lttb", "minmax", "none")
+
+
+async def load_buckets(
+    db: AsyncSession, repository_id: int, bucket: str, since: datetime
+) -> List[dict]:
+    """Rollup rows as ``{"timestamp", counters...}`` ordered by time"""
+    if bucket == "hour":
+        model, column = HourlyMetric, HourlyMetric.hour
+        start = since.replace(minute=0, second=0, microsecond=0)
+    else:
+        model, column = DailyMetric, DailyMetric.date
+        start = since.date()
+
+    counters = [getattr(model, name) for name in COUNTER_COLUMNS]
+    rows = await db.execute(
+        select(column, *counters)
+        .where(model.repository_id == repository_id, column >= start)
+        .order_by(column)
+    )
+    buckets = [
+        {"timestamp": _as_datetime(row[0]), **dict(zip(COUNTER_COLUMNS, row[1:]))}
+        for row in rows
+    ]
+    if bucket == "week":
+        buckets = _merge_weeks(buckets)
+    return buckets
+
+
+def to_point(bucket: dict) -> dict:
+    """Public shape of one trend point"""
+    return {
+        "timestamp": bucket["timestamp"].isoformat(),
+        "quality_score": _ratio(bucket["quality_score_sum"], bucket["quality_score_count"]),
+        "total_issues": bucket["total_issues"],
+        "critical_issues": bucket["critical_issues"],
+        "high_issues": bucket["high_issues"],
+        "medium_issues": bucket["medium_issues"],
+        "low_issues": bucket["low_issues"],
+        "reviews_count": bucket["reviews_count"],
+    }
+
+
+def lttb(xs: Sequence[float], ys: Sequence[float], threshold: int) -> List[int]:
+    """Largest-Triangle-Three-Buckets: indices of ``threshold`` representative points"""
+    n = len(xs)
+    if threshold >= n:
+        return list(range(n))
+    if threshold < 3:
+        return [0, n - 1][:max(threshold, 1)]
+
+    selected = [0]
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third triangle vertex
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        span = max(next_end - next_start, 1)
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+def minmax(ys: Sequence[float], threshold: int) -> List[int]:
+    """Indices of the min and max point of each of ``threshold // 2`` groups"""
+    n = len(ys)
+    if threshold >= n:
+        return list(range(n))
+    groups = max(threshold // 2, 1)
+    size = n / groups
+    selected = set()
+    for g in range(groups):
+        start, end = int(g * size), max(int((g + 1) * size), int(g * size) + 1)
+        window = range(start, min(end, n))
+        selected.add(min(window, key=ys.__getitem__))
+        selected.add(max(window, key=ys.__getitem__))
+    return sorted(selected)
+
+
+def downsample(buckets: List[dict], points: int, method: str) -> List[dict]:
+    """Reduce ``buckets`` to at most ``points`` entries, shape-preserving on quality score"""
+    if method == "none" or len(buckets) <= points:
+        return buckets
+    xs = [bucket["timestamp"].timestamp() for bucket in buckets]
+    # Unscored buckets carry the previous score so they do not read as drops
+    ys: List[float] = []
+    last = 0.0
+    for bucket in buckets:
+        if bucket["quality_score_count"]:
+            last = bucket["quality_score_sum"] / bucket["quality_score_count"]
+        ys.append(last)
+    indices = lttb(xs, ys, points) if method == "lttb" else minmax(ys, points)
+    return [buckets[i] for i in indices]
+
+
+async def trends(
+    db: AsyncSession,
+    repository_id: int,
+    bucket: str,
+    since: datetime,
+    points: int,
+    method: str = "lttb",
+) -> Dict[str, object]:
+    buckets = await load_buckets(db, repository_id, bucket, since)
+    sampled = downsample(buckets, points, method)
+    return {
+        "bucket": bucket,
+        "downsample": method if len(sampled) < len(buckets) else "none",
+        "source_buckets": len(buckets),
+        "trends": [to_point(item) for item in sampled],
+    }
+
+
+def _merge_weeks(days: List[dict]) -> List[dict]:
+    """Fold day buckets into ISO weeks starting on Monday"""
+    weeks: Dict[date, dict] = {}
+    for day in days:
+        start = day["timestamp"].date() - timedelta(days=day["timestamp"].weekday())
+        week = weeks.get(start)
+        if week is None:
+            weeks[start] = {**day, "timestamp": datetime.combine(start, datetime.min.time())}
+        else:
+            for name in COUNTER_COLUMNS:
+                week[name] += day[name]
+    return [weeks[key] for key in sorted(weeks)]
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, datetime.min.time())
+    return datetime.fromisoformat(str(value))
+
+
+def _ratio(numerator: int, denominator: int) -> Optional[float]:
+    return round(numerator / denominator, 1) if denominator else None
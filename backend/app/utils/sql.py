@@ -0,0 +1,48 @@
+"""
+SQL helpers shared by services that write in bulk
+"""
+from typing import Iterable, Iterator, List, TypeVar, Union
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+def dialect_insert(db: Union[Session, AsyncSession], model):
+    """INSERT construct for the session's dialect.
+
+    PostgreSQL and SQLite inserts support ``on_conflict_do_nothing`` /
+    ``on_conflict_do_update``, which plain ``sqlalchemy.insert`` does not.
+    """
+    dialect = db.bind.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return insert(model)
+
+
+async def advisory_xact_lock(db: AsyncSession, key: int) -> None:
+    """Block until this transaction holds the advisory lock ``key``.
+
+    Released on commit or rollback. PostgreSQL only; a no-op on SQLite,
+    which is used for development and tests.
+    """
+    if db.bind.dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(key)))
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yield lists of at most ``size`` items"""
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,14 @@
+"""
+Load tests and benchmarks
+
+Run from the backend directory against the database configured in ``.env``:
+
+    python -m benchmarks seed --profile smoke
+    python -m benchmarks run --scenario mixed --duration 60 --baseline smoke-mixed
+
+``seed`` fills the database with synthetic repositories, reviews and findings
+(``seed.py``), ``run`` replays webhook bursts and dashboard/review traffic
+against the app (``load.py``) and compares the per-endpoint latency and
+throughput with a stored baseline (``baselines.py``), exiting non-zero on a
+regression.
+"""
@@ -0,0 +1,105 @@
+"""
+Benchmark command line: ``python -m benchmarks {seed,run} ...``
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from dataclasses import asdict
+from typing import List, Optional
+
+from app.core.config import settings
+from benchmarks import baselines
+from benchmarks.load import SCENARIOS, LoadConfig, format_report, load_targets, run_load
+from benchmarks.seed import PROFILES, seed
+
+logger = logging.getLogger("benchmarks")
+
+
+def _seed(args: argparse.Namespace) -> int:
+    if args.create_tables:
+        from app.core.database import create_tables  # tables are registered by benchmarks.seed's model imports
+
+        create_tables()
+    summary = seed(PROFILES[args.profile], random_seed=args.seed)
+    logger.info("Seeded %s", asdict(summary))
+    return 0
+
+
+def _run(args: argparse.Namespace) -> int:
+    config = LoadConfig(
+        scenario=args.scenario,
+        duration=args.duration,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        webhook_burst=args.webhook_burst,
+        webhook_interval=args.webhook_interval,
+        url=args.url,
+        webhook_secret=settings.GITHUB_WEBHOOK_SECRET,
+        timeout=args.timeout,
+        seed=args.seed,
+    )
+    result = asyncio.run(run_load(config, load_targets()))
+    print(format_report(result))
+
+    if not args.baseline:
+        return 0
+    baseline = baselines.load(args.baseline)
+    if baseline is None or args.update_baseline:
+        logger.info("Saved baseline %s", baselines.save(args.baseline, result))
+        return 0
+    if baseline.get("config") != result["config"]:
+        logger.warning("Baseline %s was recorded with different settings: %s", args.baseline, baseline.get("config"))
+    regressions = baselines.compare(
+        result,
+        baseline,
+        baselines.Thresholds(
+            max_regression=args.max_regression,
+            min_delta_ms=args.min_delta_ms,
+            max_error_rate_increase=args.max_error_rate_increase,
+        ),
+    )
+    for regression in regressions:
+        logger.error("Regression: %s", regression)
+    if not regressions:
+        logger.info("No regressions against baseline %s", args.baseline)
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="SentinelCode load tests")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="add synthetic repositories, reviews and findings")
+    seed_parser.add_argument("--profile", choices=sorted(PROFILES), default="smoke")
+    seed_parser.add_argument("--seed", type=int, default=0, help="random seed")
+    seed_parser.add_argument(
+        "--create-tables", action="store_true", help="create the schema first (scratch databases without Alembic)"
+    )
+    seed_parser.set_defaults(handler=_seed)
+
+    run_parser = commands.add_parser("run", help="replay traffic and compare with a baseline")
+    run_parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="mixed")
+    run_parser.add_argument("--duration", type=float, default=60.0, help="measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=5.0, help="seconds before recording starts")
+    run_parser.add_argument("--concurrency", type=int, default=32, help="virtual users issuing reads")
+    run_parser.add_argument("--webhook-burst", type=int, default=50, help="deliveries per burst")
+    run_parser.add_argument("--webhook-interval", type=float, default=10.0, help="seconds between bursts")
+    run_parser.add_argument("--url", help="base URL of a running server; in-process when omitted")
+    run_parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    run_parser.add_argument("--seed", type=int, default=0, help="random seed")
+    run_parser.add_argument("--baseline", help="baseline name to compare with (saved when missing)")
+    run_parser.add_argument("--update-baseline", action="store_true", help="overwrite the baseline with this run")
+    run_parser.add_argument("--max-regression", type=float, default=0.2, help="relative latency/throughput change")
+    run_parser.add_argument("--min-delta-ms", type=float, default=5.0, help="ignore smaller latency changes")
+    run_parser.add_argument("--max-error-rate-increase", type=float, default=0.01)
+    run_parser.set_defaults(handler=_run)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one line per request otherwise
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
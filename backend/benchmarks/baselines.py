@@ -0,0 +1,65 @@
+"""
+Benchmark baselines
+
+A run's summary is stored as JSON under ``benchmarks/baselines/<name>.json``
+and later runs are compared with it endpoint by endpoint. An endpoint
+regresses when a latency percentile grows by more than ``max_regression``
+(relative) and by more than ``min_delta_ms`` (absolute, so jitter on
+millisecond endpoints does not fail a run), when its throughput drops by
+more than ``max_regression``, or when its error rate rises by more than
+``max_error_rate_increase``.
+"""
+import json
+import os
+from dataclasses import dataclass
+from typing import List, Optional
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+PERCENTILES = ("p50_ms", "p95_ms", "p99_ms")
+
+
+@dataclass
+class Thresholds:
+    max_regression: float = 0.2
+    min_delta_ms: float = 5.0
+    max_error_rate_increase: float = 0.01
+
+
+def baseline_path(name: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def load(name: str) -> Optional[dict]:
+    try:
+        with open(baseline_path(name)) as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return None
+
+
+def save(name: str, result: dict) -> str:
+    path = baseline_path(name)
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(path, "w") as handle:
+        json.dump(result, handle, indent=2, sort_keys=True)
+        handle.write("\n")
+    return path
+
+
+def compare(result: dict, baseline: dict, thresholds: Thresholds) -> List[str]:
+    """Human-readable regressions of ``result`` against ``baseline`` (empty when none)"""
+    regressions = []
+    for name, before in baseline["endpoints"].items():
+        after = result["endpoints"].get(name)
+        if after is None:
+            regressions.append(f"{name}: not exercised in this run")
+            continue
+        for percentile in PERCENTILES:
+            old, new = before[percentile], after[percentile]
+            if new > old * (1 + thresholds.max_regression) and new - old > thresholds.min_delta_ms:
+                regressions.append(f"{name}: {percentile} {old:.1f} -> {new:.1f}")
+        if after["throughput"] < before["throughput"] * (1 - thresholds.max_regression):
+            regressions.append(f"{name}: throughput {before['throughput']:.1f} -> {after['throughput']:.1f} req/s")
+        if after["error_rate"] > before["error_rate"] + thresholds.max_error_rate_increase:
+            regressions.append(f"{name}: error rate {before['error_rate']:.2%} -> {after['error_rate']:.2%}")
+    return regressions
@@ -0,0 +1,309 @@
+"""
+Load generator
+
+``--concurrency`` virtual users run a closed loop over a weighted mix of
+dashboard and review reads while a separate task fires bursts of signed
+GitHub ``push`` webhooks. Every response is recorded per endpoint (route
+template, not raw URL) and summarized as p50/p95/p99 latency, throughput and
+error rate.
+
+Requests go to a running server (``url``) or in-process through
+``httpx.ASGITransport``. In-process numbers include the generator's own CPU
+time on the same event loop; use them for relative comparisons (CI) and a
+real deployment for capacity numbers. Webhook bursts create real reviews and
+jobs, so without workers draining the queue the endpoint eventually answers
+429 - reported as ``rejected``, separately from errors.
+"""
+import asyncio
+import hashlib
+import hmac
+import json
+import platform
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from sqlalchemy import func, select
+
+from app.core.database import SessionLocal, engine
+from app.core.security import create_access_token
+from app.models import Repository, Review, User
+from benchmarks.seed import LOADTEST_USERNAME
+
+REVIEW_SAMPLE = 10_000
+WEBHOOK_ENDPOINT = "POST /api/v1/webhooks/github"
+
+
+@dataclass
+class Targets:
+    """Seeded ids the generated requests point at"""
+    user_id: int
+    token_version: int
+    repositories: List[Tuple[int, int, str]]  # (id, external_id, repo_url)
+    review_ids: List[int]
+
+
+def load_targets(sample: int = REVIEW_SAMPLE) -> Targets:
+    """Read the load-test user's repositories and a sample of completed reviews"""
+    db = SessionLocal()
+    try:
+        user = db.scalar(select(User).where(User.username == LOADTEST_USERNAME).limit(1))
+        if user is None:
+            raise RuntimeError("No load-test data; run `python -m benchmarks seed` first")
+        repositories = db.execute(
+            select(Repository.id, Repository.external_id, Repository.repo_url)
+            .where(Repository.user_id == user.id)
+            .order_by(Repository.id)
+        ).all()
+        review_ids = db.scalars(
+            select(Review.id)
+            .join(Repository, Repository.id == Review.repository_id)
+            .where(Repository.user_id == user.id, Review.status == "completed")
+            .order_by(func.random())
+            .limit(sample)
+        ).all()
+        return Targets(
+            user_id=user.id,
+            token_version=user.token_version or 0,
+            repositories=[tuple(row) for row in repositories],
+            review_ids=list(review_ids),
+        )
+    finally:
+        db.close()
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    name: str
+    weight: float
+    request: Callable[[Targets, random.Random], Tuple[str, dict]]  # (url, query params)
+
+
+def _repo(targets: Targets, rng: random.Random) -> int:
+    return rng.choice(targets.repositories)[0]
+
+
+READ_ENDPOINTS = (
+    Endpoint("GET /api/v1/reviews/", 20, lambda t, r: (
+        "/api/v1/reviews/", {"repo_id": _repo(t, r), "limit": 50},
+    )),
+    Endpoint("GET /api/v1/reviews/ (status, total)", 5, lambda t, r: (
+        "/api/v1/reviews/", {"status": "completed", "include_total": "true", "limit": 50},
+    )),
+    Endpoint("GET /api/v1/reviews/{review_id}", 30, lambda t, r: (
+        f"/api/v1/reviews/{r.choice(t.review_ids)}", {},
+    )),
+    Endpoint("GET /api/v1/reviews/{review_id}/changes", 10, lambda t, r: (
+        f"/api/v1/reviews/{r.choice(t.review_ids)}/changes", {},
+    )),
+    Endpoint("GET /api/v1/dashboard/metrics", 15, lambda t, r: (
+        "/api/v1/dashboard/metrics", {"repo_id": _repo(t, r), "date_range": r.choice(("7d", "30d", "90d"))},
+    )),
+    Endpoint("GET /api/v1/dashboard/heatmap", 10, lambda t, r: (
+        "/api/v1/dashboard/heatmap", {"repo_id": _repo(t, r)},
+    )),
+    Endpoint("GET /api/v1/dashboard/trends", 10, lambda t, r: (
+        "/api/v1/dashboard/trends", {"repo_id": _repo(t, r), "bucket": r.choice(("hour", "day", "week"))},
+    )),
+)
+
+# Which traffic each scenario generates: (reads, webhook bursts)
+SCENARIOS = {
+    "dashboard": (True, False),
+    "webhooks": (False, True),
+    "mixed": (True, True),
+}
+
+
+@dataclass
+class LoadConfig:
+    scenario: str = "mixed"
+    duration: float = 60.0  # measured seconds, after the warm-up
+    warmup: float = 5.0
+    concurrency: int = 32  # virtual users issuing reads
+    webhook_burst: int = 50  # deliveries fired at once
+    webhook_interval: float = 10.0  # seconds between burst starts
+    url: Optional[str] = None  # None = in-process
+    webhook_secret: str = field(default="", repr=False)
+    timeout: float = 30.0
+    seed: int = 0
+
+
+class Recorder:
+    """Latencies and status codes per endpoint, once the warm-up is over"""
+
+    def __init__(self, record_after: float):
+        self.record_after = record_after
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    async def timed(self, name: str, send) -> None:
+        started = time.monotonic()
+        try:
+            status = (await send()).status_code
+        except httpx.HTTPError:
+            status = 0  # transport error or timeout
+        if started >= self.record_after:
+            self.latencies[name].append(time.monotonic() - started)
+            self.statuses[name][status] += 1
+
+
+def _endpoint_summary(latencies: List[float], statuses: Counter, seconds: float) -> dict:
+    values = np.asarray(latencies) * 1000
+    requests = len(values)
+    # 429 is load shedding, counted under "rejected"; everything else outside 2xx/304
+    # (including transport failures, recorded as 0) is an error
+    errors = sum(
+        count for status, count in statuses.items() if not (200 <= status < 300 or status in (304, 429))
+    )
+    p50, p95, p99 = np.percentile(values, (50, 95, 99)) if requests else (0.0, 0.0, 0.0)
+    return {
+        "requests": requests,
+        "throughput": round(requests / seconds, 2),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "max_ms": round(float(values.max()), 2) if requests else 0.0,
+        "error_rate": round(errors / requests, 4) if requests else 0.0,
+        "rejected": statuses.get(429, 0),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def summarize(recorder: Recorder, seconds: float) -> dict:
+    endpoints = {
+        name: _endpoint_summary(recorder.latencies[name], recorder.statuses[name], seconds)
+        for name in sorted(recorder.latencies)
+    }
+    everything = Counter()
+    for statuses in recorder.statuses.values():
+        everything.update(statuses)
+    total = _endpoint_summary(
+        [latency for latencies in recorder.latencies.values() for latency in latencies], everything, seconds
+    )
+    return {"endpoints": endpoints, "total": total}
+
+
+def _push_payload(targets: Targets, rng: random.Random) -> bytes:
+    _, external_id, repo_url = rng.choice(targets.repositories)
+    return json.dumps({
+        "ref": "refs/heads/main",
+        "before": "%040x" % rng.getrandbits(160),
+        "after": "%040x" % rng.getrandbits(160),
+        "repository": {"id": external_id, "html_url": repo_url},
+    }).encode()
+
+
+def _webhook_headers(body: bytes, secret: str) -> dict:
+    headers = {
+        "Content-Type": "application/json",
+        "X-GitHub-Event": "push",
+        "X-GitHub-Delivery": str(uuid.uuid4()),
+    }
+    if secret:
+        digest = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        headers["X-Hub-Signature-256"] = f"sha256={digest}"
+    return headers
+
+
+async def _reader(
+    client: httpx.AsyncClient, recorder: Recorder, targets: Targets, rng: random.Random, deadline: float
+) -> None:
+    weights = [endpoint.weight for endpoint in READ_ENDPOINTS]
+    while time.monotonic() < deadline:
+        endpoint = rng.choices(READ_ENDPOINTS, weights)[0]
+        url, params = endpoint.request(targets, rng)
+        await recorder.timed(endpoint.name, lambda: client.get(url, params=params))
+
+
+async def _webhook_bursts(
+    client: httpx.AsyncClient, recorder: Recorder, targets: Targets, rng: random.Random,
+    config: LoadConfig, deadline: float,
+) -> None:
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        deliveries = []
+        for _ in range(config.webhook_burst):
+            body = _push_payload(targets, rng)
+            headers = _webhook_headers(body, config.webhook_secret)
+            deliveries.append(recorder.timed(
+                WEBHOOK_ENDPOINT,
+                lambda body=body, headers=headers: client.post(
+                    "/api/v1/webhooks/github", content=body, headers=headers
+                ),
+            ))
+        await asyncio.gather(*deliveries)
+        await asyncio.sleep(max(0.0, min(config.webhook_interval - (time.monotonic() - started),
+                                         deadline - time.monotonic())))
+
+
+def _client(config: LoadConfig, targets: Targets) -> httpx.AsyncClient:
+    if config.url:
+        transport, base_url = None, config.url
+    else:
+        from app.main import app
+
+        transport, base_url = httpx.ASGITransport(app=app), "http://benchmark"
+    token = create_access_token({"sub": str(targets.user_id), "ver": targets.token_version})
+    return httpx.AsyncClient(
+        transport=transport,
+        base_url=base_url,
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=config.timeout,
+        limits=httpx.Limits(max_connections=config.concurrency + config.webhook_burst),
+    )
+
+
+async def run_load(config: LoadConfig, targets: Targets) -> dict:
+    """Drive the scenario for ``warmup + duration`` seconds and summarize it"""
+    try:
+        reads, webhooks = SCENARIOS[config.scenario]
+    except KeyError:
+        raise ValueError(f"Unknown scenario: {config.scenario}")
+
+    started = time.monotonic()
+    recorder = Recorder(record_after=started + config.warmup)
+    deadline = started + config.warmup + config.duration
+    async with _client(config, targets) as client:
+        tasks = []
+        if reads:
+            tasks += [
+                _reader(client, recorder, targets, random.Random(config.seed * 1000 + i), deadline)
+                for i in range(config.concurrency)
+            ]
+        if webhooks:
+            tasks.append(_webhook_bursts(
+                client, recorder, targets, random.Random(config.seed * 1000 - 1), config, deadline
+            ))
+        await asyncio.gather(*tasks)
+
+    return {
+        **summarize(recorder, config.duration),
+        "config": {key: value for key, value in asdict(config).items() if key != "webhook_secret"},
+        "environment": {
+            "database": engine.dialect.name,
+            "python": platform.python_version(),
+            "repositories": len(targets.repositories),
+            "started_at": datetime.utcnow().isoformat(timespec="seconds"),
+        },
+    }
+
+
+def format_report(result: dict) -> str:
+    rows = [("endpoint", "requests", "req/s", "p50 ms", "p95 ms", "p99 ms", "errors", "429")]
+    for name, stats in [*result["endpoints"].items(), ("total", result["total"])]:
+        rows.append((
+            name, str(stats["requests"]), f"{stats['throughput']:.1f}", f"{stats['p50_ms']:.1f}",
+            f"{stats['p95_ms']:.1f}", f"{stats['p99_ms']:.1f}", f"{stats['error_rate']:.2%}", str(stats["rejected"]),
+        ))
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    return "\n".join(
+        "  ".join(cell.ljust(widths[i]) if i == 0 else cell.rjust(widths[i]) for i, cell in enumerate(row))
+        for row in rows
+    )
@@ -0,0 +1,389 @@
+"""
+Synthetic data seeding
+
+Fills the configured database with load-test data of realistic volume and
+shape: reviews per repository follow a Zipf-like curve (a few huge
+repositories, a long tail), issues per review are log-normal, severities are
+skewed towards ``low``, and consecutive reviews of a repository share most of
+their findings the way repeated scans of a codebase do. Daily and hourly
+rollups and the risk index are filled as well, so every dashboard endpoint
+has data to serve.
+
+Rows are generated per repository with numpy and loaded in large batches -
+``COPY`` on PostgreSQL (psycopg2), executemany elsewhere - with explicit ids,
+so seeding can be repeated to grow an existing dataset.
+"""
+import asyncio
+import csv
+import hashlib
+import io
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, engine
+from app.models import DailyMetric, Finding, HourlyMetric, Repository, Review, ReviewFinding, User
+from app.services import risk_index
+from app.services.analysis import SEVERITY_WEIGHTS
+from app.services.rollups import COUNTER_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+LOADTEST_USERNAME = "loadtest"
+EXTERNAL_ID_OFFSET = 1_000_000_000  # keeps seeded GitHub ids clear of real ones
+
+SEVERITIES = ("critical", "high", "medium", "low")
+SEVERITY_MIX = (0.01, 0.07, 0.32, 0.60)
+ISSUE_TYPES = ("security", "bug", "performance", "style")
+ISSUE_TYPE_MIX = (0.15, 0.25, 0.10, 0.50)
+RULES = (
+    ("bandit-B101", "Use of assert detected"),
+    ("bandit-B105", "Possible hardcoded password"),
+    ("bandit-B311", "Standard pseudo-random generators are not suitable for security purposes"),
+    ("bandit-B608", "Possible SQL injection vector through string-based query construction"),
+    ("pylint-C0301", "Line too long"),
+    ("pylint-R1705", "Unnecessary else after return"),
+    ("pylint-W0611", "Unused import"),
+    ("pylint-W0703", "Catching too general exception"),
+    ("semgrep-python.lang.security.audit.eval-detected", "Detected the use of eval()"),
+    ("semgrep-python.flask.security.audit.debug-enabled", "Flask app run with debug enabled"),
+)
+REVIEW_STATUSES = ("completed", "failed", "pending")
+REVIEW_STATUS_MIX = (0.97, 0.02, 0.01)
+FALSE_POSITIVE_RATE = 0.03
+PULL_REQUEST_SHARE = 0.3
+IN_DIFF_SHARE = 0.8
+ISSUES_PER_REVIEW_SIGMA = 0.8  # log-normal spread
+MIN_FINDINGS_PER_REPOSITORY = 20
+FLUSH_ROWS = 200_000
+
+
+@dataclass(frozen=True)
+class Profile:
+    repositories: int
+    reviews: int
+    issues: int  # review_findings rows
+    distinct_ratio: float = 0.1  # distinct findings per review finding
+    files_per_repository: int = 400
+    days: int = 180
+    repository_skew: float = 0.8  # Zipf exponent of reviews per repository
+
+
+PROFILES = {
+    "smoke": Profile(repositories=20, reviews=2_000, issues=80_000),
+    "medium": Profile(repositories=500, reviews=100_000, issues=4_000_000),
+    "full": Profile(repositories=5_000, reviews=1_200_000, issues=50_000_000),
+}
+
+
+@dataclass
+class SeedSummary:
+    user_id: int
+    repositories: int = 0
+    reviews: int = 0
+    findings: int = 0
+    review_findings: int = 0
+    seconds: float = 0.0
+
+
+class _Loader:
+    """Batched bulk inserts, flushed in foreign-key order"""
+
+    TABLES = (
+        Repository.__table__,
+        Finding.__table__,
+        Review.__table__,
+        ReviewFinding.__table__,
+        DailyMetric.__table__,
+        HourlyMetric.__table__,
+    )
+
+    def __init__(self, conn: Connection):
+        self.conn = conn
+        self.copy = conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+        self._pending: Dict[str, Tuple[Sequence[str], List[tuple]]] = {}
+        self._size = 0
+
+    def add(self, table, columns: Sequence[str], rows: List[tuple]) -> None:
+        self._pending.setdefault(table.name, (columns, []))[1].extend(rows)
+        self._size += len(rows)
+        if self._size >= FLUSH_ROWS:
+            self.flush()
+
+    def flush(self) -> None:
+        for table in self.TABLES:
+            columns, rows = self._pending.pop(table.name, ((), []))
+            if rows:
+                self._insert(table, columns, rows)
+        self._size = 0
+
+    def _insert(self, table, columns: Sequence[str], rows: List[tuple]) -> None:
+        if not self.copy:
+            self.conn.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+            return
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor = self.conn.connection.cursor()
+        try:
+            cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+        finally:
+            cursor.close()
+
+
+def _file_path(index: int) -> str:
+    return f"src/pkg_{index % 12}/sub_{index % 5}/module_{index}.py"
+
+
+def _rollup_rows(
+    repository_id: int, buckets: np.ndarray, counters: np.ndarray, to_key
+) -> List[tuple]:
+    """Sum counter rows per bucket: ``[(repository_id, key, *counters)]``"""
+    if not len(buckets):
+        return []
+    keys, inverse = np.unique(buckets, return_inverse=True)
+    sums = np.zeros((len(keys), counters.shape[1]), dtype=np.int64)
+    np.add.at(sums, inverse, counters)
+    return [(repository_id, to_key(int(key)), *row) for key, row in zip(keys.tolist(), sums.tolist())]
+
+
+def _seed_repository(
+    rng: np.random.Generator,
+    loader: _Loader,
+    profile: Profile,
+    user_id: int,
+    repository_id: int,
+    review_count: int,
+    issue_count: int,
+    finding_start: int,
+    review_start: int,
+    now: datetime,
+) -> Tuple[int, int, int]:
+    """Queue one repository's rows; ``(findings, review findings, latest completed review id)``"""
+    repo_url = f"https://github.com/{LOADTEST_USERNAME}/repo-{repository_id}"
+    # Review schedule over the window, oldest first
+    window = profile.days * 86400
+    base = now - timedelta(seconds=window)
+    created = np.sort(rng.random(review_count)) * window
+    analysis = np.maximum(1, rng.gamma(2.0, 30.0, size=review_count)).astype(np.int64)
+    status = rng.choice(len(REVIEW_STATUSES), size=review_count, p=REVIEW_STATUS_MIX)
+    status[-1] = 0  # every repository has a latest completed review
+    completed = status == 0
+    loader.add(
+        Repository.__table__,
+        ("id", "user_id", "platform", "external_id", "repo_name", "repo_url", "default_branch", "is_enabled",
+         "last_scan_at"),
+        [(
+            repository_id, user_id, "github", EXTERNAL_ID_OFFSET + repository_id,
+            f"{LOADTEST_USERNAME}/repo-{repository_id}", repo_url, "main", True,
+            base + timedelta(seconds=float(created[-1] + analysis[-1])),
+        )],
+    )
+
+    # Findings: the repository's pool of distinct issues
+    pool = max(MIN_FINDINGS_PER_REPOSITORY, int(issue_count * profile.distinct_ratio))
+    severity = rng.choice(len(SEVERITIES), size=pool, p=SEVERITY_MIX)
+    issue_type = rng.choice(len(ISSUE_TYPES), size=pool, p=ISSUE_TYPE_MIX)
+    rule = rng.integers(0, len(RULES), size=pool)
+    file_index = (rng.zipf(1.3, size=pool) - 1) % profile.files_per_repository
+    line = rng.integers(1, 800, size=pool)
+    false_positive = rng.random(pool) < FALSE_POSITIVE_RATE
+    confidence = np.round(rng.uniform(0.4, 1.0, size=pool), 2)
+    loader.add(
+        Finding.__table__,
+        (
+            "id", "repository_id", "fingerprint", "file_path", "line_number", "issue_type", "severity",
+            "title", "code_snippet", "confidence_score", "source", "static_rule_id", "is_false_positive",
+        ),
+        [
+            (
+                finding_start + j, repository_id,
+                hashlib.sha256(f"{repository_id}:{j}".encode()).hexdigest(),
+                _file_path(f), l, ISSUE_TYPES[t], SEVERITIES[s], RULES[r][1],
+                f"result = handler_{j % 50}(request, value_{j % 7})", c, "static_analysis", RULES[r][0], fp,
+            )
+            for j, (f, l, t, s, r, c, fp) in enumerate(zip(
+                file_index.tolist(), line.tolist(), issue_type.tolist(), severity.tolist(),
+                rule.tolist(), confidence.tolist(), false_positive.tolist(),
+            ))
+        ],
+    )
+
+    # Reviews
+    is_pr = rng.random(review_count) < PULL_REQUEST_SHARE
+    pr_number = rng.integers(1, 5000, size=review_count)
+
+    # Issues per review: log-normal around the repository's mean, taken as a
+    # sliding window over the pool so consecutive reviews overlap
+    mean = max(issue_count / max(int(completed.sum()), 1), 1.0)
+    sigma = ISSUES_PER_REVIEW_SIGMA
+    counts = rng.lognormal(np.log(mean) - sigma ** 2 / 2, sigma, size=review_count).astype(np.int64)
+    counts = np.where(completed, np.minimum(counts, pool), 0)
+    start = np.cumsum(rng.integers(0, pool // 20 + 2, size=review_count)) % pool
+    owner = np.repeat(np.arange(review_count), counts)
+    position = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts)
+    link = (start[owner] + position) % pool
+
+    link_false_positive = false_positive[link]
+    link_severity = severity[link]
+    accepted = ~link_false_positive
+    by_severity = np.bincount(
+        owner[accepted] * len(SEVERITIES) + link_severity[accepted], minlength=review_count * len(SEVERITIES)
+    ).reshape(review_count, len(SEVERITIES))
+    total = by_severity.sum(axis=1)
+    false_positives = np.bincount(owner[link_false_positive], minlength=review_count)
+    weights = np.array([SEVERITY_WEIGHTS[name] for name in SEVERITIES])
+    quality = np.maximum(0, 100 - by_severity @ weights)
+
+    shas = rng.bytes(20 * review_count).hex()
+    review_ids = review_start + np.arange(review_count)
+    rows = []
+    for i, (review_id, offset, seconds, done, pr, number) in enumerate(zip(
+        review_ids.tolist(), created.tolist(), analysis.tolist(), completed.tolist(), is_pr.tolist(),
+        pr_number.tolist(),
+    )):
+        created_at = base + timedelta(seconds=offset)
+        critical, high, medium, low = by_severity[i].tolist() if done else (0, 0, 0, 0)
+        rows.append((
+            review_id, repository_id, shas[40 * i:40 * i + 40],
+            number if pr else None, f"{repo_url}/pull/{number}" if pr else None,
+            REVIEW_STATUSES[status[i]], int(quality[i]) if done else None,
+            int(total[i]), critical, high, medium, low,
+            seconds if done else None, created_at,
+            created_at + timedelta(seconds=seconds) if done else None,
+        ))
+    loader.add(
+        Review.__table__,
+        (
+            "id", "repository_id", "commit_sha", "pr_number", "pr_url", "status", "quality_score",
+            "total_issues", "critical_issues", "high_issues", "medium_issues", "low_issues",
+            "analysis_time_seconds", "created_at", "completed_at",
+        ),
+        rows,
+    )
+
+    link_pr = is_pr[owner]
+    in_diff = rng.random(len(link)) < IN_DIFF_SHARE
+    link_line = np.maximum(1, line[link] + rng.integers(-3, 4, size=len(link)))
+    loader.add(
+        ReviewFinding.__table__,
+        ("review_id", "finding_id", "line_number", "in_diff"),
+        [
+            (review_id, finding_start + finding, line_number, diff if pr else None)
+            for review_id, finding, line_number, diff, pr in zip(
+                review_ids[owner].tolist(), link.tolist(), link_line.tolist(), in_diff.tolist(), link_pr.tolist()
+            )
+        ],
+    )
+
+    # Rollups of completed reviews, bucketed by completion time
+    finished = base.timestamp() + created[completed] + analysis[completed]
+    ones = np.ones(int(completed.sum()), dtype=np.int64)
+    counters = np.column_stack([
+        ones, total[completed], *by_severity[completed].T, false_positives[completed],
+        analysis[completed], ones, quality[completed], ones,
+    ])
+    epoch = datetime(1970, 1, 1)
+    loader.add(
+        DailyMetric.__table__,
+        ("repository_id", "date", *COUNTER_COLUMNS),
+        _rollup_rows(repository_id, (finished // 86400).astype(np.int64), counters,
+                     lambda day: date(1970, 1, 1) + timedelta(days=day)),
+    )
+    recent = finished >= (now - timedelta(days=settings.HOURLY_METRICS_RETENTION_DAYS)).timestamp()
+    loader.add(
+        HourlyMetric.__table__,
+        ("repository_id", "hour", *COUNTER_COLUMNS),
+        _rollup_rows(repository_id, (finished[recent] // 3600).astype(np.int64), counters[recent],
+                     lambda hour: epoch + timedelta(hours=hour)),
+    )
+
+    return pool, len(link), int(review_ids[completed][-1])
+
+
+def _next_id(conn: Connection, column) -> int:
+    return (conn.scalar(select(func.max(column))) or 0) + 1
+
+
+def _loadtest_user(conn: Connection) -> int:
+    user_id = conn.scalar(select(User.id).where(User.username == LOADTEST_USERNAME).limit(1))
+    if user_id is None:
+        user_id = conn.execute(
+            User.__table__.insert().values(username=LOADTEST_USERNAME).returning(User.id)
+        ).scalar_one()
+    return user_id
+
+
+def _finish_postgresql(conn: Connection) -> None:
+    """Move sequences past the explicit ids and refresh planner statistics"""
+    for table in ("repositories", "findings", "reviews"):
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"
+        ))
+    for table in _Loader.TABLES:
+        conn.execute(text(f"ANALYZE {table.name}"))
+
+
+async def _index_risk(reviews: Dict[int, int]) -> None:
+    """Build the risk tree of every repository from its latest review"""
+    async with AsyncSessionLocal() as db:
+        for count, (repository_id, review_id) in enumerate(reviews.items(), start=1):
+            await risk_index.apply_review(db, repository_id, review_id)
+            if count % 100 == 0:
+                await db.commit()
+        await db.commit()
+
+
+def seed(profile: Profile, random_seed: int = 0) -> SeedSummary:
+    """Add ``profile``'s volume of synthetic data on top of what the database holds"""
+    started = time.monotonic()
+    rng = np.random.default_rng(random_seed)
+    now = datetime.utcnow().replace(microsecond=0)
+
+    weights = 1.0 / np.arange(1, profile.repositories + 1) ** profile.repository_skew
+    weights /= weights.sum()
+    floor = 1 if profile.reviews >= profile.repositories else 0  # a review per repository when possible
+    review_counts = floor + rng.multinomial(profile.reviews - floor * profile.repositories, weights)
+    issue_counts = np.round(profile.issues * review_counts / review_counts.sum()).astype(np.int64)
+
+    latest_reviews: Dict[int, int] = {}
+    with engine.begin() as conn:
+        summary = SeedSummary(user_id=_loadtest_user(conn))
+        repository_id = _next_id(conn, Repository.id)
+        finding_id = _next_id(conn, Finding.id)
+        review_id = _next_id(conn, Review.id)
+        loader = _Loader(conn)
+        for index, (reviews, issues) in enumerate(zip(review_counts.tolist(), issue_counts.tolist())):
+            if not reviews:
+                continue
+            findings, links, latest = _seed_repository(
+                rng, loader, profile, summary.user_id, repository_id, reviews, issues,
+                finding_id, review_id, now,
+            )
+            latest_reviews[repository_id] = latest
+            summary.repositories += 1
+            summary.reviews += reviews
+            summary.findings += findings
+            summary.review_findings += links
+            repository_id += 1
+            finding_id += findings
+            review_id += reviews
+            if (index + 1) % 100 == 0:
+                logger.info(
+                    "Seeded %d/%d repositories (%d review findings)",
+                    index + 1, profile.repositories, summary.review_findings,
+                )
+        loader.flush()
+        if conn.dialect.name == "postgresql":
+            _finish_postgresql(conn)
+
+    asyncio.run(_index_risk(latest_reviews))
+    summary.seconds = round(time.monotonic() - started, 1)
+    return summary
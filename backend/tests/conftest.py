@@ -0,0 +1,87 @@
+"""
+Test fixtures
+
+Settings are read from the environment when ``app`` is first imported, so
+the suite points it at a scratch SQLite file (and dummy credentials) before
+importing anything else. ``database`` recreates the schema for each test
+that needs one; ``client`` talks to the app in-process without running the
+lifespan, so no workers or GitHub client are started.
+"""
+import os
+import tempfile
+
+_SCRATCH = tempfile.mkdtemp(prefix="sentinelcode-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_SCRATCH, 'test.db')}"
+os.environ["ASYNC_DATABASE_URL"] = ""
+os.environ["ENV"] = "test"
+os.environ["DEBUG"] = "false"
+for _name, _value in (
+    ("SECRET_KEY", "test-secret"),
+    ("JWT_SECRET_KEY", "test-jwt-secret"),
+    ("GITHUB_CLIENT_ID", "test-client"),
+    ("GITHUB_CLIENT_SECRET", "test-client-secret"),
+    ("GITHUB_REDIRECT_URI", "http://localhost/callback"),
+    ("GITHUB_WEBHOOK_SECRET", ""),
+):
+    os.environ.setdefault(_name, _value)
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+import pytest_asyncio  # noqa: E402
+
+import app.models  # noqa: E402,F401 - registers every table on Base.metadata
+from app.core.auth import auth_cache  # noqa: E402
+from app.core.database import Base, SessionLocal, async_engine, engine  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.models import Repository, User  # noqa: E402
+
+
+@pytest_asyncio.fixture
+async def database():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    auth_cache.clear()
+    yield
+    await async_engine.dispose()  # pooled aiosqlite connections belong to this test's loop
+
+
+@pytest.fixture
+def session(database):
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@pytest_asyncio.fixture
+async def client(database):
+    from app.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        yield http
+
+
+def add_user(db, username: str) -> User:
+    user = User(username=username)
+    db.add(user)
+    db.flush()
+    return user
+
+
+def add_repository(db, user: User, name: str) -> Repository:
+    repository = Repository(
+        user_id=user.id,
+        platform="github",
+        repo_name=f"{user.username}/{name}",
+        repo_url=f"https://github.com/{user.username}/{name}",
+        default_branch="main",
+    )
+    db.add(repository)
+    db.flush()
+    return repository
+
+
+def auth_headers(user: User) -> dict:
+    token = create_access_token({"sub": str(user.id), "ver": user.token_version or 0})
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,63 @@
+import json
+
+from app.models import Finding, Review, ReviewFinding
+from app.services.ai_scheduler import ITEM_ID_LENGTH, PackedItem, pack, parse_verdicts, verdict_values
+from app.services.issue_ingest import recompute_review_counters
+from tests.conftest import add_repository, add_user
+
+
+def _item(key: str, tokens: int) -> PackedItem:
+    return PackedItem(key=key.ljust(64, "0"), text=key, tokens=tokens)
+
+
+def test_pack_respects_budget_and_item_limit():
+    items = [_item(str(index), tokens) for index, tokens in enumerate((60, 50, 40, 30, 20, 10))]
+    batches = pack(items, budget=100, max_items=2)
+    assert all(sum(item.tokens for item in batch) <= 100 and len(batch) <= 2 for batch in batches)
+    assert sorted(item.key for batch in batches for item in batch) == sorted(item.key for item in items)
+
+
+def test_pack_gives_oversized_items_their_own_prompt():
+    batches = pack([_item("big", 500), _item("small", 10)], budget=100, max_items=10)
+    assert [[item.text for item in batch] for batch in batches] == [["big"], ["small"]]
+
+
+def test_parse_verdicts_keeps_well_formed_answers():
+    batch = [_item("a", 1), _item("b", 1), _item("c", 1)]
+    ids = [item.key[:ITEM_ID_LENGTH] for item in batch]
+    text = "Sure:\n" + json.dumps([
+        {"id": ids[0], "verdict": "dismiss", "confidence": 0.95, "explanation": "test code"},
+        {"id": ids[1], "verdict": "maybe", "confidence": 0.5},
+        {"id": ids[2], "verdict": "confirm", "confidence": "high"},
+        {"id": "unknown", "verdict": "confirm", "confidence": 1},
+    ])
+    assert parse_verdicts(text, batch) == {
+        batch[0].key: {"verdict": "dismiss", "confidence": 0.95, "explanation": "test code"},
+    }
+    assert parse_verdicts("not json [", batch) == {}
+
+
+def test_dismissal_confidence_is_inverted():
+    confirm = verdict_values({"verdict": "confirm", "confidence": 0.95, "explanation": "real"})
+    dismiss = verdict_values({"verdict": "dismiss", "confidence": 0.95, "explanation": "noise"})
+    assert (confirm["ai_verdict"], confirm["confidence_score"]) == ("confirm", 0.95)
+    assert (dismiss["ai_verdict"], dismiss["confidence_score"], dismiss["ai_explanation"]) == ("dismiss", 0.05, "noise")
+
+
+def test_confident_dismissals_are_not_counted(session):
+    repository = add_repository(session, add_user(session, "alice"), "app")
+    review = Review(repository_id=repository.id, commit_sha="a" * 40, status="in_progress")
+    session.add(review)
+    session.flush()
+    for index, verdict in enumerate(({"verdict": "dismiss", "confidence": 0.95},
+                                     {"verdict": "dismiss", "confidence": 0.55},
+                                     {"verdict": "confirm", "confidence": 0.9})):
+        finding = Finding(
+            repository_id=repository.id, fingerprint=str(index), file_path="a.py", issue_type="bug",
+            severity="high", title="t", **verdict_values(verdict),
+        )
+        session.add(finding)
+        session.flush()
+        session.add(ReviewFinding(review_id=review.id, finding_id=finding.id))
+    session.flush()
+    assert recompute_review_counters(session, review.id)["high"] == 2
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.models.analysis_cache import AnalysisCacheEntry
+from app.services import analysis_cache
+from app.services.analysis_cache import AnalyzerIdentity, git_blob_sha
+
+PYLINT = AnalyzerIdentity("pylint", "3.0", analysis_cache.ruleset_hash({"disable": ["C0114"]}))
+FINDING = {"line_number": 3, "issue_type": "bug", "severity": "high", "title": "Unused import", "file_path": "a.py"}
+
+
+def test_git_blob_sha_matches_git_hash_object():
+    assert git_blob_sha(b"hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+
+def test_partition_splits_hits_and_misses_and_groups_copies(session):
+    analysis_cache.put_many(session, PYLINT, {"a" * 40: [FINDING], "b" * 40: []})
+    files = {
+        "src/a.py": "a" * 40,
+        "vendored/a.py": "a" * 40,
+        "src/clean.py": "b" * 40,
+        "src/new.py": "c" * 40,
+        "src/new_copy.py": "c" * 40,
+    }
+
+    hits, misses = analysis_cache.partition(session, PYLINT, files)
+
+    cached = [{key: value for key, value in FINDING.items() if key != "file_path"}]
+    assert hits == {"src/a.py": cached, "vendored/a.py": cached, "src/clean.py": []}
+    assert misses == {"c" * 40: ["src/new.py", "src/new_copy.py"]}
+    assert session.query(AnalysisCacheEntry).count() == 2  # one row per blob, not per path
+
+
+def test_entries_are_keyed_by_analyzer_version_and_rules(session):
+    analysis_cache.put_many(session, PYLINT, {"a" * 40: [FINDING]})
+    newer = AnalyzerIdentity("pylint", "3.1", PYLINT.ruleset_hash)
+    stricter = AnalyzerIdentity("pylint", "3.0", analysis_cache.ruleset_hash({}))
+
+    assert analysis_cache.get_many(session, newer, ["a" * 40]) == {}
+    assert analysis_cache.get_many(session, stricter, ["a" * 40]) == {}
+    assert list(analysis_cache.get_many(session, PYLINT, ["a" * 40, "d" * 40])) == ["a" * 40]
+
+
+def test_hits_are_touched(session):
+    analysis_cache.put_many(session, PYLINT, {"a" * 40: []})
+    entry = session.query(AnalysisCacheEntry).one()
+    entry.last_used_at = datetime(2026, 1, 1)
+    session.flush()
+
+    analysis_cache.get_many(session, PYLINT, ["a" * 40])
+
+    session.expire_all()
+    entry = session.query(AnalysisCacheEntry).one()
+    assert entry.hit_count == 1
+    assert entry.last_used_at > datetime(2026, 1, 1)
+
+
+def test_first_writer_wins(session):
+    assert analysis_cache.put_many(session, PYLINT, {"a" * 40: [FINDING]}) == 1
+    assert analysis_cache.put_many(session, PYLINT, {"a" * 40: []}) == 0
+
+    assert analysis_cache.get_many(session, PYLINT, ["a" * 40])["a" * 40][0]["title"] == "Unused import"
+
+
+def test_eviction_drops_least_recently_used_down_to_the_watermark(session, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYSIS_CACHE_MAX_ENTRIES", 10)
+    analysis_cache.put_many(session, PYLINT, {f"{index:040x}": [] for index in range(10)})
+    assert analysis_cache.evict(session) == 0  # at the limit, not over it
+
+    analysis_cache.put_many(session, PYLINT, {f"{index:040x}": [] for index in range(10, 12)})
+    started = datetime(2026, 1, 1)
+    for entry in session.query(AnalysisCacheEntry):
+        entry.last_used_at = started + timedelta(minutes=int(entry.blob_sha, 16))
+    session.flush()
+
+    assert analysis_cache.evict(session) == 3  # 12 entries down to 0.9 * 10
+    remaining = sorted(int(blob_sha, 16) for (blob_sha,) in session.query(AnalysisCacheEntry.blob_sha))
+    assert remaining == list(range(3, 12))
@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.core.config import settings
+from app.models import Finding, Review, ReviewFinding
+from app.services import analyzer_runner
+from app.services.analyzers import BatchResult
+from app.services.analyzer_runner import shard
+from tests.conftest import add_repository, add_user
+
+
+def test_shard_balances_by_size():
+    sizes = {"a.py": 100, "b.py": 60, "c.py": 50, "d.py": 10, "e.py": 5}
+
+    batches = shard(list(sizes), sizes, batch_files=3)
+
+    assert batches == [["a.py", "d.py", "e.py"], ["b.py", "c.py"]]
+    assert shard([], sizes, batch_files=3) == []
+    assert [len(batch) for batch in shard(list(sizes), sizes, batch_files=1)] == [1] * 5
+
+
+class FakePools:
+    """Thread pools standing in for the process pool, counting how many were started"""
+
+    def __init__(self):
+        self.started = 0
+
+    def __call__(self, max_workers):
+        self.started += 1
+        return ThreadPoolExecutor(max_workers=max_workers)
+
+
+@pytest.fixture
+def runner(session, tmp_path, monkeypatch):
+    """A review plus a checkout of small Python files, analyzed by a fake pylint"""
+    user = add_user(session, "alice")
+    repository = add_repository(session, user, "api")
+    review = Review(repository_id=repository.id, commit_sha="a" * 40, status="in_progress")
+    session.add(review)
+    session.commit()
+
+    files = {}
+    for index, name in enumerate(("a.py", "b.py", "c.py", "slow.py")):
+        (tmp_path / name).write_text(f"value = {index}\n" * (index + 1))
+        files[name] = f"{index:040x}"
+
+    pools = FakePools()
+    shutdown = analyzer_runner.shutdown_pool
+    monkeypatch.setattr(analyzer_runner, "ProcessPoolExecutor", pools)
+    monkeypatch.setattr(analyzer_runner, "analyzer_version", lambda name: "test")
+    monkeypatch.setattr(settings, "ANALYZER_WORKERS", 2)
+    monkeypatch.setattr(settings, "ANALYZER_BATCH_FILES", 4)
+    shutdown()
+
+    async def run(fake_batch):
+        monkeypatch.setattr(analyzer_runner, "run_batch", fake_batch)
+        try:
+            return await analyzer_runner.run_analyzers(review.id, str(tmp_path), files, analyzer_names=["pylint"])
+        finally:
+            shutdown()
+
+    run.pools = pools
+    run.review_id = review.id
+    return run
+
+
+def finding(path):
+    return {
+        "line_number": 1,
+        "issue_type": "style",
+        "severity": "low",
+        "title": f"Issue in {path}",
+        "source": "static_analysis",
+        "static_rule_id": "pylint-C0103",
+    }
+
+
+@pytest.mark.asyncio
+async def test_timeouts_are_bisected_down_to_the_slow_file(runner, session):
+    calls = []
+
+    def fake_batch(name, options, root, files, timeout, memory_mb):
+        calls.append(sorted(files))
+        if "slow.py" in files:
+            return BatchResult(analyzer=name, files=files, timed_out=True)
+        return BatchResult(analyzer=name, files=files, findings={path: [finding(path)] for path in files})
+
+    stats = await runner(fake_batch)
+
+    assert sorted(calls, key=len, reverse=True)[0] == ["a.py", "b.py", "c.py", "slow.py"]
+    assert ["slow.py"] in calls
+    assert stats.skipped_files == ["slow.py"]
+    assert stats.files_analyzed == 3
+    assert stats.batches == len(calls) == 5  # 4 files, then 2 + 2, then 1 + 1
+    stored = session.query(Finding.file_path).join(ReviewFinding).filter(ReviewFinding.review_id == runner.review_id)
+    paths = sorted(path for (path,) in stored)
+    assert paths == ["a.py", "b.py", "c.py"]
+
+
+@pytest.mark.asyncio
+async def test_a_broken_pool_is_replaced(runner, monkeypatch):
+    monkeypatch.setattr(settings, "ANALYZER_BATCH_FILES", 1)
+    monkeypatch.setattr(settings, "ANALYZER_WORKERS", 1)  # the other batches wait in the broken pool's queue
+    broken = []
+
+    def fake_batch(name, options, root, files, timeout, memory_mb):
+        if files == ["slow.py"]:
+            broken.append(files)
+            raise BrokenProcessPool("worker died")
+        return BatchResult(analyzer=name, files=files, findings={path: [] for path in files})
+
+    stats = await runner(fake_batch)
+
+    assert broken == [["slow.py"]]
+    assert runner.pools.started == 2
+    assert stats.files_analyzed == 3  # queued batches were resubmitted to the new pool
+    assert len(stats.errors) == 1 and "worker died" in stats.errors[0]
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import auth
+from app.core.auth import AuthCache, Principal, auth_cache
+from tests.conftest import add_user, auth_headers
+
+ALICE = Principal(id=1, username="alice", token_version=0)
+BOB = Principal(id=2, username="bob", token_version=0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1_000.0)
+    monkeypatch.setattr(auth, "time", SimpleNamespace(time=lambda: now.value))
+    return now
+
+
+def test_entries_expire_exactly_at_exp(clock):
+    cache = AuthCache(max_entries=10, ttl_seconds=60)
+    cache.put("token", ALICE, exp=1_010.0)
+
+    clock.value = 1_009.999
+    assert cache.get("token") == ALICE
+    clock.value = 1_010.0
+    assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = AuthCache(max_entries=10, ttl_seconds=60)
+    cache.put("token", ALICE, exp=1_000_000.0)
+
+    clock.value = 1_059.0
+    assert cache.get("token") == ALICE
+    clock.value = 1_060.0
+    assert cache.get("token") is None
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = AuthCache(max_entries=2, ttl_seconds=60)
+    cache.put("alice-1", ALICE, exp=2_000.0)
+    cache.put("bob-1", BOB, exp=2_000.0)
+    assert cache.get("alice-1") == ALICE  # bob-1 is now the oldest
+
+    cache.put("alice-2", ALICE, exp=2_000.0)
+
+    assert len(cache) == 2
+    assert cache.get("bob-1") is None
+    assert cache.get("alice-1") == cache.get("alice-2") == ALICE
+    assert cache._by_user == {ALICE.id: {"alice-1", "alice-2"}}
+
+
+def test_invalidate_user_drops_only_that_users_tokens(clock):
+    cache = AuthCache(max_entries=10, ttl_seconds=60)
+    cache.put("alice-1", ALICE, exp=2_000.0)
+    cache.put("alice-2", ALICE, exp=2_000.0)
+    cache.put("bob-1", BOB, exp=2_000.0)
+
+    cache.invalidate_user(ALICE.id)
+
+    assert cache.get("alice-1") is None and cache.get("alice-2") is None
+    assert cache.get("bob-1") == BOB
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_cached_tokens(client, session):
+    user = add_user(session, "alice")
+    session.commit()
+    headers = auth_headers(user)
+
+    assert (await client.get("/api/v1/auth/me", headers=headers)).status_code == 200
+    assert len(auth_cache) == 1
+
+    assert (await client.post("/api/v1/auth/logout", headers=headers)).status_code == 200
+    assert len(auth_cache) == 0
+
+    response = await client.get("/api/v1/auth/me", headers=headers)
+    assert (response.status_code, response.json()["detail"]) == (401, "Token has been revoked")
+    session.refresh(user)
+    assert user.token_version == 1
+    assert (await client.get("/api/v1/auth/me", headers=auth_headers(user))).status_code == 200
@@ -0,0 +1,83 @@
+from app.core.config import settings
+from app.services.diff_scope import PathIndex, build_scope, parse_unified_diff, python_imports
+
+DIFF = """\
+diff --git a/docs/notes.sql b/docs/notes.sql
+index 1111111..2222222 100644
+--- a/docs/notes.sql
++++ b/docs/notes.sql
+@@ -1,3 +1,3 @@
+ select 1;
+--- a/old comment
++++ b/new comment
+ select 2;
+@@ -10 +10,2 @@
+-x
++y
++z
+\\ No newline at end of file
+diff --git a/gone.py b/gone.py
+deleted file mode 100644
+--- a/gone.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-a = 1
+-b = 2
+"""
+
+
+def test_hunk_bodies_are_not_read_as_file_headers():
+    assert parse_unified_diff(DIFF) == {"docs/notes.sql": [(2, 2), (10, 11)]}
+
+
+def test_pure_deletion_marks_the_following_line():
+    diff = "+++ b/app.py\n@@ -4,2 +3,0 @@\n-a\n-b\n"
+    assert parse_unified_diff(diff) == {"app.py": [(3, 3)]}
+
+
+TREE = PathIndex([
+    "backend/app/__init__.py",
+    "backend/app/main.py",
+    "backend/app/core/__init__.py",
+    "backend/app/core/config.py",
+    "backend/app/services/__init__.py",
+    "backend/app/services/util.py",
+    "backend/app/services/github.py",
+    "backend/scripts/seed.py",
+    "backend/scripts/helpers.py",
+    "vendor/lib/os.py",
+    "json.py",
+])
+
+
+def test_package_roots():
+    assert TREE.package_roots == {"", "backend"}
+
+
+def test_absolute_imports_resolve_from_package_roots_only():
+    source = "import os\nimport json\nfrom app.core import config\nfrom app.services.util import helper\n"
+    assert python_imports(source, "backend/app/main.py", TREE) == {
+        "json.py",
+        "backend/app/core/__init__.py",
+        "backend/app/core/config.py",
+        "backend/app/services/util.py",
+    }
+
+
+def test_relative_and_script_imports():
+    assert python_imports("from . import util\n", "backend/app/services/github.py", TREE) == {
+        "backend/app/services/__init__.py",
+        "backend/app/services/util.py",
+    }
+    assert python_imports("import helpers\n", "backend/scripts/seed.py", TREE) == {"backend/scripts/helpers.py"}
+
+
+def test_drop_mode_does_not_analyze_imported_files(monkeypatch):
+    diff = "--- a/app/main.py\n+++ b/app/main.py\n@@ -1 +1 @@\n-x = 1\n+from app import util\n"
+    sources = {"app/main.py": "from app import util\n"}
+    tree = ["app/__init__.py", "app/main.py", "app/util.py"]
+
+    monkeypatch.setattr(settings, "PR_REVIEW_OUT_OF_SCOPE", "tag")
+    assert build_scope(diff, tree, sources.get).paths_to_analyze == ["app/__init__.py", "app/main.py", "app/util.py"]
+    monkeypatch.setattr(settings, "PR_REVIEW_OUT_OF_SCOPE", "drop")
+    assert build_scope(diff, tree, sources.get).paths_to_analyze == ["app/main.py"]
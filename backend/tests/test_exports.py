@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.models import Finding, Review, ReviewFinding
+from tests.conftest import add_repository, add_user, auth_headers
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def repositories(session):
+    """Two of alice's repositories with one reviewed commit each: a high and a low issue"""
+    user = add_user(session, "alice")
+    repositories = {}
+    for name in ("api", "web"):
+        repository = add_repository(session, user, name)
+        review = Review(repository_id=repository.id, commit_sha="a" * 40, status="completed")
+        session.add(review)
+        session.flush()
+        for line, severity in ((1, "high"), (2, "low")):
+            finding = Finding(
+                repository_id=repository.id, fingerprint=f"{name}-{line}", file_path=f"{name}.py",
+                issue_type="bug", severity=severity, title=f"{severity} bug", source="static_analysis",
+            )
+            session.add(finding)
+            session.flush()
+            session.add(ReviewFinding(review_id=review.id, finding_id=finding.id, line_number=line))
+        repositories[name] = repository.id
+    session.commit()
+    return auth_headers(user), repositories
+
+
+async def test_ndjson_export_applies_the_filters(client, repositories):
+    headers, repositories = repositories
+    response = await client.post(
+        "/api/v1/dashboard/export",
+        headers=headers,
+        params={"repo_id": repositories["web"], "severity": ["high", "medium"]},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [(row["file_path"], row["severity"]) for row in rows] == [("web.py", "high")]
+
+
+async def test_json_and_csv_exports_hold_every_row(client, repositories):
+    headers, _ = repositories
+    response = await client.post("/api/v1/dashboard/export", headers=headers, params={"format": "json"})
+    assert [row["line_number"] for row in response.json()] == [1, 2, 1, 2]
+
+    response = await client.post("/api/v1/dashboard/export", headers=headers, params={"format": "csv"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["file_path"] for row in rows] == ["api.py", "api.py", "web.py", "web.py"]
+
+
+async def test_unsupported_formats_are_rejected(client, repositories):
+    headers, _ = repositories
+    response = await client.post("/api/v1/dashboard/export", headers=headers, params={"format": "pdf"})
+    assert response.status_code == 400
@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import pytest
+
+from app.models import DailyMetric, Finding, Review, ReviewFinding
+from tests.conftest import add_repository, add_user, auth_headers
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def shared_finding(session):
+    """Two completed reviews of one repository reporting the same two findings"""
+    user = add_user(session, "alice")
+    repository = add_repository(session, user, "app")
+    findings = []
+    for index in range(2):
+        finding = Finding(
+            repository_id=repository.id, fingerprint=str(index), file_path="a.py", issue_type="bug",
+            severity="high", title="t", source="static_analysis", is_false_positive=False,
+        )
+        session.add(finding)
+        findings.append(finding)
+    completed_at = datetime.utcnow()
+    reviews = []
+    for _ in range(2):
+        review = Review(
+            repository_id=repository.id, commit_sha="a" * 40, status="completed", completed_at=completed_at,
+            total_issues=2, high_issues=2, critical_issues=0, medium_issues=0, low_issues=0, quality_score=90,
+        )
+        session.add(review)
+        session.flush()
+        session.add_all(ReviewFinding(review_id=review.id, finding_id=finding.id) for finding in findings)
+        reviews.append(review)
+    session.add(DailyMetric(
+        repository_id=repository.id, date=completed_at.date(), reviews_count=2, total_issues=4, high_issues=4,
+        quality_score_sum=180, quality_score_count=2,
+    ))
+    session.commit()
+    return auth_headers(user), [review.id for review in reviews], [finding.id for finding in findings]
+
+
+async def _feedback(client, headers, review_id, finding_id, flag):
+    response = await client.post(
+        f"/api/v1/reviews/{review_id}/feedback", headers=headers,
+        json={"findings": [{"finding_id": finding_id, "false_positive": flag}]},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+async def test_feedback_refreshes_every_review_with_the_finding(client, session, shared_finding):
+    headers, (first, second), (finding, _) = shared_finding
+    etag = (await client.get(f"/api/v1/reviews/{second}", headers=headers)).headers["ETag"]
+
+    result = await _feedback(client, headers, first, finding, True)
+    assert result["reviews_updated"] == 2
+
+    response = await client.get(f"/api/v1/reviews/{second}", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["review"]["total_issues"] == 1
+
+    session.expire_all()
+    rollup = session.query(DailyMetric).one()
+    assert (rollup.total_issues, rollup.high_issues, rollup.false_positives) == (2, 2, 2)
+    assert rollup.quality_score_sum == 190
+
+    await _feedback(client, headers, second, finding, False)
+    session.expire_all()
+    rollup = session.query(DailyMetric).one()
+    assert (rollup.total_issues, rollup.false_positives, rollup.quality_score_sum) == (4, 0, 180)
+    assert [review.total_issues for review in session.query(Review).order_by(Review.id)] == [2, 2]
+
+
+async def test_unflagging_releases_suppressed_findings_in_other_reviews(client, session, shared_finding):
+    headers, (first, second), (finding, _) = shared_finding
+    await _feedback(client, headers, first, finding, True)
+    review = session.get(Review, second)
+    suppressed = Finding(
+        repository_id=review.repository_id, fingerprint="near-duplicate", file_path="b.py", issue_type="bug",
+        severity="critical", title="t", source="static_analysis", is_false_positive=True, suppressed_by_id=finding,
+    )
+    session.add(suppressed)
+    session.flush()
+    session.add(ReviewFinding(review_id=second, finding_id=suppressed.id))
+    session.commit()
+
+    result = await _feedback(client, headers, first, finding, False)
+    assert (result["unflagged"], result["released"]) == (1, 1)
+    session.expire_all()
+    assert session.get(Review, second).critical_issues == 1
+    assert session.get(Review, second).total_issues == 3
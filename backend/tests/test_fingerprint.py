@@ -0,0 +1,39 @@
+from app.services.fingerprint import assign_fingerprints, normalize_code
+
+
+def _reader(lines):
+    return lambda path, number: lines[number - 1] if 0 < number <= len(lines) else None
+
+
+def _finding(line, snippet=None, rule="pylint-W0611"):
+    return {"static_rule_id": rule, "file_path": "pkg/mod.py", "line_number": line, "code_snippet": snippet}
+
+
+def test_normalize_code_drops_gutters_and_whitespace():
+    assert normalize_code("12 x  =  1\n13:\ty = 2\n") == "x = 1 y = 2"
+    assert normalize_code(None) == ""
+
+
+def test_snippet_fingerprint_ignores_line_shifts():
+    [before] = assign_fingerprints([_finding(10, "10 eval(data)")])
+    [after] = assign_fingerprints([_finding(42, "42  eval(data)")])
+    assert before["fingerprint"] == after["fingerprint"]
+
+
+def test_snippetless_fingerprint_uses_surrounding_lines():
+    source = ["import os", "import sys", "", "def main():", "    pass"]
+    shifted = ["# header", *source]
+    [original] = assign_fingerprints([_finding(2)], _reader(source))
+    [moved] = assign_fingerprints([_finding(3)], _reader(shifted))
+    assert original["fingerprint"] == moved["fingerprint"]
+
+    changed_neighbour = ["import re", *source[1:]]
+    [other] = assign_fingerprints([_finding(2)], _reader(changed_neighbour))
+    assert other["fingerprint"] != original["fingerprint"]
+
+
+def test_repeated_code_is_told_apart_by_occurrence():
+    findings = assign_fingerprints([_finding(9, "eval(data)"), _finding(3, "eval(data)")])
+    assert findings[0]["fingerprint"] != findings[1]["fingerprint"]
+    again = assign_fingerprints([_finding(20, "eval(data)"), _finding(4, "eval(data)")])
+    assert {finding["fingerprint"] for finding in again} == {finding["fingerprint"] for finding in findings}
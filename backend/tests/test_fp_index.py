@@ -0,0 +1,111 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Finding
+from app.services import fp_index
+from app.services.fp_index import FalsePositiveIndex, quantize
+from tests.conftest import add_repository, add_user
+
+
+def unit_rows(count: int, dim: int, seed: int = 7) -> np.ndarray:
+    vectors = np.random.default_rng(seed).normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_int8_quantization_round_trip():
+    vectors = unit_rows(50, 64)
+
+    codes, scales = quantize(vectors, "int8")
+
+    assert codes.dtype == np.int8 and scales.dtype == np.float16 and scales.shape == (50,)
+    restored = codes.astype(np.float32) * scales.astype(np.float32)[:, None]
+    peak = np.abs(vectors).max(axis=1, keepdims=True)
+    assert np.all(np.abs(restored - vectors) <= peak / 127 * 0.51 + 1e-3)
+    assert np.all(np.abs(codes).max(axis=1) == 127)  # each row uses the full code range
+
+
+def test_float16_quantization_round_trip():
+    vectors = unit_rows(10, 32)
+
+    codes, scales = quantize(vectors, "float16")
+
+    assert codes.dtype == np.float16 and scales is None
+    assert np.allclose(codes.astype(np.float32), vectors, atol=1e-3)
+
+
+@pytest.mark.parametrize("dtype", ["int8", "float16"])
+def test_search_returns_the_top_k_best_first(dtype, monkeypatch):
+    monkeypatch.setattr(settings, "FP_INDEX_QUERY_BATCH", 3)  # several query blocks
+    vectors = unit_rows(40, 64)
+    queries = unit_rows(7, 64, seed=11)
+    codes, scales = quantize(vectors, dtype)
+    index = FalsePositiveIndex(np.arange(100, 140, dtype=np.int64), codes, scales)
+
+    scores, ids = index.search(queries, k=5)
+
+    exact = queries @ vectors.T
+    expected = np.argsort(-exact, axis=1)[:, :5] + 100
+    assert np.all(np.diff(scores, axis=1) <= 0)
+    assert (ids == expected).mean() > 0.9  # quantization may swap near-ties
+    assert np.allclose(scores, np.take_along_axis(exact, ids - 100, axis=1), atol=0.02)
+
+
+def test_search_pads_when_the_index_is_smaller_than_k():
+    vectors = unit_rows(2, 16)
+    index = FalsePositiveIndex(np.array([5, 9]), *quantize(vectors, "int8"))
+
+    scores, ids = index.search(vectors[1:], k=4)
+
+    assert ids.tolist() == [[9, 5, -1, -1]]
+    assert np.isneginf(scores[0, 2:]).all()
+
+
+def test_concurrent_builds_leave_one_complete_index(session, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "FP_INDEX_DIR", str(tmp_path))
+    repository = add_repository(session, add_user(session, "alice"), "api")
+    for number in range(5):
+        session.add(Finding(
+            repository_id=repository.id,
+            fingerprint=f"fp-{number}",
+            file_path="app.py",
+            issue_type="security",
+            severity="high",
+            title="Hardcoded password",
+            code_snippet=f"password = 'secret{number}'",
+            source="static_analysis",
+            is_false_positive=True,
+        ))
+    session.commit()
+    repository_id = repository.id
+
+    errors = []
+    start = threading.Barrier(6)
+
+    def build():
+        db = SessionLocal()
+        try:
+            start.wait()
+            fp_index.build(db, repository_id)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=build) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    link = tmp_path / str(repository_id)
+    assert link.is_symlink()
+    versions = [path.name for path in tmp_path.iterdir() if path.is_dir() and not path.is_symlink()]
+    assert versions == [os.readlink(link)]
+    loaded = fp_index.get_index(session, repository_id)
+    assert len(loaded) == 5
@@ -0,0 +1,103 @@
+import httpx
+import pytest
+import pytest_asyncio
+
+from app.services.github_client import GitHubClient
+from app.services.github_scheduler import GitHubScheduler
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeAPI:
+    """Answers each request with the next scripted response, recording the requests"""
+
+    def __init__(self, *responses: httpx.Response):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        return self.responses.pop(0)
+
+
+@pytest_asyncio.fixture
+async def client_for():
+    clients = []
+
+    def build(api: FakeAPI) -> GitHubClient:
+        client = GitHubClient(transport=httpx.MockTransport(api), scheduler=GitHubScheduler())
+        clients.append(client)
+        return client
+
+    yield build
+    for client in clients:
+        await client.aclose()
+
+
+async def test_not_modified_replays_the_cached_body(client_for):
+    api = FakeAPI(
+        httpx.Response(200, json={"login": "alice"}, headers={"ETag": '"v1"', "Link": '<next>; rel="next"'}),
+        httpx.Response(304, headers={"ETag": '"v1"', "X-RateLimit-Remaining": "4999"}),
+    )
+    client = client_for(api)
+
+    first = await client.get("/user", token="token-a")
+    second = await client.get("/user", token="token-a")
+
+    assert "If-None-Match" not in api.requests[0].headers
+    assert api.requests[1].headers["If-None-Match"] == '"v1"'
+    assert (second.status_code, second.json()) == (200, {"login": "alice"})
+    assert second.extensions["from_cache"] is True
+    assert second.headers["link"] == first.headers["link"]
+    assert second.headers["x-ratelimit-remaining"] == "4999"
+
+
+async def test_last_modified_is_revalidated_with_if_modified_since(client_for):
+    stamp = "Sun, 18 Oct 2026 12:00:00 GMT"
+    api = FakeAPI(
+        httpx.Response(200, json=[1], headers={"Last-Modified": stamp}),
+        httpx.Response(304),
+    )
+    client = client_for(api)
+
+    await client.get("/user/repos", token="token-a")
+    response = await client.get("/user/repos", token="token-a")
+
+    assert api.requests[1].headers["If-Modified-Since"] == stamp
+    assert "If-None-Match" not in api.requests[1].headers
+    assert response.json() == [1]
+
+
+async def test_error_response_drops_the_cache_entry(client_for):
+    api = FakeAPI(
+        httpx.Response(200, json={"id": 1}, headers={"ETag": '"v1"'}),
+        httpx.Response(404, json={"message": "Not Found"}),
+        httpx.Response(200, json={"id": 1}),
+    )
+    client = client_for(api)
+
+    await client.get("/repos/o/r", token="token-a")
+    assert (await client.get("/repos/o/r", token="token-a")).status_code == 404
+    await client.get("/repos/o/r", token="token-a")
+
+    assert len(client.cache) == 0
+    assert "If-None-Match" not in api.requests[2].headers
+
+
+async def test_cache_entries_are_per_token(client_for):
+    api = FakeAPI(
+        httpx.Response(200, json={"login": "alice"}, headers={"ETag": '"a"'}),
+        httpx.Response(200, json={"login": "bob"}, headers={"ETag": '"b"'}),
+        httpx.Response(304),
+    )
+    client = client_for(api)
+
+    await client.get("/user", token="token-a")
+    bob = await client.get("/user", token="token-b")
+    again = await client.get("/user", token="token-b")
+
+    assert "If-None-Match" not in api.requests[1].headers  # alice's validator is not sent for bob
+    assert api.requests[2].headers["If-None-Match"] == '"b"'
+    assert bob.json() == again.json() == {"login": "bob"}
+    assert len(client.cache) == 2
+    assert not any("token-" in str(key) for key in client.cache._entries)
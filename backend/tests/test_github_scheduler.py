@@ -0,0 +1,49 @@
+import time
+
+import httpx
+
+from app.core.config import settings
+from app.services.github_scheduler import RateBudget
+
+
+def _response(status: int, text: str = "", **headers) -> httpx.Response:
+    headers = {key.replace("_", "-"): str(value) for key, value in headers.items()}
+    return httpx.Response(status, text=text, headers=headers)
+
+
+def test_headers_update_the_budget_and_pace():
+    budget = RateBudget("token", limit=5000)
+    reset = int(time.time()) + 1000
+    retry = budget.observe(_response(200, x_ratelimit_limit=15000, x_ratelimit_remaining=500, x_ratelimit_reset=reset))
+    assert not retry
+    assert (budget.limit, budget.remaining, budget.reset_at) == (15000, 500, reset)
+    assert 0.45 < budget.bucket.rate < 0.55  # 500 requests over ~1000s
+    assert budget.bucket.tokens <= 500
+
+
+def test_exhausted_quota_pauses_until_reset():
+    budget = RateBudget("token", limit=5000)
+    reset = int(time.time()) + 120
+    assert budget.observe(_response(403, x_ratelimit_remaining=0, x_ratelimit_reset=reset))
+    assert budget.paused_until - time.monotonic() > 100
+
+
+def test_retry_after_and_secondary_limits_back_off():
+    budget = RateBudget("token", limit=5000)
+    assert budget.observe(_response(429, retry_after=30))
+    assert 25 < budget.paused_until - time.monotonic() <= 30
+
+    budget = RateBudget("token", limit=5000)
+    assert budget.observe(_response(403, text="You have exceeded a secondary rate limit"))
+    assert budget.observe(_response(403, text="You have exceeded a secondary rate limit"))
+    assert budget.secondary_strikes == 2
+    expected = settings.GITHUB_SECONDARY_BACKOFF_SECONDS * 2
+    assert expected - 5 < budget.paused_until - time.monotonic() <= expected
+    budget.observe(_response(200))
+    assert budget.secondary_strikes == 0
+
+
+def test_permission_errors_are_not_retried():
+    budget = RateBudget("token", limit=5000)
+    assert not budget.observe(_response(403, text="Resource not accessible by integration"))
+    assert budget.paused_until == 0.0
@@ -0,0 +1,107 @@
+import pytest
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models import Finding, Review, ReviewFinding
+from app.services import issue_ingest
+from tests.conftest import add_repository, add_user
+
+
+@pytest.fixture
+def reviews(session, monkeypatch):
+    """Two reviews of one repository, ingesting without suppression or precision scaling"""
+    monkeypatch.setattr(settings, "FP_SUPPRESS_ENABLED", False)
+    monkeypatch.setattr(settings, "RULE_PRECISION_ENABLED", False)
+    repository = add_repository(session, add_user(session, "alice"), "api")
+    pair = [Review(repository_id=repository.id, commit_sha=sha * 40, status="in_progress") for sha in "ab"]
+    session.add_all(pair)
+    session.flush()
+    return [review.id for review in pair]
+
+
+def issue(number, severity="low", **extra):
+    return {
+        "file_path": f"app/module_{number}.py",
+        "line_number": number,
+        "issue_type": "style",
+        "severity": severity,
+        "title": f"Issue {number}",
+        "source": "static_analysis",
+        "static_rule_id": "pylint-C0103",
+        **extra,
+    }
+
+
+def test_findings_are_inserted_in_chunks_with_their_ids(session, reviews, monkeypatch):
+    monkeypatch.setattr(settings, "ISSUE_INGEST_BATCH_SIZE", 2)
+    first, _ = reviews
+    inserts = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO findings"):
+            inserts.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        assert issue_ingest.bulk_insert_issues(session, first, [issue(number) for number in range(5)]) == 5
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert len(inserts) == 3 and all("RETURNING" in statement for statement in inserts)
+
+    stored = session.query(Finding).all()
+    assert len(stored) == 5
+    assert {finding.first_seen_review_id for finding in stored} == {first}
+    links = session.query(ReviewFinding).filter(ReviewFinding.review_id == first).all()
+    assert {link.finding_id for link in links} == {finding.id for finding in stored}
+    assert {link.line_number for link in links} == set(range(5))
+
+
+def test_known_fingerprints_are_linked_not_inserted_again(session, reviews, monkeypatch):
+    first, second = reviews
+    issue_ingest.bulk_insert_issues(session, first, [issue(number) for number in range(3)])
+    inserted = []
+    resolve = issue_ingest.resolve_findings
+
+    def spy(db, repository_id, review_id, findings):
+        ids = resolve(db, repository_id, review_id, findings)
+        inserted.append(session.query(Finding).count())
+        return ids
+
+    monkeypatch.setattr(issue_ingest, "resolve_findings", spy)
+
+    assert issue_ingest.bulk_insert_issues(session, second, [issue(number) for number in range(4)]) == 4
+
+    assert inserted == [4]  # only the new finding was written
+    rows = session.query(Finding).order_by(Finding.line_number).all()
+    assert [finding.first_seen_review_id for finding in rows] == [first, first, first, second]
+    assert session.query(ReviewFinding).filter(ReviewFinding.review_id == second).count() == 4
+
+
+def test_counters_skip_out_of_diff_false_positive_and_dismissed_findings(session, reviews):
+    first, _ = reviews
+    findings = [
+        issue(1, "critical"),
+        issue(2, "high"),
+        issue(3, "high"),
+        issue(4, "medium", in_diff=False),
+        issue(5, "low"),
+        issue(6, "low"),
+    ]
+    issue_ingest.bulk_insert_issues(session, first, findings)
+    by_line = {finding.line_number: finding for finding in session.query(Finding)}
+    by_line[5].is_false_positive = True
+    by_line[6].ai_verdict, by_line[6].confidence_score = "dismiss", 0.1
+    by_line[3].ai_verdict, by_line[3].confidence_score = "dismiss", 0.9  # not sure enough to drop
+    session.flush()
+
+    counts = issue_ingest.recompute_review_counters(session, first)
+
+    assert counts == {"critical": 1, "high": 2, "medium": 0, "low": 0}
+    review = session.get(Review, first)
+    assert (review.total_issues, review.critical_issues, review.high_issues) == (3, 1, 2)
+
+
+def test_counters_of_a_review_without_findings_are_zero(session, reviews):
+    assert issue_ingest.recompute_review_counters(session, reviews[0]) == dict.fromkeys(issue_ingest.SEVERITIES, 0)
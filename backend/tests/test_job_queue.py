@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import AnalysisJob, Review
+from app.services.job_queue import JobWorkerPool, enqueue_analysis, is_commit_sha
+from tests.conftest import add_repository, add_user, auth_headers
+
+pytestmark = pytest.mark.asyncio
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+@pytest.fixture
+def repository_id(session):
+    repository = add_repository(session, add_user(session, "alice"), "app")
+    session.commit()
+    return repository.id
+
+
+async def test_is_commit_sha():
+    assert is_commit_sha(SHA)
+    assert not is_commit_sha("main")
+    assert not is_commit_sha(SHA[:7])
+
+
+async def test_commit_shas_are_deduped_but_branch_scans_are_not(repository_id):
+    async with AsyncSessionLocal() as db:
+        first, created = await enqueue_analysis(db, repository_id, SHA, kind="manual", payload={"ref": SHA})
+        again, created_again = await enqueue_analysis(db, repository_id, SHA, kind="manual", payload={"ref": SHA})
+        assert created and not created_again and again.id == first.id
+
+        branch, created = await enqueue_analysis(db, repository_id, None, kind="manual", payload={"ref": "main"})
+        rescan, created_again = await enqueue_analysis(db, repository_id, None, kind="manual", payload={"ref": "main"})
+        assert created and created_again and rescan.id != branch.id
+
+
+async def test_manual_scan_keeps_branch_names_out_of_commit_sha(client, session):
+    user = add_user(session, "bob")
+    repository = add_repository(session, user, "app")
+    session.commit()
+    url = f"/api/v1/repos/{repository.id}/scan"
+
+    response = await client.post(url, headers=auth_headers(user))
+    assert response.status_code == 200
+    response = await client.post(url, params={"commit_sha": SHA}, headers=auth_headers(user))
+    assert response.status_code == 200
+    async with AsyncSessionLocal() as db:
+        jobs = (await db.scalars(select(AnalysisJob).order_by(AnalysisJob.id))).all()
+        reviews = [await db.get(Review, job.review_id) for job in jobs]
+    assert [job.payload["ref"] for job in jobs] == ["main", SHA]
+    assert [review.commit_sha for review in reviews] == [None, SHA]
+
+    for ref in ("--upload-pack=touch /tmp/pwned", "-h"):
+        response = await client.post(url, params={"commit_sha": ref}, headers=auth_headers(user))
+        assert response.status_code == 422
+
+
+async def _job(db, review_id):
+    return await db.scalar(select(AnalysisJob).where(AnalysisJob.review_id == review_id))
+
+
+async def test_only_expired_leases_are_recovered(repository_id):
+    stale = datetime.utcnow() - timedelta(seconds=settings.JOB_LEASE_SECONDS + 60)
+    async with AsyncSessionLocal() as db:
+        live, _ = await enqueue_analysis(db, repository_id, SHA, kind="push")
+        dead, _ = await enqueue_analysis(db, repository_id, "f" * 40, kind="push")
+        leases = ((live.id, "other-pool", datetime.utcnow()), (dead.id, "dead-pool", stale))
+        for review_id, owner, heartbeat in leases:
+            job = await _job(db, review_id)
+            job.status, job.locked_by, job.heartbeat_at = "running", owner, heartbeat
+        await db.commit()
+
+    assert await JobWorkerPool()._recover_expired() == 1
+    async with AsyncSessionLocal() as db:
+        assert (await _job(db, live.id)).status == "running"
+        job = await _job(db, dead.id)
+        assert job.status == "queued" and job.locked_by is None
+
+
+async def test_outcome_is_dropped_after_losing_the_lease(repository_id):
+    pool = JobWorkerPool(concurrency=1)
+    async with AsyncSessionLocal() as db:
+        review, _ = await enqueue_analysis(db, repository_id, SHA, kind="push")
+    ctx = await pool._claim_next()
+    async with AsyncSessionLocal() as db:
+        job = await _job(db, review.id)
+        assert job.locked_by == pool.owner
+        job.locked_by = "another-pool"  # expired and reclaimed elsewhere
+        await db.commit()
+
+    await pool._fail(ctx, "boom")
+    async with AsyncSessionLocal() as db:
+        job = await _job(db, review.id)
+        assert job.status == "running" and job.last_error is None
+
+
+async def test_job_that_keeps_losing_its_worker_ends_failed(repository_id):
+    stale = datetime.utcnow() - timedelta(seconds=settings.JOB_LEASE_SECONDS + 60)
+    async with AsyncSessionLocal() as db:
+        review, _ = await enqueue_analysis(db, repository_id, SHA, kind="push")
+
+    for attempt in range(1, settings.JOB_MAX_ATTEMPTS + 1):
+        pool = JobWorkerPool(concurrency=1)  # a fresh process each time
+        ctx = await pool._claim_next()
+        assert ctx is not None and ctx.attempt == attempt
+        async with AsyncSessionLocal() as db:
+            (await _job(db, review.id)).heartbeat_at = stale  # the process died mid-job
+            await db.commit()
+        assert await pool._recover_expired() == 1
+
+    assert await JobWorkerPool()._claim_next() is None
+    async with AsyncSessionLocal() as db:
+        job = await _job(db, review.id)
+        assert job.status == "failed" and job.finished_at is not None and "lease expired" in job.last_error
+        assert (await db.get(Review, review.id)).status == "failed"
@@ -0,0 +1,15 @@
+from collections import Counter
+
+from benchmarks.load import _endpoint_summary
+
+
+def test_error_rate_counts_every_unexpected_status():
+    statuses = Counter({200: 3, 201: 1, 304: 1, 429: 1, 404: 1, 422: 1, 500: 1, 0: 1})
+    summary = _endpoint_summary([0.01] * 10, statuses, seconds=1.0)
+    assert summary["error_rate"] == 0.4
+    assert summary["rejected"] == 1
+
+
+def test_empty_endpoint():
+    summary = _endpoint_summary([], Counter(), seconds=1.0)
+    assert summary["requests"] == 0 and summary["error_rate"] == 0.0
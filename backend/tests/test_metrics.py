@@ -0,0 +1,65 @@
+import pytest
+
+from app.core.config import settings
+from app.core.metrics import HTTP_REQUEST_DB_QUERIES, HTTP_REQUESTS, Counter, Histogram, Registry
+from tests.conftest import add_user, auth_headers
+
+
+def test_exposition_format():
+    registry = Registry()
+    requests = registry.register(Counter("requests_total", "Requests", ("route",)))
+    latency = registry.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+    requests.inc(route='/a"b')
+    requests.inc(2, route='/a"b')
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 3',
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 2',  # upper bounds are inclusive
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 3.65",
+        "latency_seconds_count 4",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_requests_are_labelled_by_route_template(client, session):
+    user = add_user(session, "alice")
+    session.commit()
+    template = "/api/v1/reviews/{review_id}"
+    before = HTTP_REQUESTS.value(method="GET", route=template, status="404")
+    queries_before = HTTP_REQUEST_DB_QUERIES.count(route=template)
+    unmatched = HTTP_REQUESTS.value(method="GET", route="unmatched", status="404")
+
+    for review_id in (101, 102):
+        assert (await client.get(f"/api/v1/reviews/{review_id}", headers=auth_headers(user))).status_code == 404
+    assert (await client.get("/no/such/path")).status_code == 404
+
+    assert HTTP_REQUESTS.value(method="GET", route=template, status="404") == before + 2
+    assert HTTP_REQUEST_DB_QUERIES.count(route=template) == queries_before + 2
+    assert HTTP_REQUESTS.value(method="GET", route="unmatched", status="404") == unmatched + 1
+    assert HTTP_REQUESTS.value(method="GET", route="/api/v1/reviews/101", status="404") == 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_renders_the_registry(client, monkeypatch):
+    await client.get("/health/live")
+
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE http_requests_total counter" in response.text
+    assert 'http_requests_total{method="GET",route="/health/live",status="200"}' in response.text
+    assert 'analysis_jobs{status="queued"} 0' in response.text
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-token")
+    assert (await client.get("/metrics")).status_code == 401
+    authorized = await client.get("/metrics", headers={"Authorization": "Bearer scrape-token"})
+    assert authorized.status_code == 200
@@ -0,0 +1,92 @@
+import json
+from datetime import date, datetime
+
+import pytest
+
+from app.models import DailyMetric, Finding, Review, ReviewFinding
+from tests.conftest import add_repository, add_user, auth_headers
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def owners(session):
+    alice, bob = add_user(session, "alice"), add_user(session, "bob")
+    repositories = {"alice": add_repository(session, alice, "app"), "bob": add_repository(session, bob, "app")}
+    reviews = {}
+    for owner, repository in repositories.items():
+        review = Review(
+            repository_id=repository.id, commit_sha="a" * 40, status="completed",
+            total_issues=3, completed_at=datetime.utcnow(),
+        )
+        session.add(review)
+        session.add(DailyMetric(repository_id=repository.id, date=date.today(), reviews_count=1, total_issues=3))
+        session.flush()
+        finding = Finding(
+            repository_id=repository.id, fingerprint=owner, file_path=f"{owner}.py", issue_type="bug",
+            severity="high", title=f"{owner}'s bug", source="static_analysis",
+        )
+        session.add(finding)
+        session.flush()
+        session.add(ReviewFinding(review_id=review.id, finding_id=finding.id, line_number=1))
+        reviews[owner] = review.id
+    session.commit()
+    return {"alice": auth_headers(alice), "bob": auth_headers(bob)}, repositories, reviews
+
+
+async def test_listing_only_returns_own_reviews(client, owners):
+    headers, repositories, reviews = owners
+    response = await client.get("/api/v1/reviews/", headers=headers["alice"], params={"include_total": "true"})
+    assert response.status_code == 200
+    assert [review["id"] for review in response.json()["reviews"]] == [reviews["alice"]]
+    assert response.json()["total"] == 1
+
+    response = await client.get(
+        "/api/v1/reviews/", headers=headers["alice"], params={"repo_id": repositories["bob"].id}
+    )
+    assert response.status_code == 404
+
+
+async def test_other_users_review_is_not_found(client, owners):
+    headers, _, reviews = owners
+    for path in (f"/api/v1/reviews/{reviews['bob']}", f"/api/v1/reviews/{reviews['bob']}/changes"):
+        assert (await client.get(path, headers=headers["alice"])).status_code == 404
+    assert (await client.get(f"/api/v1/reviews/{reviews['alice']}", headers=headers["alice"])).status_code == 200
+
+
+async def test_dashboard_is_scoped_to_the_user(client, owners):
+    headers, repositories, _ = owners
+    response = await client.get("/api/v1/dashboard/metrics", headers=headers["alice"])
+    assert response.json()["reviews_count"] == 1
+
+    bob_repo = repositories["bob"].id
+    for path in ("/api/v1/dashboard/metrics", "/api/v1/dashboard/heatmap", "/api/v1/dashboard/trends"):
+        response = await client.get(path, headers=headers["alice"], params={"repo_id": bob_repo})
+        assert response.status_code == 404, path
+
+
+async def test_requires_authentication(client, owners):
+    assert (await client.get("/api/v1/reviews/")).status_code == 401
+
+
+async def test_feedback_on_other_users_review_is_not_found(client, owners):
+    headers, _, reviews = owners
+    body = {"findings": [{"finding_id": 999, "false_positive": True}]}
+    response = await client.post(f"/api/v1/reviews/{reviews['bob']}/feedback", headers=headers["alice"], json=body)
+    assert response.status_code == 404
+    # Own review: reaches the handler, which rejects the unknown finding
+    response = await client.post(f"/api/v1/reviews/{reviews['alice']}/feedback", headers=headers["alice"], json=body)
+    assert response.status_code == 400
+
+
+async def test_export_only_streams_own_issues(client, owners):
+    headers, repositories, _ = owners
+    response = await client.post("/api/v1/dashboard/export", headers=headers["alice"])
+    assert response.status_code == 200
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["file_path"] for row in rows] == ["alice.py"]
+
+    response = await client.post(
+        "/api/v1/dashboard/export", headers=headers["alice"], params={"repo_id": repositories["bob"].id}
+    )
+    assert response.status_code == 404
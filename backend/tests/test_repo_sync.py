@@ -0,0 +1,134 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.models import Repository, User
+from app.services import repo_sync
+from tests.conftest import add_repository, add_user
+
+pytestmark = pytest.mark.asyncio
+
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+
+def remote_repo(repo_id: int, name: str, updated_at: datetime, pushed_at: datetime = NOW) -> dict:
+    return {
+        "id": repo_id,
+        "full_name": f"alice/{name}",
+        "html_url": f"https://github.com/alice/{name}",
+        "default_branch": "main",
+        "language": "Python",
+        "updated_at": updated_at.isoformat() + "Z",
+        "pushed_at": pushed_at.isoformat() + "Z",
+    }
+
+
+class FakeGitHub:
+    """Serves ``/user/repos`` pages from a list, recording the pages asked for"""
+
+    def __init__(self, repos):
+        self.repos = repos
+        self.pages = []
+
+    async def get(self, path, token, params=None, priority=None):
+        request = httpx.Request("GET", f"https://api.github.com{path}")
+        if path != "/user/repos":
+            return httpx.Response(404, request=request)
+        page, size = params["page"], params["per_page"]
+        self.pages.append(page)
+        return httpx.Response(200, json=self.repos[(page - 1) * size:page * size], request=request)
+
+
+def add_synced_user(session, synced_at=None) -> int:
+    user = add_user(session, "alice")
+    user.access_token = "gho_test"
+    user.repos_synced_at = synced_at
+    user.repos_full_synced_at = synced_at
+    session.commit()
+    return user.id
+
+
+async def sync(user_id: int, full: bool = False) -> repo_sync.SyncStats:
+    async with AsyncSessionLocal() as db:
+        return await repo_sync.sync_user_repositories(db, await db.get(User, user_id), full=full)
+
+
+def repositories(session):
+    session.expire_all()
+    return session.scalars(select(Repository).order_by(Repository.repo_name)).all()
+
+
+async def test_incremental_sync_stops_at_the_watermark(session, monkeypatch):
+    monkeypatch.setattr(settings, "REPO_SYNC_PAGE_SIZE", 2)
+    user_id = add_synced_user(session, synced_at=datetime.utcnow())
+    recent = datetime.utcnow() + timedelta(minutes=1)
+    fake = FakeGitHub([
+        remote_repo(1, "new", recent),
+        remote_repo(2, "stale", recent - timedelta(days=1)),
+        remote_repo(3, "older", recent - timedelta(days=2)),
+    ])
+    monkeypatch.setattr(repo_sync, "github", fake)
+
+    stats = await sync(user_id)
+
+    assert not stats.full
+    assert fake.pages == [1]  # the page was full, but it already reached the watermark
+    assert (stats.fetched, stats.written) == (1, 1)
+    assert [repository.repo_name for repository in repositories(session)] == ["alice/new"]
+
+
+async def test_unchanged_resync_writes_nothing(session, monkeypatch):
+    user_id = add_synced_user(session)
+    fake = FakeGitHub([remote_repo(1, "api", NOW), remote_repo(2, "web", NOW)])
+    monkeypatch.setattr(repo_sync, "github", fake)
+
+    first = await sync(user_id, full=True)
+    second = await sync(user_id, full=True)
+
+    assert (first.changed, first.written) == (2, 2)
+    assert (second.fetched, second.changed, second.written) == (2, 0, 0)
+    synced = repositories(session)
+    assert [repository.external_id for repository in synced] == [1, 2]
+    assert all(repository.is_enabled for repository in synced)
+
+
+async def test_upsert_skips_rows_whose_timestamps_did_not_move(session):
+    user_id = add_synced_user(session)
+    row = {
+        "user_id": user_id,
+        "platform": "github",
+        "external_id": 7,
+        "repo_name": "alice/api",
+        "repo_url": "https://github.com/alice/api",
+        "default_branch": "main",
+        "remote_updated_at": NOW,
+        "remote_pushed_at": NOW,
+    }
+    async with AsyncSessionLocal() as db:
+        assert await repo_sync.upsert_repositories(db, [row]) == 1
+        assert await repo_sync.upsert_repositories(db, [{**row, "repo_name": "alice/renamed"}]) == 0
+        pushed = {**row, "repo_name": "alice/renamed", "remote_pushed_at": NOW + timedelta(hours=1)}
+        assert await repo_sync.upsert_repositories(db, [pushed]) == 1
+        await db.commit()
+
+    assert [repository.repo_name for repository in repositories(session)] == ["alice/renamed"]
+
+
+async def test_repositories_added_before_sync_are_linked_not_duplicated(session, monkeypatch):
+    user_id = add_synced_user(session)
+    legacy = add_repository(session, session.get(User, user_id), "api")
+    legacy.is_enabled = False
+    session.commit()
+    monkeypatch.setattr(repo_sync, "github", FakeGitHub([remote_repo(41, "api", NOW)]))
+
+    stats = await sync(user_id, full=True)
+
+    assert stats.written == 1
+    [repository] = repositories(session)
+    assert (repository.id, repository.external_id) == (legacy.id, 41)
+    assert repository.remote_updated_at == NOW
+    assert repository.is_enabled is False  # the user's choice is kept
@@ -0,0 +1,98 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import asyncpg
+
+from app.core.database import AsyncSessionLocal
+from app.models import Review
+from app.services.review_queries import (
+    ExplainJSON,
+    InvalidCursor,
+    _filtered,
+    decode_cursor,
+    encode_cursor,
+    etag_matches,
+    list_reviews,
+    review_etag,
+)
+from tests.conftest import add_repository, add_user, auth_headers
+
+
+def test_explain_keeps_filters_as_bind_parameters():
+    query = _filtered(select(Review.id), [1, 2], "queued:retry")
+    compiled = ExplainJSON(query).compile(dialect=asyncpg.dialect())
+    sql = str(compiled)
+    assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT reviews.id")
+    assert "queued:retry" not in sql
+    assert "queued:retry" in compiled.params.values()
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 18, 14, 1, 2, 345678)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    for cursor in ("", "not-a-cursor", encode_cursor(created_at, 42)[:-3]):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor)
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_cover_every_review_once(session):
+    repository = add_repository(session, add_user(session, "alice"), "app")
+    # Ties on created_at (including one without microseconds) are broken by id
+    stamps = [datetime(2026, 10, 18, 12), datetime(2026, 10, 18, 12), datetime(2026, 10, 18, 12, 0, 0, 500)] * 3
+    session.add_all(
+        Review(repository_id=repository.id, commit_sha="a" * 40, status="completed", created_at=stamp)
+        for stamp in stamps
+    )
+    session.commit()
+
+    seen, cursor = [], None
+    async with AsyncSessionLocal() as db:
+        while True:
+            page, cursor = await list_reviews(db, [repository.id], cursor=cursor, limit=4)
+            seen += [(review.created_at, review.id) for review in page]
+            if cursor is None:
+                break
+    assert len(seen) == len(stamps) == len(set(seen))
+    # All within one second, which is SQLite's resolution here: newest id first
+    assert [review_id for _, review_id in seen] == sorted((review_id for _, review_id in seen), reverse=True)
+
+
+def test_etag_changes_with_status_completion_and_feedback():
+    review = Review(id=1, status="in_progress", feedback_version=0)
+    tags = {review_etag(review)}
+    review.status, review.completed_at = "completed", datetime(2026, 10, 18)
+    tags.add(review_etag(review))
+    review.feedback_version = 1
+    tags.add(review_etag(review))
+    assert len(tags) == 3
+    assert review_etag(review) == review_etag(review)
+
+
+def test_etag_matching():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"x", "abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abd"', etag)
+    assert not etag_matches(None, etag)
+
+
+@pytest.mark.asyncio
+async def test_matching_etag_answers_304(client, session):
+    user = add_user(session, "alice")
+    repository = add_repository(session, user, "app")
+    review = Review(
+        repository_id=repository.id, commit_sha="a" * 40, status="completed", completed_at=datetime.utcnow()
+    )
+    session.add(review)
+    session.commit()
+
+    url = f"/api/v1/reviews/{review.id}"
+    first = await client.get(url, headers=auth_headers(user))
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    again = await client.get(url, headers={**auth_headers(user), "If-None-Match": etag})
+    assert again.status_code == 304 and again.headers["ETag"] == etag
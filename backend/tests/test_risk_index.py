@@ -0,0 +1,65 @@
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.models import Finding, Review, ReviewFinding
+from app.services import risk_index
+from tests.conftest import add_repository, add_user
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def reviews(session):
+    """Three reviews: ``src/a.py`` + ``src/b.py``, then only ``src/a.py``, then nothing"""
+    repository = add_repository(session, add_user(session, "alice"), "app")
+    findings = {}
+    for path in ("src/a.py", "src/b.py"):
+        findings[path] = Finding(
+            repository_id=repository.id, fingerprint=path, file_path=path, issue_type="bug",
+            severity="high", title="t", source="static_analysis", is_false_positive=False,
+        )
+        session.add(findings[path])
+    ids = []
+    for paths in (("src/a.py", "src/b.py"), ("src/a.py",), ()):
+        review = Review(repository_id=repository.id, commit_sha="a" * 40, status="completed")
+        session.add(review)
+        session.flush()
+        session.add_all(ReviewFinding(review_id=review.id, finding_id=findings[path].id) for path in paths)
+        ids.append(review.id)
+    session.commit()
+    return repository.id, ids
+
+
+async def _hotspots(db, repository_id):
+    heatmap = await risk_index.hotspots(db, repository_id)
+    return {node["path"]: node["issues"] for node in heatmap["hotspots"]}, heatmap["risk"]
+
+
+async def test_reviews_replace_the_indexed_state(reviews):
+    repository_id, (first, second, third) = reviews
+    async with AsyncSessionLocal() as db:
+        await risk_index.apply_review(db, repository_id, first)
+        await db.commit()
+        assert (await _hotspots(db, repository_id))[0] == {"src/a.py": 1, "src/b.py": 1}
+
+        await risk_index.apply_review(db, repository_id, second)
+        await db.commit()
+        files, root = await _hotspots(db, repository_id)
+        assert files == {"src/a.py": 1} and root["issues"] == 1
+
+        await risk_index.apply_review(db, repository_id, third)
+        await db.commit()
+        assert await _hotspots(db, repository_id) == ({}, None)
+
+
+async def test_stale_and_repeated_reviews_are_skipped(reviews):
+    repository_id, (first, second, _) = reviews
+    async with AsyncSessionLocal() as db:
+        assert await risk_index.apply_review(db, repository_id, second)
+        await db.commit()
+        # An older commit finishing later, and a redelivered completion
+        assert await risk_index.apply_review(db, repository_id, first) == 0
+        assert await risk_index.apply_review(db, repository_id, second) == 0
+        await db.commit()
+        files, root = await _hotspots(db, repository_id)
+        assert files == {"src/a.py": 1} and root["issues"] == 1
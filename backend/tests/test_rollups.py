@@ -0,0 +1,27 @@
+from datetime import date
+
+import pytest
+
+from app.core.database import AsyncSessionLocal
+from app.models import DailyMetric
+from app.services import rollups
+from tests.conftest import add_repository, add_user
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_false_positive_rate_is_a_share_of_all_reported_findings(session):
+    repository = add_repository(session, add_user(session, "alice"), "app")
+    session.add(DailyMetric(repository_id=repository.id, date=date.today(), total_issues=3, false_positives=1))
+    session.commit()
+
+    async with AsyncSessionLocal() as db:
+        summary = await rollups.summarize(db, date.today(), [repository.id])
+    assert summary["total_issues"] == 3
+    assert summary["false_positive_rate"] == 0.25
+
+
+async def test_rates_are_empty_without_data(database):
+    async with AsyncSessionLocal() as db:
+        summary = await rollups.summarize(db, date.today(), [])
+    assert summary["false_positive_rate"] is None and summary["quality_score"] is None
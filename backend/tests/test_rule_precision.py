@@ -0,0 +1,82 @@
+from itertools import count
+
+import numpy as np
+from sqlalchemy import delete, select
+
+from app.core.config import settings
+from app.models import Finding, RulePrecision
+from app.services import rule_precision
+from tests.conftest import add_repository, add_user
+
+
+_fingerprints = count()
+
+
+def _finding(repository_id, rule, flagged):
+    return Finding(
+        repository_id=repository_id, fingerprint=str(next(_fingerprints)), file_path="app.py",
+        issue_type="bug", static_rule_id=rule, severity="low", title="t", source="static_analysis",
+        is_false_positive=flagged,
+    )
+
+
+def test_refresh_writes_counts_and_drops_rules_without_findings(session):
+    repository = add_repository(session, add_user(session, "alice"), "app")
+    session.add_all([_finding(repository.id, "B101", True), _finding(repository.id, "B101", False)])
+    session.add_all([_finding(repository.id, "W0611", True) for _ in range(3)])
+    session.commit()
+
+    assert rule_precision.refresh(session, [repository.id]) == 2
+    assert rule_precision.refresh(session, [repository.id]) == 0  # nothing moved
+    rows = {row.rule: row for row in session.scalars(select(RulePrecision))}
+    assert (rows["B101"].findings, rows["B101"].false_positives) == (2, 1)
+
+    session.execute(delete(Finding).where(Finding.static_rule_id == "W0611"))
+    assert rule_precision.refresh(session, [repository.id]) == 1
+    assert set(session.scalars(select(RulePrecision.rule))) == {"B101"}
+
+    session.execute(delete(Finding))
+    assert rule_precision.refresh(session, [repository.id]) == 1
+    assert session.scalar(select(RulePrecision.rule)) is None
+
+
+def test_suppression_starts_strictly_below_the_threshold(monkeypatch):
+    monkeypatch.setattr(settings, "RULE_PRECISION_PRIOR_ACCEPTED", 1.0)
+    monkeypatch.setattr(settings, "RULE_PRECISION_PRIOR_FALSE_POSITIVE", 1.0)
+    monkeypatch.setattr(settings, "RULE_SUPPRESS_BELOW_PRECISION", 0.25)
+    monkeypatch.setattr(settings, "RULE_SUPPRESS_MIN_FALSE_POSITIVES", 5)
+
+    precision, suppressed = rule_precision.estimate(np.array([6, 7]), np.array([5, 6]))
+
+    assert precision.tolist() == [0.25, 2 / 9]
+    assert suppressed.tolist() == [False, True]
+
+
+def test_rules_with_too_few_flags_are_not_suppressed(monkeypatch):
+    monkeypatch.setattr(settings, "RULE_PRECISION_PRIOR_ACCEPTED", 0.1)
+    monkeypatch.setattr(settings, "RULE_PRECISION_PRIOR_FALSE_POSITIVE", 1.0)
+    monkeypatch.setattr(settings, "RULE_SUPPRESS_MIN_FALSE_POSITIVES", 5)
+
+    precision, suppressed = rule_precision.estimate(np.array([4, 5]), np.array([4, 5]))
+
+    assert (precision < settings.RULE_SUPPRESS_BELOW_PRECISION).all()  # both far below the threshold
+    assert suppressed.tolist() == [False, True]
+
+
+def test_apply_drops_suppressed_rules_and_scales_the_rest(session):
+    repository = add_repository(session, add_user(session, "alice"), "app")
+    session.add_all([_finding(repository.id, "B101", True) for _ in range(10)])
+    session.add_all([_finding(repository.id, "W0611", False) for _ in range(10)])
+    session.commit()
+    rule_precision.refresh(session, [repository.id])
+    rule_precision.rule_model.invalidate()
+
+    kept = rule_precision.rule_model.apply(session, repository.id, [
+        {"static_rule_id": "B101", "confidence_score": 0.9},
+        {"static_rule_id": "W0611", "confidence_score": 0.5},
+        {"static_rule_id": "E999", "confidence_score": 0.5},
+    ])
+
+    assert [finding["static_rule_id"] for finding in kept] == ["W0611", "E999"]
+    assert kept[0]["confidence_score"] > 0.5  # better than the prior
+    assert kept[1]["confidence_score"] == 0.5  # no history: unchanged
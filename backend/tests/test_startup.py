@@ -0,0 +1,60 @@
+import asyncio
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.core import startup
+from app.services.github_client import github
+from app.services.job_queue import worker_pool
+
+DEFERRED = (
+    "app.services.ai_scheduler",
+    "app.services.analyzer_runner",
+    "app.services.checkout",
+    "app.services.github_client",
+    "app.services.job_queue",
+    "numpy",
+)
+
+
+def test_importing_the_app_defers_the_worker_modules():
+    script = "import sys, app.main; print(' '.join(sorted(set(sys.argv[1:]) & set(sys.modules))))"
+    loaded = subprocess.run(
+        [sys.executable, "-c", script, *DEFERRED],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=os.environ.copy(), check=True, capture_output=True, text=True,
+    ).stdout.split()
+    assert loaded == []
+
+
+@pytest.mark.asyncio
+async def test_ready_only_after_warm_up(client, monkeypatch):
+    from app.main import warm_up
+
+    monkeypatch.setattr(startup, "state", startup.StartupState())
+    workers_started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def start_workers():
+        workers_started.set()
+        await release.wait()
+
+    monkeypatch.setattr(github, "start", lambda: asyncio.sleep(0))
+    monkeypatch.setattr(worker_pool, "start", start_workers)
+
+    assert (await client.get("/health/live")).status_code == 200
+    assert (await client.get("/health/ready")).status_code == 503
+
+    task = asyncio.create_task(warm_up())
+    await workers_started.wait()
+    assert "imports" in startup.state.timings
+    assert (await client.get("/health/live")).status_code == 200
+    response = await client.get("/health/ready")
+    assert (response.status_code, response.json()["status"]) == (503, "starting")
+
+    release.set()
+    await task
+    response = await client.get("/health/ready")
+    assert (response.status_code, response.json()["status"]) == (200, "ready")
@@ -0,0 +1,35 @@
+from datetime import datetime, timedelta
+
+from app.services.trends import downsample, lttb
+
+
+def test_lttb_keeps_endpoints_and_the_spike():
+    ys = [1.0] * 100
+    ys[37] = 50.0
+    indices = lttb(list(range(100)), ys, 10)
+    assert len(indices) == 10
+    assert indices[0] == 0 and indices[-1] == 99
+    assert indices == sorted(set(indices))
+    assert 37 in indices
+
+
+def test_lttb_small_inputs():
+    assert lttb([0, 1, 2], [0, 1, 2], 5) == [0, 1, 2]
+    assert lttb(list(range(10)), list(range(10)), 2) == [0, 9]
+    assert lttb(list(range(10)), list(range(10)), 1) == [0]
+
+
+def test_downsample_carries_scores_over_empty_buckets():
+    start = datetime(2026, 1, 1)
+    buckets = [
+        {"timestamp": start + timedelta(hours=i), "quality_score_sum": 0, "quality_score_count": 0}
+        for i in range(50)
+    ]
+    buckets[0].update(quality_score_sum=90, quality_score_count=1)
+    buckets[30].update(quality_score_sum=10, quality_score_count=1)
+    sampled = downsample(buckets, 5, "lttb")
+    assert len(sampled) == 5
+    # Empty buckets read as the previous score, not as zeros: the sample
+    # brackets the real drop at bucket 30 instead of one right after the start
+    assert buckets[29] in sampled and buckets[1] not in sampled
+    assert downsample(buckets, 5, "none") is buckets
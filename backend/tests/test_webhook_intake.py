@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from app.models import AnalysisJob
+from app.services.webhook_intake import InvalidPayload, parse_github_event
+from tests.conftest import add_repository, add_user
+
+
+def _body(payload) -> bytes:
+    return json.dumps(payload).encode()
+
+
+def test_pull_request_fields():
+    event = parse_github_event("pull_request", _body({
+        "action": "opened",
+        "repository": {"id": 7, "html_url": "https://github.com/o/r"},
+        "pull_request": {
+            "number": 3, "html_url": "https://github.com/o/r/pull/3",
+            "head": {"sha": "a" * 40, "ref": "feature"}, "base": {"sha": "b" * 40},
+        },
+    }))
+    assert (event.repo_id, event.pr_number, event.head_ref, event.base_sha) == (7, 3, "feature", "b" * 40)
+
+
+@pytest.mark.parametrize("event, payload", [
+    ("push", {"repository": "o/r"}),
+    ("push", {"repository": {"id": "7"}}),
+    ("push", {"repository": {"id": 7}, "ref": ["refs/heads/main"]}),
+    ("pull_request", {"repository": {"id": 7}, "pull_request": [1]}),
+    ("pull_request", {"repository": {"id": 7}, "pull_request": {"head": "feature"}}),
+    ("pull_request", {"repository": {"id": 7}, "pull_request": {"number": True}}),
+])
+def test_malformed_payloads_are_rejected(event, payload):
+    with pytest.raises(InvalidPayload):
+        parse_github_event(event, _body(payload))
+
+
+@pytest.mark.asyncio
+async def test_malformed_payload_is_a_bad_request(client):
+    response = await client.post(
+        "/api/v1/webhooks/github",
+        content=_body({"repository": None, "pull_request": "nope"}),
+        headers={"X-GitHub-Event": "pull_request", "Content-Type": "application/json"},
+    )
+    assert response.status_code == 400
+
+
+def _pull_request(number, head_sha, base_sha="b" * 40):
+    pull_request = {"html_url": "https://github.com/alice/api/pull/3", "head": {"sha": head_sha, "ref": "feature"}}
+    if number is not None:
+        pull_request["number"] = number
+    pull_request["base"] = {"sha": base_sha}
+    repository = {"html_url": "https://github.com/alice/api"}
+    return {"action": "opened", "repository": repository, "pull_request": pull_request}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("event, payload", [
+    ("pull_request", _pull_request(None, "a" * 40)),
+    ("pull_request", _pull_request(3, "feature")),
+    ("push", {"repository": {"html_url": "https://github.com/alice/api"}, "ref": "refs/heads/main", "after": "main"}),
+])
+async def test_events_without_a_number_or_commit_sha_are_ignored(client, session, event, payload):
+    add_repository(session, add_user(session, "alice"), "api")
+    session.commit()
+
+    response = await client.post(
+        "/api/v1/webhooks/github",
+        content=_body(payload),
+        headers={"X-GitHub-Event": event, "X-GitHub-Delivery": "d-1", "Content-Type": "application/json"},
+    )
+
+    assert (response.status_code, response.json()["status"]) == (200, "ignored")
+    assert session.query(AnalysisJob).count() == 0
+
+
+@pytest.mark.asyncio
+async def test_pull_request_is_queued_under_its_number(client, session):
+    add_repository(session, add_user(session, "alice"), "api")
+    session.commit()
+
+    response = await client.post(
+        "/api/v1/webhooks/github",
+        content=_body(_pull_request(3, "a" * 40, base_sha="main")),
+        headers={"X-GitHub-Event": "pull_request", "X-GitHub-Delivery": "d-2", "Content-Type": "application/json"},
+    )
+
+    assert response.json()["status"] == "queued"
+    job = session.query(AnalysisJob).one()
+    assert job.coalesce_key == "pr:3"
+    assert job.payload == {"ref": "feature", "base_sha": None}  # not a commit: no diff scope